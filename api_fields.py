@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+
+
+def build_fields(paths):
+    """Turn dotted field paths into a fields mask, e.g. ["id", "snippet.title"] -> "id,snippet(title)"."""
+    tree = {}
+    for path in paths:
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+
+    def render(node):
+        return ",".join(f"{name}({render(child)})" if child else name for name, child in node.items())
+
+    return render(tree)
+
+
+def build_part(paths):
+    """Return the smallest part parameter that contains every consumed field."""
+    parts = []
+    for path in paths:
+        top = path.split(".")[0]
+        if top != "id" and top not in parts:
+            parts.append(top)
+    return ",".join(parts) or "id"
+
+
+class ApiStats:
+    """Per-call counters of responses received, decoded bytes and JSON parse time."""
+
+    def __init__(self):
+        self.calls = {}  # label -> {"calls", "bytes", "parse_seconds"}
+        self._lock = threading.Lock()
+
+    def record(self, label, size, parse_seconds):
+        with self._lock:
+            entry = self.calls.setdefault(label, {"calls": 0, "bytes": 0, "parse_seconds": 0.0})
+            entry["calls"] += 1
+            entry["bytes"] += size
+            entry["parse_seconds"] += parse_seconds
+
+    def summary(self):
+        """Return a copy of the counters, largest payloads first."""
+        with self._lock:
+            return dict(sorted(((label, dict(entry)) for label, entry in self.calls.items()),
+                               key=lambda item: item[1]["bytes"], reverse=True))
+
+    def log_summary(self):
+        for label, entry in self.summary().items():
+            logging.info(
+                f"API {label}: {entry['calls']} responses, {entry['bytes'] / 1024:.1f} KiB, "
+                f"{entry['parse_seconds'] * 1000:.1f} ms parsing"
+            )
+
+
+API_STATS = ApiStats()
+
+
+def track(request, label, stats=API_STATS):
+    """Record the body size and parse time of every response to this request (and its next pages)."""
+    postproc = request.postproc
+
+    def counting_postproc(resp, content):
+        started = time.perf_counter()
+        result = postproc(resp, content)
+        stats.record(label, len(content or b""), time.perf_counter() - started)
+        return result
+
+    # list_next() copies the request, so later pages keep reporting under the same label
+    request.postproc = counting_postproc
+    return request
+
+
+def list_request(collection, consumes, label, paged=False, top_level=(), **params):
+    """Build collection.list() asking only for the fields the caller reads from each item.
+
+    consumes are dotted paths inside an item, e.g. ["id", "snippet.title"]. The matching part
+    and fields parameters are derived from them, so a caller cannot forget to narrow either.
+    top_level names response-level fields to keep as well (nextPageToken is added when paged).
+    """
+    fields = ",".join((["nextPageToken"] if paged else []) + list(top_level) + [f"items({build_fields(consumes)})"])
+    return track(collection.list(part=build_part(consumes), fields=fields, **params), label)
+
+
+def projected(request_factory, consumes, label, **params):
+    """Build a non-list request (insert, update, bind, ...) whose response is narrowed to consumes.
+
+    The part parameter of a write decides what is written, so it stays with the caller.
+    """
+    return track(request_factory(fields=build_fields(consumes), **params), label)
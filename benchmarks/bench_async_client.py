@@ -0,0 +1,111 @@
+"""Benchmark AsyncYouTubeClient against the synchronous googleapiclient path.
+
+Both clients hit the same local stand-in API (benchmarks/standin_api.py), which adds a fixed
+delay per response to simulate network latency. The workload is a status poll of many
+broadcasts by ID, the shape of bulk scheduling and status polling.
+
+    python benchmarks/bench_async_client.py [--requests 200] [--latency 0.05] [--concurrency 1 10 50]
+
+The stand-in speaks HTTP/1.1, so httpx opens up to --connections keep-alive connections to it.
+The "h2c" rows repeat the async runs against StandInH2, which speaks HTTP/2 over plain TCP with
+prior knowledge, and report how many connections the client opened: googleapis.com negotiates
+HTTP/2 over TLS instead, but multiplexes in-flight requests the same way. Pass --url to benchmark
+a different HTTP/1.1 server (the h2c rows are skipped).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from standin_api import StandInAPI, StandInH2
+from youtube_async import AsyncYouTubeClient, gather_limited
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, wall, latencies):
+    print(f"{name:<28} {wall:>8.2f} s {len(latencies) / wall:>9.1f} req/s "
+          f"p50 {percentile(latencies, 0.5) * 1000:>7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:>7.1f} ms")
+
+
+def run_sync(url, broadcast_ids):
+    """Sequential execute() calls, as the GUI does today."""
+    api_service = build("youtube", "v3", credentials=AnonymousCredentials(),
+                        client_options={"api_endpoint": url}, static_discovery=True)
+    latencies = []
+    started = time.perf_counter()
+    for broadcast_id in broadcast_ids:
+        request_started = time.perf_counter()
+        api_service.liveBroadcasts().list(part="status", id=broadcast_id,
+                                          fields="items(id,status(lifeCycleStatus))").execute()
+        latencies.append(time.perf_counter() - request_started)
+    return time.perf_counter() - started, latencies
+
+
+async def run_async(url, broadcast_ids, concurrency, connections, prior_knowledge=False):
+    """The same calls through AsyncYouTubeClient with bounded concurrency."""
+    credentials = Credentials(token="stand-in")  # No expiry, so it never tries to refresh
+    latencies = []
+
+    async with AsyncYouTubeClient(credentials, api_root=url, http1=not prior_knowledge,
+                                  max_connections=connections) as client:
+        async def poll(broadcast_id):
+            request_started = time.perf_counter()
+            await client.list("liveBroadcasts", part="status", id=broadcast_id,
+                              fields="items(id,status(lifeCycleStatus))")
+            latencies.append(time.perf_counter() - request_started)
+
+        started = time.perf_counter()
+        results = await gather_limited([poll(broadcast_id) for broadcast_id in broadcast_ids], concurrency)
+        wall = time.perf_counter() - started
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        raise errors[0]
+    return wall, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in delay per response, seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--connections", type=int, default=10, help="httpx connection pool size")
+    parser.add_argument("--url", help="benchmark this server instead of starting the stand-in")
+    args = parser.parse_args()
+
+    broadcast_ids = [f"broadcast{index:05d}" for index in range(args.requests)]
+    server = None
+    if not args.url:
+        server = StandInAPI(latency=args.latency).__enter__()
+    url = args.url or server.url
+    try:
+        print(f"{args.requests} liveBroadcasts.list calls, {args.latency * 1000:.0f} ms simulated latency")
+        report("googleapiclient (sync)", *run_sync(url, broadcast_ids))
+        for concurrency in args.concurrency:
+            wall, latencies = asyncio.run(run_async(url, broadcast_ids, concurrency, args.connections))
+            report(f"async, concurrency {concurrency}", wall, latencies)
+        if server:
+            with StandInH2(latency=args.latency) as h2_server:
+                for concurrency in args.concurrency:
+                    opened = h2_server.connections
+                    wall, latencies = asyncio.run(run_async(h2_server.url, broadcast_ids, concurrency,
+                                                            args.connections, prior_knowledge=True))
+                    report(f"async h2c, concurrency {concurrency}", wall, latencies)
+                    print(f"{'':<28} {h2_server.connections - opened} connection(s)")
+    finally:
+        if server:
+            server.__exit__(None, None, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Benchmark startup and GUI actions of the main app, with regression checks against past runs.
+
+Each trial starts the app in a fresh process with QT_QPA_PLATFORM=offscreen, pointed at the local
+YouTube API stand-in (benchmarks/standin_api.py) through client_options={"api_endpoint": ...} and
+run from an empty temporary directory with stand-in credentials, so nothing touches the real
+channel or OBS. Measured from process start:
+
+    import              importing the app module (PyQt6, Google client, Pillow, ...)
+    construct           YouTubeLiveStreamApp() including the three initial list calls
+    first_paint         the main window's first paint event after show()
+    interactive         the event loop's first idle turn after that paint
+
+Then each action runs --iterations times and its p50/p95 are recorded:
+load_scheduled_streams, load_stream_keys, load_playlists and create_live_stream.
+
+    python benchmarks/bench_startup.py [--trials 5] [--iterations 20] [--latency 0.02]
+
+Results are appended to benchmarks/startup_history.json. A metric regresses when it is more than
+--threshold (default 20%) and more than --min-delta-ms slower than the median of the last
+--baseline-runs recorded runs; any regression makes the script exit with status 1.
+"""
+import time
+
+PROCESS_STARTED = time.perf_counter()  # Before any heavy import, so "import" covers them all
+
+import argparse
+import functools
+import importlib.util
+import json
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, REPO_DIR)
+
+APP_SCRIPT = os.path.join(REPO_DIR, "livestream-manager-v2-with-obs-wp.py")
+HISTORY_FILE = os.path.join(BENCH_DIR, "startup_history.json")
+ACTIONS = ["load_scheduled_streams", "load_stream_keys", "load_playlists", "create_live_stream"]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_trial(url, iterations):
+    """Start the app once in this process and print its timings (ms) as JSON."""
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from google.oauth2.credentials import Credentials
+    with open("youtube_credentials.pkl", "wb") as token:
+        pickle.dump(Credentials(token="stand-in"), token)  # No expiry, so it is never refreshed
+
+    def since_start():
+        return (time.perf_counter() - PROCESS_STARTED) * 1000
+
+    spec = importlib.util.spec_from_file_location("stream_manager_app", APP_SCRIPT)
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    timings = {"import": since_start()}
+
+    import logging
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+    logging.getLogger().setLevel(logging.WARNING)  # Keep debug logging out of the measurement
+    app_module.build = functools.partial(app_module.build, client_options={"api_endpoint": url})
+    http_pool = sys.modules["http_pool"]  # Background tasks build their services here
+    http_pool.build = functools.partial(http_pool.build, client_options={"api_endpoint": url})
+    for name in ("information", "warning", "critical"):
+        # Message boxes are modal; answer them immediately
+        setattr(app_module.QMessageBox, name, staticmethod(lambda *args, **kwargs: None))
+    app_module.QMessageBox.question = staticmethod(lambda *args, **kwargs: app_module.QMessageBox.StandardButton.Yes)
+
+    qt_app = QApplication([])
+    started = time.perf_counter()
+    window = app_module.YouTubeLiveStreamApp()
+    timings["construct"] = (time.perf_counter() - started) * 1000
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint and "first_paint" not in timings:
+                timings["first_paint"] = since_start()
+                QTimer.singleShot(0, on_interactive)
+            return False
+
+    def on_interactive():
+        timings["interactive"] = since_start()
+        qt_app.exit()  # Unlike quit(), exit() leaves the window open for the action runs
+
+    paint_filter = FirstPaint()
+    window.installEventFilter(paint_filter)
+    window.show()
+    QTimer.singleShot(10000, qt_app.exit)  # Never hang the harness
+    qt_app.exec()
+
+    for action in ACTIONS:
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            getattr(window, action)()
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[f"{action}_p50"] = percentile(samples, 0.5)
+        timings[f"{action}_p95"] = percentile(samples, 0.95)
+    window.close()
+    print(json.dumps(timings))
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def find_regressions(metrics, settings, history, baseline_runs, threshold, min_delta_ms):
+    """Return (metric, value, baseline) for every metric slower than the recent median allows.
+
+    Only runs recorded with the same settings count, since latency and iterations change the numbers.
+    """
+    regressions = []
+    recent = [run for run in history if run.get("settings") == settings][-baseline_runs:]
+    for metric, value in metrics.items():
+        past = [run["metrics"][metric] for run in recent if metric in run["metrics"]]
+        if not past:
+            continue
+        baseline = statistics.median(past)
+        if value > baseline * (1 + threshold) and value - baseline > min_delta_ms:
+            regressions.append((metric, value, baseline))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=5, help="fresh app processes; the median is reported")
+    parser.add_argument("--iterations", type=int, default=20, help="runs of each action per trial")
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in delay per response, seconds")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--baseline-runs", type=int, default=5, help="recorded runs the baseline is the median of")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--no-record", action="store_true", help="compare without appending to the history")
+    parser.add_argument("--run-trial", nargs=2, metavar=("URL", "ITERATIONS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_trial:
+        run_trial(args.run_trial[0], int(args.run_trial[1]))
+        return
+
+    from standin_api import StandInAPI
+
+    trials = []
+    with StandInAPI(latency=args.latency, total_items=25) as server:
+        for trial in range(args.trials):
+            with tempfile.TemporaryDirectory() as tmp:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run-trial", server.url, str(args.iterations)],
+                    cwd=tmp, check=True, capture_output=True, text=True
+                ).stdout
+            trials.append(json.loads(output.strip().splitlines()[-1]))
+            print(f"trial {trial + 1}/{args.trials}: first paint {trials[-1]['first_paint']:.0f} ms")
+    metrics = {metric: round(statistics.median(trial[metric] for trial in trials), 2) for metric in trials[0]}
+
+    settings = {"trials": args.trials, "iterations": args.iterations, "latency": args.latency}
+    history = load_history(args.history)
+    regressions = find_regressions(metrics, settings, history, args.baseline_runs, args.threshold, args.min_delta_ms)
+    flagged = {metric for metric, _, _ in regressions}
+    print(f"\n{'metric':<32} {'ms':>9}")
+    for metric, value in metrics.items():
+        print(f"{metric:<32} {value:>9.1f}{'  REGRESSION' if metric in flagged else ''}")
+
+    if not args.no_record:
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "settings": settings,
+            "metrics": metrics,
+        })
+        with open(args.history, "w") as file:
+            json.dump(history, file, indent=4)
+
+    if regressions:
+        for metric, value, baseline in regressions:
+            print(f"{metric} regressed: {value:.1f} ms vs baseline {baseline:.1f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
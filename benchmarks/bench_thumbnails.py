@@ -0,0 +1,141 @@
+"""Benchmark thumbnail preparation on large PNG, JPEG and GIF inputs.
+
+Compares the original pipeline (full decode, convert, single-pass LANCZOS stretch) with
+thumbnails.prepare_thumbnail (draft decode, reduced-gap resample, aspect-correct crop).
+Each case runs in a fresh process; memory is reported as the growth of the process's peak RSS
+over its RSS before the first stage, so it is not polluted by earlier cases or by imports.
+
+    python benchmarks/bench_thumbnails.py [--repeat 3] [--json results.json]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image
+
+import thumbnails
+
+# Camera-sized inputs, including a non-16:9 one that the old pipeline stretches
+INPUTS = [
+    ("jpeg_6000x4000", "JPEG", (6000, 4000), ".jpg"),
+    ("png_6000x4000", "PNG", (6000, 4000), ".png"),
+    ("gif_2400x1600", "GIF", (2400, 1600), ".gif"),
+    ("jpeg_3840x2160", "JPEG", (3840, 2160), ".jpg"),
+]
+
+
+def peak_rss_mb():
+    """Return the process's peak resident set size in MB."""
+    # On Linux ru_maxrss survives exec and would report the parent's peak, so prefer VmHWM
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def make_input(path, image_format, size):
+    """Create a synthetic photo-like test image (gradient plus noise, so it does not compress to nothing)."""
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 24)
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    if image_format == "GIF":
+        img = img.convert("P", palette=Image.Palette.ADAPTIVE)
+    img.save(path, image_format, **({"quality": 92} if image_format == "JPEG" else {}))
+
+
+def legacy_pipeline(source_path, output_path):
+    """The pipeline upload_thumbnail used before: full decode and a single LANCZOS stretch."""
+    stages = {}
+    start = time.perf_counter()
+    img = Image.open(source_path)
+    img = img.convert("RGB")
+    stages["decode"] = time.perf_counter() - start, peak_rss_mb()
+    start = time.perf_counter()
+    img = img.resize((1280, 720), Image.LANCZOS)
+    stages["resample"] = time.perf_counter() - start, peak_rss_mb()
+    start = time.perf_counter()
+    img.save(output_path, "JPEG", quality=85)
+    stages["encode"] = time.perf_counter() - start, peak_rss_mb()
+    return stages
+
+
+def current_pipeline(source_path, output_path):
+    """thumbnails.prepare_thumbnail, split into its stages."""
+    stages = {}
+    start = time.perf_counter()
+    img = thumbnails.decode_for_thumbnail(source_path)
+    stages["decode"] = time.perf_counter() - start, peak_rss_mb()
+    start = time.perf_counter()
+    img = thumbnails.fit_to_thumbnail(img)
+    stages["resample"] = time.perf_counter() - start, peak_rss_mb()
+    start = time.perf_counter()
+    thumbnails.encode_thumbnail(img, output_path)
+    stages["encode"] = time.perf_counter() - start, peak_rss_mb()
+    return stages
+
+
+PIPELINES = {"legacy": legacy_pipeline, "current": current_pipeline}
+
+
+def run_case(pipeline, source_path):
+    """Run one pipeline once in this process and print its stage timings as JSON."""
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        stages = PIPELINES[pipeline](source_path, os.path.join(tmp, "out.jpg"))
+    print(json.dumps({name: {"seconds": seconds, "peak_rss_mb": round(rss - baseline, 1)}
+                      for name, (seconds, rss) in stages.items()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest run is reported")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run-case", nargs=2, metavar=("PIPELINE", "SOURCE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        run_case(*args.run_case)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, image_format, size, suffix in INPUTS:
+            source_path = os.path.join(tmp, name + suffix)
+            make_input(source_path, image_format, size)
+            for pipeline in PIPELINES:
+                runs = []
+                for _ in range(args.repeat):
+                    output = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--run-case", pipeline, source_path],
+                        check=True, capture_output=True, text=True
+                    ).stdout
+                    runs.append(json.loads(output.strip().splitlines()[-1]))
+                best = min(runs, key=lambda run: sum(stage["seconds"] for stage in run.values()))
+                results.append({"input": name, "pipeline": pipeline, "stages": best})
+
+    print(f"{'input':<16} {'pipeline':<8} {'stage':<9} {'ms':>9} {'peak RSS +MB':>13}")
+    for result in results:
+        total = 0.0
+        for stage, data in result["stages"].items():
+            total += data["seconds"]
+            print(f"{result['input']:<16} {result['pipeline']:<8} {stage:<9} "
+                  f"{data['seconds'] * 1000:>9.1f} {data['peak_rss_mb']:>13.1f}")
+        print(f"{result['input']:<16} {result['pipeline']:<8} {'total':<9} {total * 1000:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark the resumable recording upload (vod_upload.VodUploader) against the local stand-in.
+
+Uploads a synthetic recording once per chunk size and reports throughput and peak Python memory
+(tracemalloc). Memory should track the chunk size, not the file size, since the file is read
+through a memory map. --faults fails that many chunk requests with 503, and --pause-after stops
+the first attempt after that many chunks and resumes it from the saved session, as after a crash.
+
+    python benchmarks/bench_vod_upload.py [--size-mb 256] [--chunk-mb 1 8 32] [--faults 2] [--pause-after 3]
+"""
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from google.oauth2.credentials import Credentials
+
+import vod_upload
+from standin_api import StandInAPI
+
+
+def make_recording(path, size_mb):
+    """Write an incompressible file of size_mb MiB, 1 MiB at a time."""
+    with open(path, "wb") as file:
+        for _ in range(size_mb):
+            file.write(os.urandom(1024 * 1024))
+
+
+def run(server, path, chunk_mb, faults, pause_after):
+    """Upload path once (pausing and resuming if asked); return (throughput MiB/s, peak MiB, chunks, resumed_from)."""
+    server.upload_faults = faults
+    state = vod_upload.UploadState(os.path.join(os.path.dirname(path), "vod_uploads.json"))
+    chunks = []
+
+    def on_progress(sent, total, rate):
+        chunks.append(sent)
+        if pause_after and len(chunks) == pause_after:
+            uploader.stop()
+
+    uploader = vod_upload.VodUploader(Credentials(token="stand-in"), chunk_size=chunk_mb * 1024 * 1024, state=state,
+                                      on_progress=on_progress)
+    tracemalloc.start()
+    try:
+        try:
+            result = uploader.upload(path, "Benchmark recording")
+        except InterruptedError:
+            result = uploader.upload(path, "Benchmark recording")  # Picks the saved session up again
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+    return result["bytes_per_second"] / 1024 / 1024, peak, len(chunks), result["resumed_from"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--chunk-mb", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.01, help="stand-in delay per request, seconds")
+    parser.add_argument("--faults", type=int, default=0, help="chunk requests to fail with 503")
+    parser.add_argument("--pause-after", type=int, default=0, help="interrupt after this many chunks, then resume")
+    args = parser.parse_args()
+
+    vod_upload.random.uniform = lambda low, high: 0.01  # Keep retry backoff out of the throughput
+    with tempfile.TemporaryDirectory() as tmp, StandInAPI(latency=args.latency) as server:
+        vod_upload.build = functools.partial(vod_upload.build, **server.build_kwargs())
+        path = os.path.join(tmp, "recording.mkv")
+        make_recording(path, args.size_mb)
+        print(f"{args.size_mb} MiB recording, {args.latency * 1000:.0f} ms per request\n")
+        print(f"{'chunk':>8} {'MiB/s':>9} {'peak MiB':>9} {'chunks':>7} {'resumed at':>12}")
+        for chunk_mb in args.chunk_mb:
+            rate, peak, chunks, resumed_from = run(server, path, chunk_mb, args.faults, args.pause_after)
+            print(f"{chunk_mb:>6} M {rate:>9.1f} {peak:>9.1f} {chunks:>7} {resumed_from / 1024 / 1024:>10.0f} M")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""Local stand-in for the YouTube Data API, for benchmarks and manual testing.
+
+Serves canned JSON for the endpoints the app uses after a configurable delay that
+simulates network round-trip time. Point googleapiclient at it with
+client_options={"api_endpoint": server.url} and AsyncYouTubeClient with api_root=server.url.
+Resumable video uploads (uploadType=resumable) are accepted too; only the size and SHA-256 of the
+received bytes are kept, and upload_faults makes the next chunk requests fail with 503:
+
+    with StandInAPI(latency=0.05) as server:
+        ...
+
+or run it on its own:  python benchmarks/standin_api.py --port 8090 --latency 0.05
+
+StandInH2 serves the same list calls over HTTP/2 cleartext with prior knowledge (h2c), so the
+multiplexing of AsyncYouTubeClient can be measured without TLS.
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import h2.config
+import h2.connection
+import h2.events
+
+
+def make_broadcast(index):
+    """Return a plausible liveBroadcast resource."""
+    start = datetime(2026, 1, 4, 15, 0, tzinfo=timezone.utc) + timedelta(days=7 * index)
+    return {
+        "kind": "youtube#liveBroadcast",
+        "etag": f"etag-{index}",
+        "id": f"broadcast{index:05d}",
+        "snippet": {
+            "publishedAt": start.isoformat().replace("+00:00", "Z"),
+            "channelId": "UCstandin",
+            "title": f"Sunday Service | {start.strftime('%B %d, %Y %A %p')}",
+            "description": "Join us live. " * 20,
+            "scheduledStartTime": start.isoformat().replace("+00:00", "Z"),
+            "scheduledEndTime": (start + timedelta(hours=1)).isoformat().replace("+00:00", "Z"),
+            "liveChatId": f"chat{index:05d}",
+            "thumbnails": {size: {"url": f"https://i.ytimg.com/vi/{index}/{size}.jpg", "width": 1280, "height": 720}
+                           for size in ("default", "medium", "high", "standard", "maxres")},
+        },
+        "status": {"lifeCycleStatus": "ready", "privacyStatus": "unlisted", "recordingStatus": "notRecording",
+                   "madeForKids": False, "selfDeclaredMadeForKids": False},
+        "contentDetails": {"boundStreamId": f"stream{index % 3:05d}", "enableAutoStart": True,
+                           "enableAutoStop": True, "enableDvr": True, "recordFromStart": True,
+                           "monitorStream": {"enableMonitorStream": True, "broadcastStreamDelayMs": 0}},
+    }
+
+
+def make_stream(index):
+    """Return a plausible liveStream resource."""
+    return {
+        "kind": "youtube#liveStream",
+        "etag": f"stream-etag-{index}",
+        "id": f"stream{index:05d}",
+        "snippet": {"title": f"Encoder {index}", "description": "", "channelId": "UCstandin"},
+        "cdn": {"ingestionType": "rtmp", "resolution": "1080p", "frameRate": "60fps",
+                "ingestionInfo": {"streamName": f"abcd-efgh-ijkl-{index:04d}",
+                                  "ingestionAddress": "rtmp://a.rtmp.youtube.com/live2",
+                                  "backupIngestionAddress": "rtmp://b.rtmp.youtube.com/live2?backup=1",
+                                  "rtmpsIngestionAddress": "rtmps://a.rtmps.youtube.com/live2",
+                                  "rtmpsBackupIngestionAddress": "rtmps://b.rtmps.youtube.com/live2?backup=1"}},
+        "status": {"streamStatus": "active", "healthStatus": {"status": "good", "configurationIssues": []}},
+    }
+
+
+def make_video(index):
+    """Return the video resource behind a broadcast (tags only exist here)."""
+    broadcast = make_broadcast(index)
+    return {"kind": "youtube#video", "etag": f"video-etag-{index}", "id": broadcast["id"],
+            "snippet": {"title": broadcast["snippet"]["title"], "description": broadcast["snippet"]["description"],
+                        "tags": ["church", "live"], "categoryId": "29", "channelId": "UCstandin"},
+            "status": {"privacyStatus": "unlisted", "uploadStatus": "processed"}}
+
+
+def make_playlist(index):
+    return {"kind": "youtube#playlist", "etag": f"pl-etag-{index}", "id": f"PL{index:05d}",
+            "snippet": {"title": f"Series {index}", "description": ""}}
+
+
+FACTORIES = {
+    "liveBroadcasts": make_broadcast,
+    "liveStreams": make_stream,
+    "playlists": make_playlist,
+    "videos": make_video,
+    "playlistItems": lambda index: {"id": f"item{index}", "snippet": {"resourceId": {"videoId": f"broadcast{index:05d}"}},
+                                    "contentDetails": {"videoId": f"broadcast{index:05d}"}},
+}
+
+
+def _parse_fields(mask):
+    """Parse a fields mask such as "nextPageToken,items(id,snippet(title))" into a nested dict."""
+    tree, stack, name = {}, [], ""
+    node = tree
+    for char in mask + ",":
+        if char in ",()":
+            if name:
+                node.setdefault(name.strip(), {})
+            if char == "(":
+                stack.append(node)
+                node = node[name.strip()]
+            elif char == ")":
+                node = stack.pop()
+            name = ""
+        else:
+            name += char
+    return tree
+
+
+def apply_fields(data, tree):
+    """Drop everything not selected by a parsed fields mask, as the real API does."""
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [apply_fields(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    return {key: apply_fields(data[key], child) for key, child in tree.items() if key in data}
+
+
+def list_page(resource, query, total_items):
+    """Page through total_items synthetic resources; honours id, maxResults and pageToken."""
+    factory = FACTORIES[resource]
+    if "id" in query:
+        items = [factory(int(re.sub(r"\D", "", item_id) or 0)) for item_id in query["id"].split(",")]
+        return {"items": items}
+    page_size = int(query.get("maxResults", 5))
+    start = int(query.get("pageToken", 0))
+    items = [factory(index) for index in range(start, min(start + page_size, total_items))]
+    response = {"kind": f"youtube#{resource}ListResponse", "etag": "list-etag",
+                "pageInfo": {"totalResults": total_items, "resultsPerPage": page_size}, "items": items}
+    if start + page_size < total_items:
+        response["nextPageToken"] = str(start + page_size)
+    return response
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like googleapis.com
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid the delayed-ACK stall
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        fields = parse_qs(urlparse(self.path).query).get("fields")
+        if fields and status == 200:
+            payload = apply_fields(payload, _parse_fields(fields[0]))
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        match = re.fullmatch(r"(?:/upload)?/youtube/v3/(\w+)(?:/(\w+))?", url.path)
+        if not match:
+            self._send(404, {"error": {"code": 404, "message": "Not found", "errors": [{"reason": "notFound"}]}})
+            return
+        resource, action = match.groups()
+        handler = server.routes.get((method, resource, action))
+        if query.get("uploadType") == "resumable" and not handler:
+            self._resumable(method, resource, query, body)
+        elif handler:
+            status, payload = handler(query, body)
+            self._send(status, payload)
+        elif method == "GET" and resource in FACTORIES:
+            self._send(200, self.server.list_page(resource, query))
+        elif method in ("POST", "PUT") and resource in FACTORIES:
+            resource_body = json.loads(body or b"{}")
+            resource_body.setdefault("id", f"{resource}-{next(server.ids)}")
+            self._send(200, resource_body)
+        elif resource == "liveBroadcasts" and action in ("bind", "transition"):
+            self._send(200, {"id": query.get("id"), "status": {"lifeCycleStatus": query.get("broadcastStatus", "ready")}})
+        elif resource == "thumbnails" and action == "set":
+            self._send(200, {"kind": "youtube#thumbnailSetResponse", "items": []})
+        else:
+            self._send(404, {"error": {"code": 404, "message": "Not found", "errors": [{"reason": "notFound"}]}})
+
+    def _resumable(self, method, resource, query, body):
+        """Start a resumable upload session (POST) or take a chunk or status query (PUT)."""
+        server = self.server
+        if method == "POST":
+            upload_id = str(next(server.ids))
+            with server.lock:
+                server.uploads[upload_id] = {"resource": resource, "metadata": json.loads(body or b"{}"), "received": 0,
+                                             "size": int(self.headers.get("X-Upload-Content-Length") or 0),
+                                             "sha256": hashlib.sha256()}
+            location = f"{server.url}/upload/youtube/v3/{resource}?uploadType=resumable&upload_id={upload_id}"
+            self._send(200, None, {"Location": location})
+            return
+        session = server.uploads.get(query.get("upload_id"))
+        if session is None:
+            self._send(404, {"error": {"code": 404, "message": "Upload session not found", "errors": [{"reason": "notFound"}]}})
+            return
+        content_range = re.fullmatch(r"bytes (\*|(\d+)-(\d+))/(\d+|\*)", self.headers.get("Content-Range", ""))
+        with server.lock:
+            if content_range and content_range.group(2) is not None:
+                if server.upload_faults:
+                    server.upload_faults -= 1
+                    self._send(503, {"error": {"code": 503, "message": "Backend Error", "errors": [{"reason": "backendError"}]}})
+                    return
+                if int(content_range.group(2)) == session["received"]:  # Anything else is a resend; ignore it
+                    session["sha256"].update(body)
+                    session["received"] += len(body)
+                if content_range.group(4) != "*":
+                    session["size"] = int(content_range.group(4))
+            received, size = session["received"], session["size"]
+        if size and received >= size:
+            video = dict(session["metadata"], kind=f"youtube#{resource[:-1]}", id=f"upload{query['upload_id']}",
+                         fileDetails={"fileSize": received, "sha256": session["sha256"].hexdigest()},
+                         status=dict(session["metadata"].get("status", {}), uploadStatus="uploaded"))
+            self._send(200, video)
+        else:
+            self._send(308, None, {"Range": f"bytes=0-{received - 1}"} if received else {})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class StandInAPI(ThreadingHTTPServer):
+    """Threaded stand-in server; use as a context manager to run it in the background."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.05, total_items=120):
+        super().__init__(("127.0.0.1", port), StandInHandler)
+        self.latency = latency
+        self.total_items = total_items
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.routes = {}  # (method, resource, action) -> handler(query, body) -> (status, payload)
+        self.uploads = {}  # upload_id -> resumable upload session
+        self.upload_faults = 0  # Fail this many upcoming upload chunks with 503
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def build_kwargs(self):
+        """Keyword arguments for googleapiclient's build() that send every request here.
+
+        client_options moves media uploads to this host but keeps their https scheme, so
+        requests are also built with a class that switches upload URLs to plain http.
+        """
+        from googleapiclient.http import HttpRequest
+
+        secure_url = "https://" + self.url[len("http://"):]
+        plain_url = self.url
+
+        class StandInRequest(HttpRequest):
+            def __init__(self, http, postproc, uri, *args, **kwargs):
+                super().__init__(http, postproc, uri.replace(secure_url, plain_url, 1), *args, **kwargs)
+
+        return {"client_options": {"api_endpoint": self.url}, "requestBuilder": StandInRequest}
+
+    def list_page(self, resource, query):
+        return list_page(resource, query, self.total_items)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInH2:
+    """HTTP/2 cleartext stand-in for list calls (GET only), run on its own event loop thread.
+
+    Clients must use prior knowledge (httpx: http1=False, http2=True). Every stream is
+    answered after latency on its own task, so concurrent requests share one connection;
+    connections counts how many the clients opened.
+    """
+
+    def __init__(self, port=0, latency=0.05, total_items=120):
+        self.port = port
+        self.latency = latency
+        self.total_items = total_items
+        self.requests = 0
+        self.connections = 0
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._connection, "127.0.0.1", self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def _connection(self, reader, writer):
+        self.connections += 1
+        connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        requests, window_open, tasks = {}, asyncio.Event(), set()
+        while data := await reader.read(65536):
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    requests[event.stream_id] = dict(event.headers)
+                elif isinstance(event, h2.events.StreamEnded):
+                    task = asyncio.create_task(self._respond(connection, writer, window_open, event.stream_id,
+                                                             requests.pop(event.stream_id)))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    window_open.set()
+            writer.write(connection.data_to_send())
+            await writer.drain()
+        writer.close()
+
+    async def _respond(self, connection, writer, window_open, stream_id, headers):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        url = urlparse(headers[":path"])
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        match = re.fullmatch(r"/youtube/v3/(\w+)", url.path)
+        if headers[":method"] == "GET" and match and match.group(1) in FACTORIES:
+            status, payload = 200, list_page(match.group(1), query, self.total_items)
+            if "fields" in query:
+                payload = apply_fields(payload, _parse_fields(query["fields"]))
+        else:
+            status, payload = 404, {"error": {"code": 404, "message": "Not found", "errors": [{"reason": "notFound"}]}}
+        body = json.dumps(payload).encode("utf-8")
+        connection.send_headers(stream_id, [(":status", str(status)),
+                                            ("content-type", "application/json; charset=UTF-8"),
+                                            ("content-length", str(len(body)))])
+        while body:
+            window = min(connection.local_flow_control_window(stream_id), connection.max_outbound_frame_size)
+            if window <= 0:
+                window_open.clear()
+                await window_open.wait()
+                continue
+            chunk, body = body[:window], body[window:]
+            connection.send_data(stream_id, chunk, end_stream=not body)
+            writer.write(connection.data_to_send())
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the YouTube API stand-in server.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--items", type=int, default=120, help="items returned by list calls")
+    args = parser.parse_args()
+    server = StandInAPI(args.port, args.latency, args.items)
+    print(f"Stand-in API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Export every broadcast on the channel to CSV or JSON Lines, resumably.
+
+    python broadcast_export.py broadcasts.csv
+    python broadcast_export.py broadcasts.jsonl --format jsonl
+
+Pages are streamed from liveBroadcasts.list (all statuses) straight to the file, so memory stays
+flat however many broadcasts there are. After each page the file is flushed and a checkpoint
+(<output>.checkpoint) records the next page token and the file size. Stop with Ctrl+C and run the
+same command again to continue where it left off without fetching the finished pages again.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from api_fields import list_request
+from stream_session import load_cached_credentials
+
+EXPORT_FIELDS = [
+    "id", "snippet.title", "snippet.scheduledStartTime", "snippet.scheduledEndTime", "snippet.actualStartTime",
+    "snippet.actualEndTime", "status.lifeCycleStatus", "status.privacyStatus", "contentDetails.boundStreamId",
+]
+COLUMNS = ["id", "title", "scheduled_start", "scheduled_end", "actual_start", "actual_end", "status", "privacy",
+           "bound_stream_id"]
+FORMATS = ("csv", "jsonl")
+
+
+def iter_pages(api_service, page_token=None):
+    """Yield (items, next page token) for every page of the channel's broadcasts, starting at page_token."""
+    while True:
+        params = {"pageToken": page_token} if page_token else {}
+        response = list_request(
+            api_service.liveBroadcasts(), EXPORT_FIELDS, "liveBroadcasts.list(export)",
+            paged=True,
+            broadcastStatus="all",
+            broadcastType="all",
+            maxResults=50,
+            **params
+        ).execute()
+        page_token = response.get("nextPageToken")
+        yield response.get("items", []), page_token
+        if not page_token:
+            return
+
+
+def to_record(item):
+    """Flatten one liveBroadcast into the export columns."""
+    snippet, status = item.get("snippet", {}), item.get("status", {})
+    return {
+        "id": item["id"],
+        "title": snippet.get("title", ""),
+        "scheduled_start": snippet.get("scheduledStartTime", ""),
+        "scheduled_end": snippet.get("scheduledEndTime", ""),
+        "actual_start": snippet.get("actualStartTime", ""),
+        "actual_end": snippet.get("actualEndTime", ""),
+        "status": status.get("lifeCycleStatus", ""),
+        "privacy": status.get("privacyStatus", ""),
+        "bound_stream_id": item.get("contentDetails", {}).get("boundStreamId", ""),
+    }
+
+
+def unique_pages(pages, seen_ids=()):
+    """Drop broadcasts already written on the previous page.
+
+    Broadcasts are listed newest first, so one created during the export pushes the last item of
+    a page onto the next page. Remembering one page of IDs is enough to catch that.
+    """
+    previous = set(seen_ids)
+    for items, next_token in pages:
+        records = [to_record(item) for item in items if item["id"] not in previous]
+        previous = {item["id"] for item in items}
+        yield records, next_token, sorted(previous)
+
+
+class BroadcastExport:
+    """Stream the channel's broadcasts into a CSV or JSON Lines file with a checkpoint after every page."""
+
+    def __init__(self, credentials, path, fmt=None, on_progress=None):
+        self.credentials = credentials
+        self.path = path
+        self.format = fmt or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown export format '{self.format}'; use one of {', '.join(FORMATS)}.")
+        self.checkpoint_path = path + ".checkpoint"
+        self.on_progress = on_progress  # on_progress(rows written, pages fetched this run)
+        self._stop = threading.Event()
+
+    def checkpoint(self):
+        """Return the saved checkpoint of an unfinished export to this path, or None."""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r") as file:
+            checkpoint = json.load(file)
+        if checkpoint["format"] != self.format:
+            raise ValueError(f"{self.path} has an unfinished {checkpoint['format']} export; finish or delete it first.")
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint):
+        with open(self.checkpoint_path + ".tmp", "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def stop(self):
+        """Stop after the page being written; run() continues from there next time."""
+        self._stop.set()
+
+    def run(self, restart=False):
+        """Export everything, resuming an unfinished export unless restart is set.
+
+        Returns {"rows", "pages", "resumed_from", "seconds", "complete"}.
+        """
+        self._stop.clear()
+        started = time.perf_counter()
+        checkpoint = None if restart else self.checkpoint()
+        if checkpoint:
+            # Anything written after the last checkpoint belongs to a page that will be fetched again
+            with open(self.path, "r+b") as file:
+                file.truncate(checkpoint["bytes"])
+            logging.info(f"Resuming export to {self.path} after {checkpoint['rows']} broadcasts.")
+        else:
+            checkpoint = {"format": self.format, "page_token": None, "rows": 0, "bytes": 0, "previous_ids": []}
+        resumed_from = checkpoint["rows"]
+        api_service = build("youtube", "v3", credentials=self.credentials)
+        pages = 0
+        complete = False
+        with open(self.path, "a" if checkpoint["bytes"] else "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=COLUMNS) if self.format == "csv" else None
+            if writer and not checkpoint["bytes"]:
+                writer.writeheader()
+            try:
+                for records, next_token, page_ids in unique_pages(iter_pages(api_service, checkpoint["page_token"]),
+                                                                   checkpoint["previous_ids"]):
+                    for record in records:
+                        if writer:
+                            writer.writerow(record)
+                        else:
+                            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+                    pages += 1
+                    checkpoint.update(page_token=next_token, rows=checkpoint["rows"] + len(records),
+                                      bytes=os.path.getsize(self.path), previous_ids=page_ids)
+                    self._save_checkpoint(checkpoint)
+                    if self.on_progress:
+                        self.on_progress(checkpoint["rows"], pages)
+                    if not next_token:
+                        complete = True
+                    elif self._stop.is_set():
+                        break
+            except HttpError as e:
+                if e.resp.status == 400 and "pageToken" in str(e):
+                    raise ValueError(f"The saved page token has expired; restart the export to {self.path}.") from e
+                raise
+        if complete:
+            os.remove(self.checkpoint_path)
+        seconds = time.perf_counter() - started
+        logging.info(f"{'Exported' if complete else 'Paused export of'} {checkpoint['rows']} broadcasts to "
+                     f"{self.path} ({pages} pages in {seconds:.1f} s).")
+        return {"rows": checkpoint["rows"], "pages": pages, "resumed_from": resumed_from,
+                "seconds": seconds, "complete": complete}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="file to write (.csv or .jsonl)")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the output file's extension")
+    parser.add_argument("--restart", action="store_true", help="ignore an unfinished export and start over")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    credentials = load_cached_credentials()
+    if credentials is None:
+        print("Error: not authenticated; use the app's Authenticate button first.", file=sys.stderr)
+        sys.exit(1)
+    export = BroadcastExport(credentials, args.output, args.format,
+                             on_progress=lambda rows, pages: print(f"\r{rows} broadcasts", end="", flush=True))
+    try:
+        result = export.run(restart=args.restart)
+    except KeyboardInterrupt:
+        print("\nStopped; run the same command again to resume.", file=sys.stderr)
+        sys.exit(130)
+    print(f"\n{result['rows']} broadcasts written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
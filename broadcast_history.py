@@ -0,0 +1,300 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from api_fields import list_request
+
+HISTORY_PATH = "broadcast_history.db"
+
+# Fields read from each liveBroadcasts.list item; etag tells us whether a stored row is stale
+BROADCAST_FIELDS = [
+    "id", "etag",
+    "snippet.title", "snippet.description",
+    "snippet.scheduledStartTime", "snippet.scheduledEndTime",
+    "snippet.actualStartTime", "snippet.actualEndTime",
+    "status.lifeCycleStatus", "status.privacyStatus",
+    "contentDetails.boundStreamId",
+]
+COLUMNS = ("id", "etag", "title", "description", "scheduled_start", "scheduled_end",
+           "actual_start", "actual_end", "status", "privacy", "stream_id")
+
+
+def normalize_timestamp(value):
+    """Return an RFC 3339 timestamp as 'YYYY-MM-DDTHH:MM:SSZ' in UTC, which sorts as text; None stays None."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def month_bounds(year, month):
+    """Return the UTC start and end of a local calendar month, as stored timestamps."""
+    start = datetime(year, month, 1).astimezone()
+    end = datetime(year + month // 12, month % 12 + 1, 1).astimezone()
+    return (start.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            end.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+
+def _to_row(item):
+    snippet = item.get("snippet", {})
+    status = item.get("status", {})
+    return (
+        item["id"], item.get("etag"), snippet.get("title", ""), snippet.get("description", ""),
+        normalize_timestamp(snippet.get("scheduledStartTime")), normalize_timestamp(snippet.get("scheduledEndTime")),
+        normalize_timestamp(snippet.get("actualStartTime")), normalize_timestamp(snippet.get("actualEndTime")),
+        status.get("lifeCycleStatus"), status.get("privacyStatus"),
+        item.get("contentDetails", {}).get("boundStreamId"),
+    )
+
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query matching every word as a prefix, ignoring FTS syntax."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class BroadcastHistory:
+    """Local SQLite copy of the channel's broadcasts, synced incrementally and queried without API calls."""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS broadcasts (
+                id TEXT PRIMARY KEY,
+                etag TEXT,
+                title TEXT NOT NULL DEFAULT '',
+                description TEXT NOT NULL DEFAULT '',
+                scheduled_start TEXT,
+                scheduled_end TEXT,
+                actual_start TEXT,
+                actual_end TEXT,
+                status TEXT,
+                privacy TEXT,
+                stream_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS broadcasts_title ON broadcasts (title COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS broadcasts_scheduled_start ON broadcasts (scheduled_start);
+            CREATE INDEX IF NOT EXISTS broadcasts_status ON broadcasts (status, scheduled_start);
+            CREATE INDEX IF NOT EXISTS broadcasts_stream ON broadcasts (stream_id, scheduled_start);
+            CREATE TABLE IF NOT EXISTS streams (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL DEFAULT ''
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.full_text = self._create_fts()
+
+    def _create_fts(self):
+        """Create the title/description full-text index; fall back to LIKE if SQLite lacks FTS5."""
+        try:
+            self._db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS broadcasts_fts USING fts5(
+                    title, description, content='broadcasts', content_rowid='rowid'
+                );
+                CREATE TRIGGER IF NOT EXISTS broadcasts_ai AFTER INSERT ON broadcasts BEGIN
+                    INSERT INTO broadcasts_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS broadcasts_ad AFTER DELETE ON broadcasts BEGIN
+                    INSERT INTO broadcasts_fts (broadcasts_fts, rowid, title, description)
+                    VALUES ('delete', old.rowid, old.title, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS broadcasts_au AFTER UPDATE OF title, description ON broadcasts BEGIN
+                    INSERT INTO broadcasts_fts (broadcasts_fts, rowid, title, description)
+                    VALUES ('delete', old.rowid, old.title, old.description);
+                    INSERT INTO broadcasts_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"SQLite has no FTS5 support, searching with LIKE instead: {e}")
+            return False
+
+    def sync(self, api_service, full=False, on_progress=None):
+        """Bring the local copy up to date with liveBroadcasts.list.
+
+        Only rows whose etag changed are written. The API lists the newest broadcasts first, so an
+        incremental sync stops after a page in which every broadcast was unchanged and complete.
+        A full sync reads every page and also removes broadcasts deleted on YouTube.
+        Returns (changed, seen).
+        """
+        started = time.perf_counter()
+        with self._lock:
+            known = dict(self._db.execute("SELECT id, etag FROM broadcasts").fetchall())
+        changed = seen = 0
+        seen_ids = set()
+        request = list_request(
+            api_service.liveBroadcasts(), BROADCAST_FIELDS, "liveBroadcasts.list(history)",
+            paged=True,
+            broadcastStatus="all",
+            broadcastType="all",
+            maxResults=50
+        )
+        while request is not None:
+            response = request.execute()
+            items = response.get("items", [])
+            rows = [_to_row(item) for item in items if known.get(item["id"]) != item.get("etag")]
+            self._upsert(rows)
+            changed += len(rows)
+            seen += len(items)
+            seen_ids.update(item["id"] for item in items)
+            if on_progress:
+                on_progress(seen, changed)
+            settled = all(item.get("status", {}).get("lifeCycleStatus") == "complete" for item in items)
+            if not full and not rows and settled:
+                break
+            request = api_service.liveBroadcasts().list_next(request, response)
+        if full:
+            removed = set(known) - seen_ids
+            if removed:
+                with self._lock:
+                    self._db.executemany("DELETE FROM broadcasts WHERE id = ?", [(bid,) for bid in removed])
+                logging.info(f"Removed {len(removed)} broadcasts deleted on YouTube from history.")
+        self._sync_streams(api_service)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES ('last_sync', ?)",
+                             (datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),))
+        logging.info(f"Broadcast history synced: {changed} of {seen} broadcasts changed "
+                     f"in {time.perf_counter() - started:.2f} s.")
+        return changed, seen
+
+    def _upsert(self, rows):
+        if not rows:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                f"INSERT INTO broadcasts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT (id) DO UPDATE SET "
+                f"{', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])}",
+                rows
+            )
+            self._db.execute("COMMIT")
+
+    def refresh_ids(self, api_service, broadcast_ids):
+        """Re-read specific broadcasts (one quota unit per 50 IDs) so edits start from current data.
+
+        Returns the number of list calls made.
+        """
+        calls = 0
+        for start in range(0, len(broadcast_ids), 50):
+            response = list_request(
+                api_service.liveBroadcasts(), BROADCAST_FIELDS, "liveBroadcasts.list(refresh)",
+                id=",".join(broadcast_ids[start:start + 50]),
+                maxResults=50
+            ).execute()
+            self._upsert([_to_row(item) for item in response.get("items", [])])
+            calls += 1
+        return calls
+
+    def get(self, broadcast_ids):
+        """Return {id: row} for the given IDs that are in the history."""
+        rows = {}
+        for start in range(0, len(broadcast_ids), 500):
+            chunk = broadcast_ids[start:start + 500]
+            with self._lock:
+                found = self._db.execute(
+                    f"SELECT * FROM broadcasts WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            rows.update((row["id"], dict(row)) for row in found)
+        return rows
+
+    def _sync_streams(self, api_service):
+        """Refresh stream key titles, so broadcasts can be filtered by key name."""
+        streams = []
+        request = list_request(
+            api_service.liveStreams(), ["id", "snippet.title"], "liveStreams.list(history)",
+            paged=True,
+            mine=True,
+            maxResults=50
+        )
+        while request is not None:
+            response = request.execute()
+            streams.extend((item["id"], item["snippet"]["title"]) for item in response.get("items", []))
+            request = api_service.liveStreams().list_next(request, response)
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO streams (id, title) VALUES (?, ?)", streams)
+
+    def last_sync(self):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM sync_state WHERE name = 'last_sync'").fetchone()
+        return row[0] if row else None
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM broadcasts").fetchone()[0]
+
+    def query(self, text=None, start=None, end=None, status=None, stream_id=None, limit=200):
+        """Return broadcasts matching every given filter, newest first.
+
+        text is matched against titles and descriptions (word prefixes), start/end bound the
+        scheduled start time (stored UTC timestamps, end exclusive).
+        """
+        clauses, params = [], []
+        source = "broadcasts b LEFT JOIN streams s ON s.id = b.stream_id"
+        order = "b.scheduled_start DESC"
+        if text and self.full_text and _fts_query(text):
+            source += " JOIN broadcasts_fts ON broadcasts_fts.rowid = b.rowid"
+            clauses.append("broadcasts_fts MATCH ?")
+            params.append(_fts_query(text))
+            order = "bm25(broadcasts_fts), " + order
+        elif text:
+            clauses.append("(b.title LIKE ? OR b.description LIKE ?)")
+            params.extend([f"%{text}%"] * 2)
+        if start:
+            clauses.append("b.scheduled_start >= ?")
+            params.append(start)
+        if end:
+            clauses.append("b.scheduled_start < ?")
+            params.append(end)
+        if status:
+            clauses.append("b.status = ?")
+            params.append(status)
+        if stream_id:
+            clauses.append("b.stream_id = ?")
+            params.append(stream_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT b.*, s.title AS stream_title FROM {source} {where} ORDER BY {order} LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(sql, (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def in_month(self, year, month, **filters):
+        """Return broadcasts scheduled in a local calendar month ("what did we stream in March")."""
+        start, end = month_bounds(year, month)
+        return self.query(start=start, end=end, **filters)
+
+    def monthly_report(self, year=None):
+        """Return per-month broadcast counts and streamed hours, newest month first."""
+        sql = """
+            SELECT strftime('%Y-%m', scheduled_start, 'localtime') AS month,
+                   COUNT(*) AS broadcasts,
+                   SUM(status = 'complete') AS completed,
+                   ROUND(SUM(COALESCE((julianday(actual_end) - julianday(actual_start)) * 24, 0)), 1) AS hours
+            FROM broadcasts
+            WHERE scheduled_start IS NOT NULL {year_filter}
+            GROUP BY month ORDER BY month DESC
+        """
+        params = ()
+        if year:
+            start, _ = month_bounds(year, 1)
+            _, end = month_bounds(year, 12)
+            sql = sql.format(year_filter="AND scheduled_start >= ? AND scheduled_start < ?")
+            params = (start, end)
+        else:
+            sql = sql.format(year_filter="")
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params).fetchall()]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
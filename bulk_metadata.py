@@ -0,0 +1,225 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from api_fields import list_request, projected
+from thumbnails import overlay_values
+
+UPDATE_COST = 50  # Quota units per liveBroadcasts.update or videos.update
+LIST_COST = 1  # Quota units per list call (up to 50 IDs)
+DEFAULT_CONCURRENCY = 8
+
+# Writable fields of each part an update can send. An update replaces every writable field of the
+# parts it names, so each is read first and sent back unchanged unless the edit changes it.
+VIDEO_SNIPPET_FIELDS = ("title", "description", "tags", "categoryId", "defaultLanguage", "defaultAudioLanguage")
+VIDEO_STATUS_FIELDS = ("privacyStatus", "embeddable", "license", "publicStatsViewable", "publishAt",
+                       "selfDeclaredMadeForKids", "containsSyntheticMedia")
+BROADCAST_STATUS_FIELDS = ("privacyStatus", "selfDeclaredMadeForKids")
+
+
+def render_template(template, row):
+    """Fill a title/description template from a history row.
+
+    Placeholders: {title}, {name}, {date}, {time} (as in thumbnail templates) and {description}.
+    """
+    values = {"description": row["description"] or ""}
+    if row["scheduled_start"]:
+        values.update(overlay_values({"snippet": {"title": row["title"], "scheduledStartTime": row["scheduled_start"]}}))
+    else:
+        values.update({"title": row["title"], "name": row["title"].split(" | ")[0], "date": "", "time": ""})
+    try:
+        return template.format(**values)
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"Unknown placeholder {e} in template '{template}'.")
+
+
+def desired_changes(row, edit, video_snippet=None):
+    """Return {field: (old, new)} for the fields this edit actually changes on one broadcast.
+
+    edit may hold "title_template", "description_template", "privacy", "add_tags" and "remove_tags".
+    """
+    changes = {}
+    if edit.get("title_template"):
+        title = render_template(edit["title_template"], row)
+        if title != row["title"]:
+            changes["title"] = (row["title"], title)
+    if edit.get("description_template"):
+        description = render_template(edit["description_template"], row)
+        if description != (row["description"] or ""):
+            changes["description"] = (row["description"], description)
+    if edit.get("privacy") and edit["privacy"] != row["privacy"]:
+        changes["privacy"] = (row["privacy"], edit["privacy"])
+    if video_snippet is not None and (edit.get("add_tags") or edit.get("remove_tags")):
+        tags = list(video_snippet.get("tags", []))
+        removed = {tag.lower() for tag in edit.get("remove_tags", [])}
+        new_tags = [tag for tag in tags if tag.lower() not in removed]
+        new_tags += [tag for tag in edit.get("add_tags", []) if tag.lower() not in {t.lower() for t in new_tags}]
+        if new_tags != tags:
+            changes["tags"] = (tags, new_tags)
+    return changes
+
+
+def _status_body(status, fields, privacy):
+    """Return the current writable status fields with the new privacy."""
+    body = {key: status[key] for key in fields if status.get(key) is not None}
+    body["privacyStatus"] = privacy
+    if privacy != "private":
+        body.pop("publishAt", None)  # A scheduled publish time is only allowed on private videos
+    return body
+
+
+def build_update(row, changes, video=None, broadcast_status=None):
+    """Return (method, part, body) for the single update call that applies changes.
+
+    Updates replace every writable field of the parts they name, so the bodies carry the
+    current values of the fields that are not changing: video is {"snippet", "status"} from
+    videos.list (needed when tags change), broadcast_status the liveBroadcast's status
+    (needed when only the privacy of a broadcast changes).
+    """
+    title = changes.get("title", (None, row["title"]))[1]
+    description = changes.get("description", (None, row["description"] or ""))[1]
+    parts, body = [], {"id": row["id"]}
+    if "tags" in changes:
+        # Tags only exist on the video resource; videos.update can set the rest in the same call
+        snippet = dict(video["snippet"], title=title, description=description, tags=changes["tags"][1])
+        body["snippet"] = {key: snippet[key] for key in VIDEO_SNIPPET_FIELDS if snippet.get(key) is not None}
+        parts.append("snippet")
+        if "privacy" in changes:
+            body["status"] = _status_body(video["status"], VIDEO_STATUS_FIELDS, changes["privacy"][1])
+            parts.append("status")
+        return "videos", ",".join(parts), body
+    if "title" in changes or "description" in changes:
+        body["snippet"] = {"title": title, "description": description, "scheduledStartTime": row["scheduled_start"]}
+        if row["scheduled_end"]:
+            body["snippet"]["scheduledEndTime"] = row["scheduled_end"]
+        parts.append("snippet")
+    if "privacy" in changes:
+        body["status"] = _status_body(broadcast_status, BROADCAST_STATUS_FIELDS, changes["privacy"][1])
+        parts.append("status")
+    return "liveBroadcasts", ",".join(parts), body
+
+
+class BulkMetadataEditor:
+    """Plan and apply one metadata edit across many broadcasts, updating only those that change."""
+
+    def __init__(self, pool, history, concurrency=DEFAULT_CONCURRENCY, on_progress=None):
+        self.pool = pool  # http_pool.HttpPool; each update checks out its own service
+        self.history = history
+        self.concurrency = concurrency
+        self.on_progress = on_progress  # on_progress(done, total, broadcast_id, error)
+
+    def _videos(self, api_service, broadcast_ids):
+        """Return {id: {"snippet", "status"}} with the writable video fields."""
+        videos = {}
+        for start in range(0, len(broadcast_ids), 50):
+            response = list_request(
+                api_service.videos(),
+                ["id"] + [f"snippet.{key}" for key in VIDEO_SNIPPET_FIELDS]
+                + [f"status.{key}" for key in VIDEO_STATUS_FIELDS],
+                "videos.list(metadata)",
+                id=",".join(broadcast_ids[start:start + 50]),
+                maxResults=50
+            ).execute()
+            videos.update((item["id"], {"snippet": item.get("snippet", {}), "status": item.get("status", {})})
+                          for item in response.get("items", []))
+        return videos
+
+    def _broadcast_statuses(self, api_service, broadcast_ids):
+        """Return {id: status} with the writable liveBroadcast status fields."""
+        statuses = {}
+        for start in range(0, len(broadcast_ids), 50):
+            response = list_request(
+                api_service.liveBroadcasts(), ["id"] + [f"status.{key}" for key in BROADCAST_STATUS_FIELDS],
+                "liveBroadcasts.list(status)",
+                id=",".join(broadcast_ids[start:start + 50]),
+                maxResults=50
+            ).execute()
+            statuses.update((item["id"], item.get("status", {})) for item in response.get("items", []))
+        return statuses
+
+    def plan(self, broadcast_ids, edit):
+        """Dry run: refresh the broadcasts, diff them against the edit and price the result.
+
+        Returns {"updates": [...], "unchanged": n, "missing": [...], "read_cost", "write_cost"};
+        each update is {"id", "title", "changes", "method", "part", "body"}. Nothing is written.
+        """
+        broadcast_ids = list(dict.fromkeys(broadcast_ids))
+        with self.pool.service() as api_service:
+            read_calls = self.history.refresh_ids(api_service, broadcast_ids)
+            videos, statuses = {}, {}
+            if edit.get("add_tags") or edit.get("remove_tags"):
+                videos = self._videos(api_service, broadcast_ids)
+                read_calls += -(-len(broadcast_ids) // 50)
+            elif edit.get("privacy"):
+                statuses = self._broadcast_statuses(api_service, broadcast_ids)
+                read_calls += -(-len(broadcast_ids) // 50)
+        rows = self.history.get(broadcast_ids)
+        updates, unchanged = [], 0
+        for broadcast_id in broadcast_ids:
+            if broadcast_id not in rows:
+                continue
+            row = rows[broadcast_id]
+            video = videos.get(broadcast_id)
+            changes = desired_changes(row, edit, video["snippet"] if video else None)
+            if not changes:
+                unchanged += 1
+                continue
+            method, part, body = build_update(row, changes, video, statuses.get(broadcast_id, {}))
+            updates.append({"id": broadcast_id, "title": row["title"], "changes": changes,
+                            "method": method, "part": part, "body": body})
+        return {
+            "updates": updates,
+            "unchanged": unchanged,
+            "missing": [broadcast_id for broadcast_id in broadcast_ids if broadcast_id not in rows],
+            "read_cost": read_calls * LIST_COST,
+            "write_cost": len(updates) * UPDATE_COST,
+        }
+
+    def _apply_one(self, update):
+        with self.pool.service() as api_service:
+            projected(
+                getattr(api_service, update["method"])().update, ["id"], f"{update['method']}.update",
+                part=update["part"],
+                body=update["body"]
+            ).execute()
+
+    def apply(self, plan):
+        """Send the planned updates concurrently; return {"updated": [...], "failed": {id: error}}."""
+        updated, failed = [], {}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="metadata") as executor:
+            futures = {executor.submit(self._apply_one, update): update["id"] for update in plan["updates"]}
+            for done, future in enumerate(as_completed(futures), start=1):
+                broadcast_id = futures[future]
+                try:
+                    future.result()
+                    updated.append(broadcast_id)
+                    error = None
+                except Exception as e:
+                    logging.error(f"Failed to update metadata of {broadcast_id}: {e}")
+                    failed[broadcast_id] = str(e)
+                    error = e
+                if self.on_progress:
+                    self.on_progress(done, len(futures), broadcast_id, error)
+        if updated:
+            with self.pool.service() as api_service:
+                self.history.refresh_ids(api_service, updated)
+        logging.info(f"Bulk metadata edit: {len(updated)} updated, {len(failed)} failed.")
+        return {"updated": updated, "failed": failed}
+
+
+def format_plan(plan, limit=20):
+    """Describe a dry-run plan: the cost, then one line per changed field of the first updates."""
+    lines = [
+        f"{len(plan['updates'])} broadcasts change, {plan['unchanged']} already match"
+        + (f", {len(plan['missing'])} not found" if plan["missing"] else "") + ".",
+        f"Quota: {plan['write_cost']} units for updates (+{plan['read_cost']} already spent reading).",
+        "",
+    ]
+    for update in plan["updates"][:limit]:
+        lines.append(f"{update['title']} ({update['method']}.update, part={update['part']})")
+        for field, (old, new) in update["changes"].items():
+            if field == "description":
+                old, new = f"{len(old or '')} chars", f"{len(new)} chars"
+            lines.append(f"    {field}: {old!r} -> {new!r}")
+    if len(plan["updates"]) > limit:
+        lines.append(f"... and {len(plan['updates']) - limit} more")
+    return "\n".join(lines)
@@ -0,0 +1,131 @@
+"""Thin client for control_daemon.py, usable as a library or from the command line.
+
+    python control_client.py status
+    python control_client.py list
+    python control_client.py create "Sunday Service" 09:30 11:00 --privacy unlisted
+    python control_client.py start <broadcast_id>
+    python control_client.py stop <broadcast_id>
+    python control_client.py obs stream-start | stream-stop | record-start | record-stop | status
+
+Hotkey tools such as a Stream Deck can run these commands or send the same HTTP
+requests directly (see control_daemon.py for the endpoints).
+"""
+import argparse
+import http.client
+import json
+import sys
+from datetime import datetime
+
+from control_protocol import DAEMON_INFO_FILE, local_time_to_iso
+
+
+class ControlClientError(Exception):
+    """Raised when the daemon is unreachable or rejects a request."""
+
+
+class ControlClient:
+    """Keep-alive HTTP client for the local control daemon."""
+
+    def __init__(self, info_file=DAEMON_INFO_FILE, timeout=30):
+        try:
+            with open(info_file, "r") as file:
+                info = json.load(file)
+        except FileNotFoundError:
+            raise ControlClientError("Control daemon is not running (no control_daemon.json).")
+        self.token = info["token"]
+        self.connection = http.client.HTTPConnection("127.0.0.1", info["port"], timeout=timeout)
+
+    def request(self, method, path, body=None):
+        """Send a request and return the decoded JSON response."""
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"X-Control-Token": self.token, "Content-Type": "application/json"}
+        try:
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = json.loads(response.read() or b"{}")
+        except (ConnectionError, OSError) as e:
+            self.connection.close()
+            raise ControlClientError(f"Cannot reach control daemon: {e}")
+        if response.status != 200:
+            raise ControlClientError(data.get("error", f"HTTP {response.status}"))
+        return data
+
+    def status(self):
+        return self.request("GET", "/status")
+
+    def list_broadcasts(self, refresh=False):
+        return self.request("GET", "/broadcasts" + ("?refresh=1" if refresh else ""))
+
+    def list_stream_keys(self, refresh=False):
+        return self.request("GET", "/stream-keys" + ("?refresh=1" if refresh else ""))
+
+    def list_playlists(self, refresh=False):
+        return self.request("GET", "/playlists" + ("?refresh=1" if refresh else ""))
+
+    def create_broadcast(self, title, start_time, end_time, privacy="unlisted"):
+        return self.request("POST", "/broadcasts", {
+            "title": title, "start_time": start_time, "end_time": end_time, "privacy": privacy
+        })
+
+    def start_broadcast(self, broadcast_id):
+        return self.request("POST", f"/broadcasts/{broadcast_id}/start", {})
+
+    def stop_broadcast(self, broadcast_id):
+        return self.request("POST", f"/broadcasts/{broadcast_id}/stop", {})
+
+    def obs(self, action):
+        """Run an OBS action: status, connect, stream-start, stream-stop, record-start or record-stop."""
+        if action == "status":
+            return self.request("GET", "/obs/status")
+        if action == "connect":
+            return self.request("POST", "/obs/connect", {})
+        output, verb = action.split("-")
+        return self.request("POST", f"/obs/{output}/{verb}", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control the YouTube Live Stream Manager daemon.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+    list_parser = commands.add_parser("list")
+    list_parser.add_argument("--refresh", action="store_true")
+    create_parser = commands.add_parser("create")
+    create_parser.add_argument("title")
+    create_parser.add_argument("start", help="local start time today, HH:MM")
+    create_parser.add_argument("end", help="local end time today, HH:MM")
+    create_parser.add_argument("--privacy", default="unlisted", choices=["public", "unlisted", "private"])
+    for name in ("start", "stop"):
+        commands.add_parser(name).add_argument("broadcast_id")
+    obs_parser = commands.add_parser("obs")
+    obs_parser.add_argument("action", choices=["status", "connect", "stream-start", "stream-stop",
+                                               "record-start", "record-stop"])
+    args = parser.parse_args()
+
+    try:
+        client = ControlClient()
+        if args.command == "status":
+            result = client.status()
+        elif args.command == "list":
+            result = client.list_broadcasts(args.refresh)
+        elif args.command == "create":
+            today = datetime.now().date()
+            result = client.create_broadcast(
+                args.title,
+                local_time_to_iso(today, datetime.strptime(args.start, "%H:%M").time()),
+                local_time_to_iso(today, datetime.strptime(args.end, "%H:%M").time()),
+                args.privacy
+            )
+        elif args.command == "start":
+            result = client.start_broadcast(args.broadcast_id)
+        elif args.command == "stop":
+            result = client.stop_broadcast(args.broadcast_id)
+        else:
+            result = client.obs(args.action)
+    except ControlClientError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Local control daemon that keeps a YouTube/OBS session warm for thin clients.
+
+Run it once (it reuses the credentials cached by the GUI):
+
+    python control_daemon.py [--port 8765]
+
+It listens on 127.0.0.1 only and writes its port and a random access token to
+control_daemon.json. Every request must send that token in the X-Control-Token
+header; control_client.py does this for you. Endpoints (JSON in, JSON out):
+
+    GET  /status                      uptime and cache state
+    GET  /broadcasts[?refresh=1]      upcoming/active broadcasts
+    GET  /stream-keys[?refresh=1]     streams on the channel
+    GET  /playlists[?refresh=1]       playlists on the channel
+    POST /broadcasts                  {"title", "start_time", "end_time", "privacy"}
+    POST /broadcasts/<id>/start       transition ready -> live
+    POST /broadcasts/<id>/stop        transition live -> complete
+    GET  /obs/status                  stream and record output state
+    POST /obs/connect                 (re)connect to OBS
+    POST /obs/stream/start            StartStream
+    POST /obs/stream/stop             StopStream
+    POST /obs/record/start            StartRecord
+    POST /obs/record/stop             StopRecord
+"""
+import argparse
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from control_protocol import DAEMON_INFO_FILE, DEFAULT_PORT
+from stream_session import StreamSession
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """Route JSON requests to the daemon's StreamSession."""
+
+    server_version = "YouTubeStreamManagerDaemon/1.0"
+    protocol_version = "HTTP/1.1"  # Keep-alive, so a client's repeated requests reuse one connection
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self, method):
+        # Read the body before any reply, or its bytes would be parsed as the next request on the connection
+        body = self._read_body()
+        # A custom header cannot be sent cross-origin without a CORS preflight, which this server never
+        # grants, so the token also keeps web pages in the local browser from driving the daemon.
+        token = self.headers.get("X-Control-Token", "")
+        if not hmac.compare_digest(token, self.server.token):
+            self._send(401, {"error": "Missing or invalid X-Control-Token."})
+            return
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        for route_method, pattern, handler in ROUTES:
+            match = re.fullmatch(pattern, url.path)
+            if route_method == method and match:
+                started = time.perf_counter()
+                try:
+                    result = handler(self.server.session, query, json.loads(body) if method == "POST" and body else {},
+                                     *match.groups())
+                    self._send(200, result)
+                except ValueError as e:
+                    self._send(409, {"error": str(e)})
+                except Exception as e:
+                    logging.error(f"Daemon request {method} {url.path} failed: {e}")
+                    self._send(500, {"error": str(e)})
+                logging.info(f"{method} {url.path} handled in {(time.perf_counter() - started) * 1000:.1f} ms")
+                return
+        self._send(404, {"error": f"No route for {method} {url.path}"})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+
+def _refresh(query):
+    return query.get("refresh", ["0"])[0] in ("1", "true")
+
+
+def _status(session, query, body):
+    return {
+        "uptime_seconds": round(time.time() - session.started_at, 1),
+        "authenticated": session.api_service is not None,
+        "obs_connected": session.obs_client is not None,
+        "cached": sorted(session._cache),
+    }
+
+
+def _create_broadcast(session, query, body):
+    for field in ("title", "start_time", "end_time"):
+        if not body.get(field):
+            raise ValueError(f"Missing required field '{field}'.")
+    return session.create_broadcast(body["title"], body["start_time"], body["end_time"],
+                                    body.get("privacy", "unlisted").lower())
+
+
+def _obs_action(action):
+    def handler(session, query, body):
+        session.obs_call(action)
+        return {"ok": True}
+    return handler
+
+
+ROUTES = [
+    ("GET", r"/status", _status),
+    ("GET", r"/broadcasts", lambda session, query, body: session.list_broadcasts(_refresh(query))),
+    ("GET", r"/stream-keys", lambda session, query, body: session.list_stream_keys(_refresh(query))),
+    ("GET", r"/playlists", lambda session, query, body: session.list_playlists(_refresh(query))),
+    ("POST", r"/broadcasts", _create_broadcast),
+    ("POST", r"/broadcasts/([\w-]+)/start", lambda session, query, body, bid: session.transition(bid, "live")),
+    ("POST", r"/broadcasts/([\w-]+)/stop", lambda session, query, body, bid: session.transition(bid, "complete")),
+    ("GET", r"/obs/status", lambda session, query, body: session.obs_status()),
+    ("POST", r"/obs/connect", lambda session, query, body: session.connect_obs() or {"ok": True}),
+    ("POST", r"/obs/stream/start", _obs_action(lambda client: client.start_stream())),
+    ("POST", r"/obs/stream/stop", _obs_action(lambda client: client.stop_stream())),
+    ("POST", r"/obs/record/start", _obs_action(lambda client: client.start_record())),
+    ("POST", r"/obs/record/stop", _obs_action(lambda client: client.stop_record())),
+]
+
+
+class ControlDaemon(ThreadingHTTPServer):
+    """HTTP server bound to localhost that shares one StreamSession between requests."""
+
+    daemon_threads = True
+
+    def __init__(self, session, port=DEFAULT_PORT, token=None):
+        super().__init__(("127.0.0.1", port), ControlRequestHandler)
+        self.session = session
+        self.token = token or secrets.token_urlsafe(32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a YouTube/OBS session warm for thin clients.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--no-obs", action="store_true", help="do not connect to OBS at startup")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    session = StreamSession()
+    session.authenticate()
+    # Warm the caches and the OBS connection so the first client request is fast
+    session.list_broadcasts()
+    session.list_stream_keys()
+    session.list_playlists()
+    if not args.no_obs:
+        try:
+            session.connect_obs()
+        except Exception as e:
+            logging.error(f"Failed to connect to OBS at startup (will retry on first OBS request): {e}")
+
+    server = ControlDaemon(session, args.port)
+    with open(DAEMON_INFO_FILE, "w") as file:
+        json.dump({"port": server.server_address[1], "token": server.token, "pid": os.getpid()}, file)
+    logging.info(f"Control daemon listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        session.close()
+        if os.path.exists(DAEMON_INFO_FILE):
+            os.remove(DAEMON_INFO_FILE)
+        logging.info("Control daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Names and helpers shared by control_daemon.py and control_client.py.
+
+Standard library only, so the thin client starts without importing the YouTube and OBS clients.
+"""
+from datetime import datetime
+
+DAEMON_INFO_FILE = "control_daemon.json"  # Port and access token of the running daemon
+DEFAULT_PORT = 8765
+
+
+def local_time_to_iso(day, time_of_day):
+    """Combine a date and a local time into an RFC 3339 timestamp, as create_live_stream does."""
+    return datetime.combine(day, time_of_day).astimezone().isoformat()
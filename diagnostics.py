@@ -0,0 +1,150 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from datetime import datetime
+
+DIAGNOSTICS_DIR = "diagnostics"
+DEFAULT_STALL_THRESHOLD_MS = 250
+HEARTBEAT_INTERVAL_MS = 50  # How often the GUI thread calls StallWatchdog.beat()
+
+
+class StallWatchdog:
+    """Detect when the GUI thread stops processing events and capture what it is doing.
+
+    The GUI thread calls beat() from a timer; a background thread checks how long ago the last
+    beat was. Once that exceeds the threshold, the GUI thread's current stack is taken with
+    sys._current_frames(), which is exactly the handler that is blocking the event loop.
+    """
+
+    def __init__(self, threshold_ms=DEFAULT_STALL_THRESHOLD_MS, thread_id=None, history=100):
+        self.threshold = threshold_ms / 1000
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stalls = []  # Finished stalls: {"started", "duration_ms", "stack"}
+        self.history = history
+        self.last_beat = time.monotonic()
+        self._stall = None  # Stall in progress
+        self._stop = threading.Event()
+        self._thread = None
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+
+    def start(self):
+        self._stop.clear()
+        self.last_beat = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+        logging.info(f"Stall watchdog started ({self.threshold * 1000:.0f} ms threshold).")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.wait(self.threshold / 4):
+            last_beat = self.last_beat
+            blocked = time.monotonic() - last_beat
+            if self._stall is None and blocked > self.threshold:
+                frame = sys._current_frames().get(self.thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame else "(thread not found)"
+                self._stall = {"beat": last_beat, "started": time.time() - blocked, "stack": stack}
+                logging.warning(f"GUI thread blocked for {blocked * 1000:.0f} ms so far; it is in:\n{stack}")
+            elif self._stall is not None and last_beat != self._stall["beat"]:
+                # The next beat arrived; the gap between beats, less one timer interval, is the stall
+                duration_ms = (last_beat - self._stall["beat"]) * 1000 - HEARTBEAT_INTERVAL_MS
+                stall = {"started": datetime.fromtimestamp(self._stall["started"]).isoformat(timespec="milliseconds"),
+                         "duration_ms": round(duration_ms), "stack": self._stall["stack"]}
+                self.stalls = (self.stalls + [stall])[-self.history:]
+                self._stall = None
+                logging.warning(f"GUI thread stall ended after {duration_ms:.0f} ms.")
+
+
+class Diagnostics:
+    """Runtime switches for cProfile and tracemalloc plus the stall watchdog; dumps go to one folder per session."""
+
+    def __init__(self, output_dir=DIAGNOSTICS_DIR, stall_threshold_ms=DEFAULT_STALL_THRESHOLD_MS):
+        self.output_dir = os.path.join(output_dir, datetime.now().strftime("session-%Y%m%d-%H%M%S"))
+        self.watchdog = StallWatchdog(stall_threshold_ms)
+        self.profiler = None
+        self._memory_baseline = None
+
+    def _path(self, name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"{datetime.now():%H%M%S}-{name}")
+
+    def is_profiling(self):
+        return self.profiler is not None
+
+    def start_profiling(self):
+        """Profile the calling (GUI) thread; cProfile does not follow other threads."""
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+        logging.info("CPU profiling started.")
+
+    def stop_profiling(self, top=40):
+        """Stop profiling and write a .prof file (for pstats/snakeviz) and a text summary; return the .prof path."""
+        self.profiler.disable()
+        path = self._path("profile.prof")
+        self.profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(self.profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+        with open(path[:-len(".prof")] + ".txt", "w") as file:
+            file.write(summary.getvalue())
+        self.profiler = None
+        logging.info(f"CPU profile saved to {path}")
+        return path
+
+    def is_tracing_memory(self):
+        return tracemalloc.is_tracing()
+
+    def start_memory_tracing(self, frames=25):
+        tracemalloc.start(frames)
+        self._memory_baseline = tracemalloc.take_snapshot()
+        logging.info("Memory tracing started.")
+
+    def stop_memory_tracing(self, top=30):
+        """Stop tracing and write the snapshot plus the top allocation growth since tracing started."""
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        path = self._path("memory.tracemalloc")
+        snapshot.dump(path)
+        lines = [f"Traced memory: {current / 1024:.0f} KiB now, {peak / 1024:.0f} KiB peak", ""]
+        lines += [str(stat) for stat in snapshot.compare_to(self._memory_baseline, "lineno")[:top]]
+        with open(path[:-len(".tracemalloc")] + "-growth.txt", "w") as file:
+            file.write("\n".join(lines) + "\n")
+        self._memory_baseline = None
+        logging.info(f"Memory snapshot saved to {path}")
+        return path
+
+    def save_stalls(self):
+        """Write the stalls seen so far; return the path, or None if there were none."""
+        if not self.watchdog.stalls:
+            return None
+        path = os.path.join(self.output_dir, "stalls.json")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.watchdog.stalls, file, indent=2)
+        return path
+
+    def close(self):
+        """Stop everything, saving any profile or trace still running."""
+        self.watchdog.stop()
+        if self.is_profiling():
+            self.stop_profiling()
+        if self.is_tracing_memory() and self._memory_baseline is not None:
+            self.stop_memory_tracing()
+        self.save_stalls()
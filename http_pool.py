@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 60  # Seconds per HTTP request
+ACQUIRE_TIMEOUT = 120  # Seconds a worker waits for a free connection before giving up
+
+
+class SharedCredentials:
+    """Wrap one OAuth credentials object so many AuthorizedHttp transports can share it.
+
+    google-auth credentials are not thread-safe: workers that find the token expired at the
+    same time would each refresh it. Here refreshes happen under a lock, and a worker that
+    waited for the lock skips the refresh if another worker already replaced the token.
+    """
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+        self._lock = threading.Lock()
+        self._applied = threading.local()  # Token this thread last sent
+        self.refreshes = 0
+
+    def _refresh(self, request, stale_token):
+        with self._lock:
+            if self._credentials.token == stale_token:
+                self._credentials.refresh(request)
+                self.refreshes += 1
+                logging.info("Refreshed shared credentials.")
+
+    def before_request(self, request, method, url, headers):
+        if not self._credentials.valid:
+            self._refresh(request, self._credentials.token)
+        self._applied.token = self._credentials.token
+        self._credentials.apply(headers)
+
+    def refresh(self, request):
+        # Called by AuthorizedHttp after a 401 with the token this thread sent
+        self._refresh(request, getattr(self._applied, "token", self._credentials.token))
+
+    def __getattr__(self, name):
+        return getattr(self._credentials, name)
+
+
+class HttpPool:
+    """Pool of API service objects, each with its own httplib2 transport, sharing one set of credentials.
+
+    httplib2.Http and the service built on it must not be used by two threads at once, so a
+    worker checks a service out for the duration of its work:
+
+        with pool.service() as api_service:
+            api_service.liveBroadcasts().list(...).execute()
+
+    Services are created on demand up to size; further workers wait for one to be returned.
+    """
+
+    def __init__(self, credentials, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        if size < 1:
+            raise ValueError("The API connection pool needs at least one connection.")
+        self.credentials = SharedCredentials(credentials)
+        self.size = size
+        self.timeout = timeout
+        self._free = queue.LifoQueue()  # Most recently used first, so its keep-alive connection is warm
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "in_use": 0, "peak_in_use": 0, "checkouts": 0, "waits": 0,
+                       "wait_seconds": 0.0, "max_wait_seconds": 0.0, "timeouts": 0}
+
+    def authorized_http(self):
+        """Return a new transport on the shared credentials, for a thread that keeps its own service."""
+        return AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+
+    def _create(self):
+        return build("youtube", "v3", http=self.authorized_http())
+
+    def _acquire(self):
+        started = time.perf_counter()
+        with self._lock:
+            create = self._free.empty() and self._stats["created"] < self.size
+            if create:
+                self._stats["created"] += 1
+        if create:
+            try:
+                api_service = self._create()
+            except Exception:
+                with self._lock:
+                    self._stats["created"] -= 1
+                raise
+        else:
+            try:
+                api_service = self._free.get(timeout=ACQUIRE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise TimeoutError(f"No API connection became free within {ACQUIRE_TIMEOUT} s "
+                                   f"(pool size {self.size}).") from None
+        waited = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats
+            stats["checkouts"] += 1
+            stats["in_use"] += 1
+            stats["peak_in_use"] = max(stats["peak_in_use"], stats["in_use"])
+            if not create and waited > 0.001:
+                stats["waits"] += 1
+                stats["wait_seconds"] += waited
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        return api_service
+
+    @contextmanager
+    def service(self):
+        """Check out a service for the calling thread's exclusive use."""
+        api_service = self._acquire()
+        try:
+            yield api_service
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._free.put(api_service)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=self.size, refreshes=self.credentials.refreshes)
+
+    def log_summary(self):
+        stats = self.stats()
+        logging.info(
+            f"API connection pool: {stats['checkouts']} checkouts over {stats['created']}/{stats['size']} "
+            f"connections, peak {stats['peak_in_use']} in use, {stats['waits']} waits "
+            f"(max {stats['max_wait_seconds'] * 1000:.0f} ms), {stats['refreshes']} token refreshes."
+        )
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import threading
+from collections import deque
+
+from googleapiclient.errors import HttpError
+
+from api_fields import list_request
+
+CHAT_LOG_DIR = "chat_logs"
+DEFAULT_HISTORY_SIZE = 500  # Messages kept in memory for the on-screen view
+
+# Errors after which polling can never succeed again
+FATAL_CHAT_ERRORS = {"liveChatEnded", "liveChatNotFound", "liveChatDisabled", "forbidden"}
+
+
+def get_live_chat_id(api_service, broadcast_id):
+    """Look up the liveChatId of a broadcast."""
+    response = list_request(
+        api_service.liveBroadcasts(), ["snippet.liveChatId"], "liveBroadcasts.list(chat)",
+        id=broadcast_id
+    ).execute()
+    items = response.get("items", [])
+    if not items:
+        raise ValueError("Broadcast not found.")
+    live_chat_id = items[0]["snippet"].get("liveChatId")
+    if not live_chat_id:
+        raise ValueError("This broadcast has no live chat.")
+    return live_chat_id
+
+
+def format_message(item):
+    """Reduce a liveChatMessage resource to the fields that are displayed and logged."""
+    snippet = item.get("snippet", {})
+    author = item.get("authorDetails", {})
+    return {
+        "id": item.get("id"),
+        "published_at": snippet.get("publishedAt"),
+        "type": snippet.get("type"),
+        "author": author.get("displayName"),
+        "channel_id": author.get("channelId"),
+        "moderator": author.get("isChatModerator", False) or author.get("isChatOwner", False),
+        "text": snippet.get("displayMessage", ""),
+    }
+
+
+def search_chat_log(path, text):
+    """Yield logged messages whose text or author contains the search text (case-insensitive)."""
+    needle = text.lower()
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            message = json.loads(line)
+            if needle in (message.get("text") or "").lower() or needle in (message.get("author") or "").lower():
+                yield message
+
+
+class LiveChatReader:
+    """Poll liveChatMessages.list on a background thread at the server-provided interval."""
+
+    def __init__(self, api_service, live_chat_id, on_messages, on_stopped=None,
+                 history_size=DEFAULT_HISTORY_SIZE, log_dir=CHAT_LOG_DIR):
+        self.api_service = api_service  # Dedicated API service, not shared with the GUI thread
+        self.live_chat_id = live_chat_id
+        self.on_messages = on_messages  # Called with a list of new messages (from the reader thread)
+        self.on_stopped = on_stopped  # Called with a reason string when polling ends
+        self.history = deque(maxlen=history_size)
+        self.log_path = os.path.join(log_dir, f"{live_chat_id}.jsonl")
+        self.next_page_token = None
+        self.polls = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        os.makedirs(log_dir, exist_ok=True)
+
+    def start(self):
+        """Start polling in a daemon thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="live-chat", daemon=True)
+        self._thread.start()
+        logging.info(f"Live chat reader started for {self.live_chat_id}.")
+
+    def stop(self):
+        """Stop polling and wait for the thread to exit."""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def fetch_page(self):
+        """Fetch the next page and return (messages, seconds until the next poll, offlineAt or None)."""
+        response = list_request(
+            self.api_service.liveChatMessages(),
+            ["id", "snippet.type", "snippet.publishedAt", "snippet.displayMessage", "authorDetails.channelId",
+             "authorDetails.displayName", "authorDetails.isChatModerator", "authorDetails.isChatOwner"],
+            "liveChatMessages.list",
+            paged=True,
+            top_level=["pollingIntervalMillis", "offlineAt"],
+            liveChatId=self.live_chat_id,
+            pageToken=self.next_page_token,
+            maxResults=2000
+        ).execute()
+        self.polls += 1
+        self.next_page_token = response.get("nextPageToken")
+        messages = [format_message(item) for item in response.get("items", [])]
+        return messages, response.get("pollingIntervalMillis", 5000) / 1000, response.get("offlineAt")
+
+    def _append_to_log(self, messages):
+        with open(self.log_path, "a", encoding="utf-8") as file:
+            for message in messages:
+                file.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+    def _run(self):
+        reason = "Stopped."
+        delay = 0
+        while not self._stop_event.wait(delay):
+            try:
+                messages, delay, offline_at = self.fetch_page()
+                if messages:
+                    self.history.extend(messages)
+                    self._append_to_log(messages)
+                    self.on_messages(messages)
+                if offline_at:
+                    reason = f"Chat went offline at {offline_at}."
+                    break
+            except HttpError as e:
+                details = e.error_details if isinstance(e.error_details, list) else []
+                error_reason = details[0].get("reason") if details else None
+                if error_reason in FATAL_CHAT_ERRORS:
+                    reason = f"Live chat unavailable: {error_reason}"
+                    break
+                # Back off on transient errors instead of hammering the quota
+                logging.error(f"Live chat poll failed: {e}")
+                delay = max(delay, 10)
+            except Exception as e:
+                logging.error(f"Live chat poll failed: {e}")
+                delay = max(delay, 10)
+        logging.info(f"Live chat reader for {self.live_chat_id} stopped after {self.polls} polls: {reason}")
+        if self.on_stopped:
+            self.on_stopped(reason)
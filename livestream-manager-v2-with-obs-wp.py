@@ -3,9 +3,15 @@ import os
 import pickle
 import logging
 import json
+import threading
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QAction, QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QPushButton, QVBoxLayout,
-    QLineEdit, QLabel, QWidget, QComboBox, QTimeEdit, QMessageBox, QListWidget
+    QLineEdit, QLabel, QWidget, QComboBox, QTimeEdit, QMessageBox, QListWidget, QDialog, QHBoxLayout,
+    QInputDialog, QCheckBox
 )
 from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
@@ -13,6 +19,28 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from datetime import datetime, timezone, timedelta
 from PIL import Image
 import obsws_python as obs
+from stream_health import HealthMonitor, HealthSampler
+from telemetry_store import TelemetryStore
+from live_chat import LiveChatReader, get_live_chat_id
+from vod_upload import DEFAULT_CHUNK_SIZE, INSERT_COST as VIDEO_INSERT_COST, VodUploader, find_last_recording
+from thumbnails import (BatchThumbnailJob, best_frame, capture_frame, frame_to_thumbnail, load_thumbnail_template,
+                        prepare_thumbnail, upload_thumbnail_bytes)
+from api_fields import API_STATS, list_request
+from stream_session import get_lifecycle_status
+from broadcast_export import BroadcastExport
+from broadcast_history import BroadcastHistory
+from bulk_metadata import BulkMetadataEditor, format_plan
+from diagnostics import DEFAULT_STALL_THRESHOLD_MS, HEARTBEAT_INTERVAL_MS, Diagnostics
+from obs_pool import ObsPool, obs_endpoints, primary_endpoint, summarize
+from obs_provisioning import provision_obs
+from obs_scenes import DEFAULT_HOTKEYS, SceneCache, switch_scene
+from obs_watchdog import DEFAULT_RESTART_DEADLINE, OutputWatchdog, outage_summary
+from playlist_bulk import INSERT_COST, BulkPlaylistAdd, PlaylistIndex, plan_playlist_add
+from http_pool import DEFAULT_POOL_SIZE, HttpPool
+from post_stream_pipeline import BLOCKED, FAILED, PostStreamPipeline, load_post_stream_config
+from schedule_conflicts import ScheduleIndex, describe, find_conflicts, read_plan, validate_plan
+from preflight import FAIL, PASS, format_report, run_preflight
+from operation_journal import OperationJournal, apply_operation, is_network_error, keep_file, replay
 
 # Configure logging
 log_file = "youtube_live_stream_manager.log"
@@ -26,6 +54,216 @@ logging.basicConfig(
 )
 
 OBS_CONFIG_FILE = "obs_config.json"
+TELEMETRY_DIR = "telemetry"
+JOURNAL_REPLAY_INTERVAL_MS = 30000  # How often queued operations are retried while any are pending
+
+
+class WorkerSignals(QObject):
+    """Signals used to hand results from background threads to the GUI thread."""
+    health_sample = pyqtSignal(dict)
+    health_alert = pyqtSignal(str, str, bool)
+    chat_messages = pyqtSignal(list)
+    chat_stopped = pyqtSignal(str)
+    task_finished = pyqtSignal(object, object, object)  # callback, result, error
+    activity = pyqtSignal(str)
+    scenes_changed = pyqtSignal()
+    post_stream_status = pyqtSignal(str, str, str, str)  # broadcast_id, job, status, detail
+
+
+class BroadcastHistoryDialog(QDialog):
+    """Search the local broadcast history by text, month and status without any API calls."""
+
+    def __init__(self, history, on_sync, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.setWindowTitle("Broadcast History")
+        self.resize(700, 500)
+        layout = QVBoxLayout(self)
+
+        self.input_search = QLineEdit()
+        self.input_search.setPlaceholderText("Search titles and descriptions")
+        self.input_search.textChanged.connect(self.refresh)
+        layout.addWidget(self.input_search)
+
+        filters = QHBoxLayout()
+        self.combo_month = QComboBox()
+        self.combo_month.currentIndexChanged.connect(self.refresh)
+        filters.addWidget(self.combo_month)
+        self.combo_status = QComboBox()
+        self.combo_status.addItem("Any status", None)
+        for status in ("upcoming", "ready", "testing", "live", "complete"):
+            self.combo_status.addItem(status.capitalize(), status)
+        self.combo_status.currentIndexChanged.connect(self.refresh)
+        filters.addWidget(self.combo_status)
+        layout.addLayout(filters)
+
+        self.list_results = QListWidget()
+        layout.addWidget(self.list_results)
+
+        self.label_summary = QLabel()
+        layout.addWidget(self.label_summary)
+
+        self.button_sync = QPushButton("Full Sync with YouTube")
+        self.button_sync.clicked.connect(lambda: on_sync(full=True))
+        layout.addWidget(self.button_sync)
+
+        self.reload()
+
+    def reload(self):
+        """Refill the month filter from the monthly report, keeping the current choice, and rerun the query."""
+        selected = self.combo_month.currentData()
+        self.combo_month.blockSignals(True)
+        self.combo_month.clear()
+        self.combo_month.addItem("Any month", None)
+        for row in self.history.monthly_report():
+            year, month = (int(part) for part in row["month"].split("-"))
+            self.combo_month.addItem(
+                f"{datetime(year, month, 1).strftime('%B %Y')} ({row['broadcasts']} broadcasts, {row['hours']} h)",
+                (year, month)
+            )
+        index = self.combo_month.findData(selected)
+        self.combo_month.setCurrentIndex(max(index, 0))
+        self.combo_month.blockSignals(False)
+        self.refresh()
+
+    def refresh(self):
+        """Run the current search against the local database."""
+        started = time.perf_counter()
+        filters = {"text": self.input_search.text().strip() or None, "status": self.combo_status.currentData()}
+        if self.combo_month.currentData():
+            results = self.history.in_month(*self.combo_month.currentData(), **filters)
+        else:
+            results = self.history.query(**filters)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.list_results.clear()
+        for row in results:
+            scheduled = ""
+            if row["scheduled_start"]:
+                scheduled = datetime.fromisoformat(row["scheduled_start"].replace("Z", "+00:00")).astimezone()
+                scheduled = scheduled.strftime("%Y-%m-%d %H:%M")
+            stream = row["stream_title"] or row["stream_id"] or "no stream"
+            self.list_results.addItem(f"{scheduled} | {row['title']} | {row['status']} | {row['privacy']} | {stream}")
+        last_sync = self.history.last_sync() or "never"
+        self.label_summary.setText(
+            f"{len(results)} of {self.history.count()} broadcasts in {elapsed_ms:.1f} ms (last sync: {last_sync})"
+        )
+
+
+class BulkEditDialog(QDialog):
+    """Apply a title/description template, privacy or tag change to many broadcasts, previewing the diff first."""
+
+    def __init__(self, history, editor, run_in_background, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.editor = editor
+        self.run_in_background = run_in_background
+        self.plan = None
+        self.setWindowTitle("Bulk Edit Metadata")
+        self.resize(700, 600)
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel("Broadcasts (search the local history):"))
+        selection = QHBoxLayout()
+        self.input_search = QLineEdit()
+        self.input_search.setPlaceholderText("Title or description words; empty selects all")
+        selection.addWidget(self.input_search)
+        self.combo_status = QComboBox()
+        for label, status in (("Upcoming", "upcoming"), ("Ready", "ready"), ("Complete", "complete"), ("Any status", None)):
+            self.combo_status.addItem(label, status)
+        selection.addWidget(self.combo_status)
+        layout.addLayout(selection)
+
+        self.input_title = QLineEdit()
+        self.input_title.setPlaceholderText("Title template, e.g. {name} | {date} (empty keeps titles)")
+        layout.addWidget(self.input_title)
+        self.input_description = QLineEdit()
+        self.input_description.setPlaceholderText("Description template, e.g. {description} Replay: ... (empty keeps)")
+        layout.addWidget(self.input_description)
+        self.combo_privacy = QComboBox()
+        self.combo_privacy.addItem("Keep privacy", None)
+        for privacy in ("Public", "Unlisted", "Private"):
+            self.combo_privacy.addItem(privacy, privacy.lower())
+        layout.addWidget(self.combo_privacy)
+        self.input_add_tags = QLineEdit()
+        self.input_add_tags.setPlaceholderText("Tags to add, comma separated")
+        layout.addWidget(self.input_add_tags)
+        self.input_remove_tags = QLineEdit()
+        self.input_remove_tags.setPlaceholderText("Tags to remove, comma separated")
+        layout.addWidget(self.input_remove_tags)
+
+        self.list_preview = QListWidget()
+        layout.addWidget(self.list_preview)
+
+        buttons = QHBoxLayout()
+        self.button_preview = QPushButton("Preview (Dry Run)")
+        self.button_preview.clicked.connect(self.preview)
+        buttons.addWidget(self.button_preview)
+        self.button_apply = QPushButton("Apply Changes")
+        self.button_apply.clicked.connect(self.apply)
+        self.button_apply.setEnabled(False)
+        buttons.addWidget(self.button_apply)
+        layout.addLayout(buttons)
+
+        # Any edit after a preview invalidates it
+        for widget in (self.input_search, self.input_title, self.input_description, self.input_add_tags,
+                       self.input_remove_tags):
+            widget.textChanged.connect(lambda: self.button_apply.setEnabled(False))
+        for combo in (self.combo_status, self.combo_privacy):
+            combo.currentIndexChanged.connect(lambda: self.button_apply.setEnabled(False))
+
+    def current_edit(self):
+        def tags(line_edit):
+            return [tag.strip() for tag in line_edit.text().split(",") if tag.strip()]
+        return {
+            "title_template": self.input_title.text().strip(),
+            "description_template": self.input_description.text().strip(),
+            "privacy": self.combo_privacy.currentData(),
+            "add_tags": tags(self.input_add_tags),
+            "remove_tags": tags(self.input_remove_tags),
+        }
+
+    def preview(self):
+        """Re-read the selected broadcasts and show what would change and what it would cost."""
+        rows = self.history.query(text=self.input_search.text().strip() or None,
+                                  status=self.combo_status.currentData(), limit=10000)
+        if not rows:
+            QMessageBox.critical(self, "Error", "No matching broadcasts. Open Broadcast History to sync it first.")
+            return
+        broadcast_ids = [row["id"] for row in rows]
+        edit = self.current_edit()
+        self.button_preview.setEnabled(False)
+        self.list_preview.clear()
+        self.list_preview.addItem(f"Checking {len(broadcast_ids)} broadcasts...")
+        self.run_in_background("bulk-edit-plan", lambda: self.editor.plan(broadcast_ids, edit), self.on_planned)
+
+    def on_planned(self, plan, error):
+        self.button_preview.setEnabled(True)
+        self.list_preview.clear()
+        if error:
+            QMessageBox.critical(self, "Error", f"Failed to preview changes: {error}")
+            return
+        self.plan = plan
+        self.list_preview.addItems(format_plan(plan, limit=200).splitlines())
+        self.button_apply.setEnabled(bool(plan["updates"]))
+
+    def apply(self):
+        """Send only the updates shown in the preview."""
+        self.button_apply.setEnabled(False)
+        self.button_preview.setEnabled(False)
+        plan = self.plan
+        self.run_in_background("bulk-edit-apply", lambda: self.editor.apply(plan), self.on_applied)
+
+    def on_applied(self, result, error):
+        self.button_preview.setEnabled(True)
+        if error:
+            QMessageBox.critical(self, "Error", f"Bulk edit failed: {error}")
+            return
+        if result["failed"]:
+            QMessageBox.warning(self, "Partially Done",
+                                f"Updated {len(result['updated'])} broadcasts; {len(result['failed'])} failed (see the log).")
+        else:
+            QMessageBox.information(self, "Success", f"Updated {len(result['updated'])} broadcasts.")
 
 
 class YouTubeLiveStreamApp(QMainWindow):
@@ -36,14 +274,65 @@ class YouTubeLiveStreamApp(QMainWindow):
         self.setGeometry(300, 300, 800, 900)
 
         self.api_service = None  # Holds the authenticated API service
+        self.credentials = None  # Holds the OAuth credentials used to build extra API services
+        self.http_pool = None  # Per-worker API services sharing self.credentials, for background tasks
         self.thumbnail_path = None  # Path to the selected thumbnail image
         self.current_broadcast_id = None  # Holds the ID of the currently selected broadcast
+        self.pending_create_key = None  # Journal key of a created broadcast still waiting for connectivity
         self.stream_id = None  # Holds the ID of the created stream
         self.credentials_path = "youtube_credentials.pkl"  # Path to cache credentials
 
         # OBS WebSocket
-        self.obs_client = None
         self.obs_config = self.load_obs_config()
+        self.obs_pool = ObsPool(obs_endpoints(self.obs_config))  # One persistent connection per OBS instance
+        self.scene_cache = None  # Scene list of the primary OBS instance, kept current from events
+        self.output_watchdogs = {}  # OBS instance name -> OutputWatchdog restarting a dropped stream output
+        self.scene_markers = deque(maxlen=1000)  # (time, scene) program scene changes, for chapters
+        self.last_recordings = {}  # OBS instance -> output path reported when its recording stopped
+        self.vod_uploader = None  # Recording upload in progress
+
+        # Background workers
+        self.signals = WorkerSignals()
+        self.signals.health_sample.connect(self.on_health_sample)
+        self.signals.health_alert.connect(self.on_health_alert)
+        self.health_monitor = None
+        self.telemetry = None  # Telemetry of the current (or last) health monitoring session
+        self.signals.chat_messages.connect(self.on_chat_messages)
+        self.signals.chat_stopped.connect(self.on_chat_stopped)
+        self.chat_reader = None
+        self.signals.task_finished.connect(lambda callback, result, error: callback(result, error))
+        self.signals.activity.connect(self.log_activity)
+        self.signals.scenes_changed.connect(self.on_scenes_changed)
+        self.signals.post_stream_status.connect(self.on_post_stream_status)
+        self.post_stream = None  # Post-stream job pipeline, created on first use
+        self.post_stream_items = {}  # (broadcast_id, job) -> row in the post-stream list
+
+        # Diagnostics: the GUI thread beats a watchdog, which logs the stack of any handler that blocks it
+        self.diagnostics = Diagnostics(
+            stall_threshold_ms=self.obs_config.get("stall_threshold_ms", DEFAULT_STALL_THRESHOLD_MS)
+        )
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.timeout.connect(self.diagnostics.watchdog.beat)
+        self.heartbeat_timer.start(HEARTBEAT_INTERVAL_MS)
+        # Start watching once the event loop runs; the rest of startup would otherwise count as a stall
+        QTimer.singleShot(0, self.diagnostics.watchdog.start)
+        self.setup_diagnostics_menu()
+
+        # Local broadcast history
+        self.history = BroadcastHistory()
+        self.history_dialog = None
+        self.history_sync_in_progress = False
+        self.broadcast_export = None  # Export in progress
+
+        self.playlist_index = PlaylistIndex()
+        self.schedule_index = None  # Upcoming and live broadcasts per stream key, for overlap checks
+
+        # Offline operation journal
+        self.journal = OperationJournal()
+        self.replay_in_progress = False
+        self.replay_timer = QTimer(self)
+        self.replay_timer.timeout.connect(self.replay_journal)
+        self.replay_timer.start(JOURNAL_REPLAY_INTERVAL_MS)
 
         # Central widget and layout
         self.central_widget = QWidget()
@@ -72,6 +361,9 @@ class YouTubeLiveStreamApp(QMainWindow):
         self.input_end_time.setTime((datetime.now() + timedelta(hours=1)).time())  # Default to one hour later
         self.layout.addWidget(self.input_end_time)
 
+        self.label_schedule_conflict = QLabel("")
+        self.layout.addWidget(self.label_schedule_conflict)
+
         self.label_privacy = QLabel("Privacy Status:")
         self.layout.addWidget(self.label_privacy)
 
@@ -85,6 +377,17 @@ class YouTubeLiveStreamApp(QMainWindow):
         self.combo_stream_key = QComboBox()
         self.layout.addWidget(self.combo_stream_key)
 
+        # Off by default: Create Live Stream makes a new stream for every broadcast
+        self.checkbox_use_stream_key = QCheckBox("Bind New Broadcast to the Selected Stream Key")
+        self.layout.addWidget(self.checkbox_use_stream_key)
+        for signal in (self.input_start_time.timeChanged, self.input_end_time.timeChanged,
+                       self.combo_stream_key.currentIndexChanged, self.checkbox_use_stream_key.toggled):
+            signal.connect(self.check_schedule_conflict)
+
+        self.button_provision_obs = QPushButton("Send Stream Key to OBS")
+        self.button_provision_obs.clicked.connect(self.provision_obs_stream)
+        self.layout.addWidget(self.button_provision_obs)
+
         self.label_scheduled_streams = QLabel("Scheduled Streams:")
         self.layout.addWidget(self.label_scheduled_streams)
 
@@ -97,10 +400,18 @@ class YouTubeLiveStreamApp(QMainWindow):
         self.combo_playlist = QComboBox()
         self.layout.addWidget(self.combo_playlist)
 
+        self.button_add_to_playlist = QPushButton("Add Broadcasts to Playlist")
+        self.button_add_to_playlist.clicked.connect(self.add_broadcasts_to_playlist)
+        self.layout.addWidget(self.button_add_to_playlist)
+
         self.button_upload_thumbnail = QPushButton("Upload Thumbnail")
         self.button_upload_thumbnail.clicked.connect(self.upload_thumbnail)
         self.layout.addWidget(self.button_upload_thumbnail)
 
+        self.button_frame_thumbnail = QPushButton("Thumbnail from OBS Frame")
+        self.button_frame_thumbnail.clicked.connect(self.thumbnail_from_obs_frame)
+        self.layout.addWidget(self.button_frame_thumbnail)
+
         self.button_authenticate = QPushButton("Authenticate")
         self.button_authenticate.clicked.connect(self.authenticate)
         self.layout.addWidget(self.button_authenticate)
@@ -121,11 +432,24 @@ class YouTubeLiveStreamApp(QMainWindow):
         self.button_stop_stream.clicked.connect(self.stop_live_stream)
         self.layout.addWidget(self.button_stop_stream)
 
+        self.button_preflight = QPushButton("Run Pre-flight Check")
+        self.button_preflight.clicked.connect(self.run_preflight_check)
+        self.layout.addWidget(self.button_preflight)
+
         self.button_refresh_stream_keys = QPushButton("Refresh Stream Keys")
         self.button_refresh_stream_keys.clicked.connect(self.load_stream_keys)
         self.layout.addWidget(self.button_refresh_stream_keys)
 
         # OBS Control Buttons
+        self.label_obs_target = QLabel("OBS Instances:")
+        self.layout.addWidget(self.label_obs_target)
+
+        self.combo_obs_target = QComboBox()
+        self.combo_obs_target.addItem("All OBS instances", None)
+        for name in self.obs_pool.names:
+            self.combo_obs_target.addItem(name, name)
+        self.layout.addWidget(self.combo_obs_target)
+
         self.button_connect_obs = QPushButton("Connect to OBS")
         self.button_connect_obs.clicked.connect(self.connect_to_obs)
         self.layout.addWidget(self.button_connect_obs)
@@ -138,6 +462,112 @@ class YouTubeLiveStreamApp(QMainWindow):
         self.button_stop_obs_stream.clicked.connect(self.stop_obs_streaming)
         self.layout.addWidget(self.button_stop_obs_stream)
 
+        self.button_start_obs_record = QPushButton("Start OBS Recording")
+        self.button_start_obs_record.clicked.connect(self.start_obs_recording)
+        self.layout.addWidget(self.button_start_obs_record)
+
+        self.button_stop_obs_record = QPushButton("Stop OBS Recording")
+        self.button_stop_obs_record.clicked.connect(self.stop_obs_recording)
+        self.layout.addWidget(self.button_stop_obs_record)
+
+        self.button_upload_recording = QPushButton("Upload Last Recording as VOD Backup")
+        self.button_upload_recording.clicked.connect(self.upload_last_recording)
+        self.layout.addWidget(self.button_upload_recording)
+
+        # OBS scenes
+        self.label_scenes = QLabel("Scenes (click or use hotkeys to switch):")
+        self.layout.addWidget(self.label_scenes)
+
+        self.list_scenes = QListWidget()
+        self.list_scenes.itemClicked.connect(lambda item: self.switch_to_scene(item.data(Qt.ItemDataRole.UserRole)))
+        self.layout.addWidget(self.list_scenes)
+
+        self.label_scene_latency = QLabel("Scene switch latency: -")
+        self.layout.addWidget(self.label_scene_latency)
+
+        self.button_refresh_scenes = QPushButton("Refresh Scenes")
+        self.button_refresh_scenes.clicked.connect(self.load_scenes)
+        self.layout.addWidget(self.button_refresh_scenes)
+        self.setup_scene_hotkeys()
+
+        # Stream health dashboard
+        self.label_health = QLabel("Stream Health:")
+        self.layout.addWidget(self.label_health)
+
+        self.label_health_status = QLabel("Health monitor is not running.")
+        self.layout.addWidget(self.label_health_status)
+
+        self.list_health_alerts = QListWidget()
+        self.layout.addWidget(self.list_health_alerts)
+
+        self.button_health_monitor = QPushButton("Start Health Monitor")
+        self.button_health_monitor.clicked.connect(self.toggle_health_monitor)
+        self.layout.addWidget(self.button_health_monitor)
+
+        self.button_export_telemetry = QPushButton("Export Telemetry")
+        self.button_export_telemetry.clicked.connect(self.export_telemetry)
+        self.layout.addWidget(self.button_export_telemetry)
+
+        # Live chat
+        self.label_chat = QLabel("Live Chat:")
+        self.layout.addWidget(self.label_chat)
+
+        self.list_chat = QListWidget()
+        self.layout.addWidget(self.list_chat)
+
+        self.button_live_chat = QPushButton("Open Live Chat")
+        self.button_live_chat.clicked.connect(self.toggle_live_chat)
+        self.layout.addWidget(self.button_live_chat)
+
+        # Bulk tools
+        self.button_batch_thumbnails = QPushButton("Batch Thumbnails for Upcoming Streams")
+        self.button_batch_thumbnails.clicked.connect(self.batch_thumbnails)
+        self.layout.addWidget(self.button_batch_thumbnails)
+
+        self.button_broadcast_history = QPushButton("Broadcast History")
+        self.button_broadcast_history.clicked.connect(self.open_broadcast_history)
+        self.layout.addWidget(self.button_broadcast_history)
+
+        self.button_export_broadcasts = QPushButton("Export All Broadcasts (CSV/JSONL)")
+        self.button_export_broadcasts.clicked.connect(self.export_broadcasts)
+        self.layout.addWidget(self.button_export_broadcasts)
+
+        self.button_bulk_edit = QPushButton("Bulk Edit Metadata")
+        self.button_bulk_edit.clicked.connect(self.open_bulk_edit)
+        self.layout.addWidget(self.button_bulk_edit)
+
+        self.button_check_plan = QPushButton("Check Schedule Plan (CSV)")
+        self.button_check_plan.clicked.connect(self.check_schedule_plan)
+        self.layout.addWidget(self.button_check_plan)
+
+        self.label_post_stream = QLabel("Post-Stream Jobs (post_stream.json):")
+        self.layout.addWidget(self.label_post_stream)
+
+        self.list_post_stream = QListWidget()
+        self.layout.addWidget(self.list_post_stream)
+
+        self.button_post_stream = QPushButton("Run Post-Stream Jobs for Selected Stream")
+        self.button_post_stream.clicked.connect(self.run_post_stream_for_selected)
+        self.layout.addWidget(self.button_post_stream)
+
+        self.button_api_usage = QPushButton("Show API Usage")
+        self.button_api_usage.clicked.connect(self.show_api_usage)
+        self.layout.addWidget(self.button_api_usage)
+
+        self.label_journal = QLabel()
+        self.layout.addWidget(self.label_journal)
+
+        self.button_replay_journal = QPushButton("Retry Queued Operations Now")
+        self.button_replay_journal.clicked.connect(self.replay_journal)
+        self.layout.addWidget(self.button_replay_journal)
+        self.update_journal_status()
+
+        self.label_activity = QLabel("Activity:")
+        self.layout.addWidget(self.label_activity)
+
+        self.list_activity = QListWidget()
+        self.layout.addWidget(self.list_activity)
+
         # Initialize data
         self.auto_authenticate()
         self.load_scheduled_streams()
@@ -157,9 +587,9 @@ class YouTubeLiveStreamApp(QMainWindow):
             if credentials and credentials.expired and credentials.refresh_token:
                 credentials.refresh(Request())
                 logging.info("Refreshed expired credentials.")
-                self.api_service = build("youtube", "v3", credentials=credentials)
+                self.use_credentials(credentials)
             elif credentials:
-                self.api_service = build("youtube", "v3", credentials=credentials)
+                self.use_credentials(credentials)
                 logging.info("Using cached credentials.")
             else:
                 self.authenticate()
@@ -177,7 +607,7 @@ class YouTubeLiveStreamApp(QMainWindow):
             credentials = flow.run_local_server(port=0)
             with open(self.credentials_path, "wb") as token:
                 pickle.dump(credentials, token)
-            self.api_service = build("youtube", "v3", credentials=credentials)
+            self.use_credentials(credentials)
             logging.info("Authentication successful.")
             QMessageBox.information(self, "Success", "Authentication successful!")
             self.load_stream_keys()
@@ -185,13 +615,24 @@ class YouTubeLiveStreamApp(QMainWindow):
             logging.error(f"Authentication failed: {e}")
             QMessageBox.critical(self, "Error", f"Authentication failed: {e}")
 
+    def use_credentials(self, credentials):
+        """Set up the GUI thread's API service and the worker connection pool on one set of credentials."""
+        if self.http_pool:
+            self.http_pool.log_summary()
+        self.credentials = credentials
+        self.http_pool = HttpPool(credentials, int(self.obs_config.get("api_pool_size", DEFAULT_POOL_SIZE)))
+        # Same shared credentials as the pool, so a token refresh on any thread is done once
+        self.api_service = build("youtube", "v3", http=self.http_pool.authorized_http())
+        for watchdog in self.output_watchdogs.values():
+            watchdog.http_pool = self.http_pool
+
     def load_scheduled_streams(self):
         """Load scheduled streams into the dropdown."""
         logging.info("Loading scheduled streams.")
         try:
             self.combo_scheduled_streams.clear()
-            response = self.api_service.liveBroadcasts().list(
-                part="snippet",
+            response = list_request(
+                self.api_service.liveBroadcasts(), ["id", "snippet.title"], "liveBroadcasts.list",
                 mine=True,
                 maxResults=25
             ).execute()
@@ -200,17 +641,92 @@ class YouTubeLiveStreamApp(QMainWindow):
                 stream_id = item["id"]
                 self.combo_scheduled_streams.addItem(stream_title, stream_id)
             logging.info("Scheduled streams loaded successfully.")
+            self.refresh_schedule_index()
         except Exception as e:
             logging.error(f"Failed to load scheduled streams: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load scheduled streams: {e}")
 
+    def refresh_schedule_index(self):
+        """Rebuild the per-stream-key schedule of upcoming and live broadcasts in the background."""
+        if not self.http_pool:
+            return
+
+        def load():
+            with self.http_pool.service() as api_service:
+                return ScheduleIndex.load(api_service)
+
+        def on_done(index, error):
+            if error:
+                logging.error(f"Failed to load the broadcast schedule: {error}")
+                return
+            self.schedule_index = index
+            for first, second in find_conflicts(index.intervals()):
+                self.log_activity(f"Schedule conflict on one stream key: {describe(first)} and {describe(second)}")
+            self.check_schedule_conflict()
+
+        self.run_in_background("schedule-index", load, on_done)
+
+    def scheduled_times(self):
+        """Return the start and end entered in the time fields, today in local time."""
+        now = datetime.now()
+        start = datetime.combine(now.date(), self.input_start_time.time().toPyTime()).astimezone()
+        end = datetime.combine(now.date(), self.input_end_time.time().toPyTime()).astimezone()
+        return start, end
+
+    def schedule_conflicts(self):
+        """Return the broadcasts on the selected stream key that overlap the entered times, if it will be bound."""
+        stream_id = self.combo_stream_key.currentData()
+        if not self.schedule_index or not stream_id or not self.checkbox_use_stream_key.isChecked():
+            return []
+        return self.schedule_index.conflicts(stream_id, *self.scheduled_times())
+
+    def check_schedule_conflict(self):
+        """Show, as the times are edited, whether the new broadcast would clash on the selected stream key."""
+        start, end = self.scheduled_times()
+        if end <= start:
+            self.label_schedule_conflict.setText("End time is not after the start time.")
+            return
+        conflicts = self.schedule_conflicts()
+        if conflicts:
+            self.label_schedule_conflict.setText(
+                "Overlaps on this stream key: " + ", ".join(describe(interval) for interval in conflicts)
+            )
+        else:
+            self.label_schedule_conflict.setText("")
+
+    def check_schedule_plan(self):
+        """Check a CSV of proposed broadcasts against each other and the loaded schedule."""
+        if not self.schedule_index:
+            QMessageBox.critical(self, "Error", "The broadcast schedule has not loaded yet. Please authenticate first!")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Select Schedule Plan", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        stream_ids = {self.combo_stream_key.itemText(index): self.combo_stream_key.itemData(index)
+                      for index in range(self.combo_stream_key.count())}
+        try:
+            plan = read_plan(path, stream_ids)
+            conflicts = validate_plan(self.schedule_index, plan)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to check schedule plan: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to check schedule plan: {e}")
+            return
+        logging.info(f"Checked schedule plan {path}: {len(plan)} broadcasts, {len(conflicts)} conflicts.")
+        if not conflicts:
+            QMessageBox.information(self, "Schedule Plan", f"None of the {len(plan)} planned broadcasts overlap on a stream key.")
+            return
+        lines = [f"{describe(planned)} and {describe(other)}" for planned, other in conflicts[:20]]
+        if len(conflicts) > 20:
+            lines.append(f"... and {len(conflicts) - 20} more")
+        QMessageBox.warning(self, "Schedule Plan", f"{len(conflicts)} overlaps on a stream key:\n" + "\n".join(lines))
+
     def load_playlists(self):
         """Load playlists into the dropdown."""
         logging.info("Loading playlists.")
         try:
             self.combo_playlist.clear()
-            response = self.api_service.playlists().list(
-                part="snippet",
+            response = list_request(
+                self.api_service.playlists(), ["id", "snippet.title"], "playlists.list",
                 mine=True,
                 maxResults=25
             ).execute()
@@ -226,8 +742,8 @@ class YouTubeLiveStreamApp(QMainWindow):
         logging.info("Loading available stream keys.")
         try:
             self.combo_stream_key.clear()
-            response = self.api_service.liveStreams().list(
-                part="snippet,cdn",
+            response = list_request(
+                self.api_service.liveStreams(), ["id", "snippet.title"], "liveStreams.list",
                 mine=True,
                 maxResults=25
             ).execute()
@@ -240,33 +756,118 @@ class YouTubeLiveStreamApp(QMainWindow):
             logging.error(f"Failed to load stream keys: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load stream keys: {e}")
 
+    def provision_obs_stream(self):
+        """Configure the selected OBS instances with the chosen stream key and its fastest ingestion address."""
+        stream_id = self.combo_stream_key.currentData()
+        if not self.credentials or not stream_id:
+            QMessageBox.critical(self, "Error", "Please authenticate and select a stream key first!")
+            return
+        protocol = self.obs_config.get("ingest_protocol", "rtmps")
+        names = self.selected_obs_instances()
+        self.button_provision_obs.setEnabled(False)
+        self.statusBar().showMessage("Probing ingestion servers...")
+
+        def provision():
+            with self.http_pool.service() as api_service:
+                return provision_obs(api_service, self.obs_pool, stream_id, names, protocol)
+
+        self.run_in_background("obs-provision", provision, self.on_obs_provisioned)
+
+    def on_obs_provisioned(self, result, error):
+        self.button_provision_obs.setEnabled(True)
+        if error:
+            QMessageBox.critical(self, "Error", f"Failed to configure OBS: {error}")
+            return
+        title, probes, chosen, results = result
+        ok, summary = summarize(results)
+        latencies = "\n".join(f"{label}: {'unreachable' if ms is None else f'{ms:.0f} ms'}" for label, _, ms in probes)
+        message = f"Stream '{title}' via {chosen[0]} ({chosen[1]})\n\n{latencies}\n\n{summary}"
+        self.log_activity(f"OBS stream settings {'updated' if ok else 'not fully updated'}: '{title}' via {chosen[0]}")
+        if ok:
+            QMessageBox.information(self, "Success", f"OBS is set up for the stream.\n\n{message}")
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to configure every OBS instance.\n\n{message}")
+
     def upload_thumbnail(self):
         """Upload a thumbnail for the selected stream."""
         logging.info("Uploading thumbnail.")
         try:
-            options = QFileDialog.Options()
-            self.thumbnail_path, _ = QFileDialog.getOpenFileName(self, "Select Thumbnail", "", "Images (*.png *.jpg *.jpeg)", options=options)
-            if not self.thumbnail_path:
+            source_path, _ = QFileDialog.getOpenFileName(self, "Select Thumbnail", "", "Images (*.png *.jpg *.jpeg *.gif)")
+            if not source_path:
                 return
 
-            # Check for a selected stream
-            if not self.current_broadcast_id:
+            # Check for a selected stream (or one created while offline)
+            if not self.current_broadcast_id and not self.pending_create_key:
                 QMessageBox.critical(self, "Error", "No scheduled stream selected.")
                 return
 
-            # Upload thumbnail
-            with open(self.thumbnail_path, "rb") as file:
-                self.api_service.thumbnails().set(
-                    videoId=self.current_broadcast_id,
-                    media_body=file
-                ).execute()
+            # Decode at reduced size, crop to 16:9 and resize to 1280x720 before uploading
+            self.thumbnail_path = prepare_thumbnail(source_path)
+            if self.current_broadcast_id:
+                target = {"video_id": self.current_broadcast_id}
+            else:
+                target = {"create_key": self.pending_create_key}
+            if self.submit_operation("thumbnail", dict(target, path=self.thumbnail_path)) is None:
+                QMessageBox.information(self, "Queued", "No connection. The thumbnail will be uploaded when it returns.")
+                return
             logging.info("Thumbnail uploaded successfully.")
             QMessageBox.information(self, "Success", "Thumbnail uploaded successfully!")
         except Exception as e:
             logging.error(f"Failed to upload thumbnail: {e}")
             QMessageBox.critical(self, "Error", f"Failed to upload thumbnail: {e}")
 
-    
+    def thumbnail_from_obs_frame(self):
+        """Use a frame of the OBS program output as the selected broadcast's thumbnail, without temp files.
+
+        With "thumbnail_frames" > 1 in obs_config.json, that many frames are captured
+        "thumbnail_frame_interval_s" apart and the sharpest, best-exposed one is used.
+        """
+        if not self.credentials:
+            QMessageBox.critical(self, "Error", "Please authenticate first!")
+            return
+        broadcast_id = self.get_selected_broadcast_id()
+        if not broadcast_id:
+            return
+        name = (self.selected_obs_instances() or [primary_endpoint(self.obs_config)[0]])[0]
+        samples = max(1, int(self.obs_config.get("thumbnail_frames", 1)))
+        interval = float(self.obs_config.get("thumbnail_frame_interval_s", 1.0))
+        self.button_frame_thumbnail.setEnabled(False)
+        self.statusBar().showMessage(f"Capturing {samples} frame(s) from OBS instance '{name}'...")
+
+        def capture():
+            def grab(client):
+                return capture_frame(client, client.get_current_program_scene().current_program_scene_name)
+
+            outcome = self.obs_pool.call(grab, [name])[name]
+            if not outcome["ok"]:
+                raise RuntimeError(f"OBS instance '{name}': {outcome['error']}")
+            return outcome["result"]
+
+        def run():
+            if samples == 1:
+                frame, scores = capture(), []
+            else:
+                frame, scores = best_frame(capture, samples, interval, on_frame=lambda index, score: (
+                    self.signals.activity.emit(f"Frame {index + 1}/{samples}: sharpness {score[1]:.0f}, "
+                                               f"brightness {score[2]:.0f}")))
+            data = frame_to_thumbnail(frame)
+            with self.http_pool.service() as api_service:
+                upload_thumbnail_bytes(api_service, broadcast_id, data)
+            return len(data), scores
+
+        def on_done(result, error):
+            self.button_frame_thumbnail.setEnabled(True)
+            if error:
+                logging.error(f"Failed to set thumbnail from OBS frame: {error}")
+                QMessageBox.critical(self, "Error", f"Failed to set thumbnail from OBS frame: {error}")
+                return
+            size, scores = result
+            chosen = f" (best of {len(scores)} frames)" if scores else ""
+            self.log_activity(f"Thumbnail set from OBS frame{chosen}, {size / 1024:.0f} KiB.")
+            QMessageBox.information(self, "Success", f"Thumbnail set from the OBS program output{chosen}.")
+
+        self.run_in_background("frame-thumbnail", run, on_done)
+
     def load_obs_config(self):
         """Load OBS WebSocket configuration from a JSON file."""
         if not os.path.exists(OBS_CONFIG_FILE):
@@ -277,49 +878,796 @@ class YouTubeLiveStreamApp(QMainWindow):
         with open(OBS_CONFIG_FILE, "r") as file:
             return json.load(file)
 
+    def selected_obs_instances(self):
+        """Return the OBS instance names chosen in the target dropdown (None means all)."""
+        name = self.combo_obs_target.currentData()
+        return [name] if name else None
+
+    def run_obs_command(self, command, success_message, failure_message):
+        """Send a pool command to the selected OBS instances and report each instance's outcome."""
+        results = command(self.selected_obs_instances())
+        ok, summary = summarize(results)
+        logging.info(f"{success_message if ok else failure_message}\n{summary}")
+        if ok:
+            QMessageBox.information(self, "Success", f"{success_message}\n\n{summary}")
+        else:
+            QMessageBox.critical(self, "Error", f"{failure_message}\n\n{summary}")
+        return results
+
     def connect_to_obs(self):
-        """Connect to OBS WebSocket."""
+        """Connect to the configured OBS WebSocket instances."""
+        results = self.run_obs_command(self.obs_pool.connect, "Connected to OBS successfully!", "Failed to connect to OBS.")
+        if results[primary_endpoint(self.obs_config)[0]]["ok"]:
+            self.load_scenes()
+        if self.obs_config.get("auto_restart_stream", True):
+            self.start_output_watchdogs([name for name, outcome in results.items() if outcome["ok"]])
+
+    def start_output_watchdogs(self, names):
+        """Watch each connected instance's stream output and restart it if it drops unexpectedly."""
+        for name in names:
+            try:
+                if name in self.output_watchdogs:
+                    self.output_watchdogs.pop(name).stop()
+                watchdog = OutputWatchdog(
+                    name, self.obs_pool.endpoints[name], self.obs_pool, self.http_pool,
+                    stream_id=self.combo_stream_key.currentData(),
+                    on_incident=self.on_output_incident,
+                    on_alert=self.signals.health_alert.emit,
+                    restart_deadline=self.obs_config.get("restart_deadline_s", DEFAULT_RESTART_DEADLINE)
+                )
+                watchdog.watch()
+                self.output_watchdogs[name] = watchdog
+            except Exception as e:
+                logging.error(f"Failed to start the stream watchdog for OBS instance '{name}': {e}")
+                self.signals.activity.emit(f"Stream watchdog for '{name}' not running: {e}")
+
+    def on_output_incident(self, incident):
+        """Report a finished outage (called on a watchdog thread)."""
+        if incident["recovered_by"] is None:
+            message = f"Stream output on '{incident['instance']}' is DOWN after {incident['attempts']} restart attempts"
+        else:
+            message = (f"Stream output on '{incident['instance']}' recovered by {incident['recovered_by']} "
+                       f"in {incident['outage_ms']:.0f} ms")
+            if incident["ingest_ok"] is not None:
+                message += (f"; YouTube ingestion back after {incident['ingest_ms'] / 1000:.1f} s" if incident["ingest_ok"]
+                            else "; YouTube ingestion NOT back")
+        self.signals.activity.emit(message + ".")
+
+    def load_scenes(self):
+        """Fetch the primary instance's scene list once and follow scene events from then on."""
+        logging.info("Loading OBS scenes.")
         try:
-            # Initialize and connect automatically
-            self.obs_client = obs.ReqClient(
-                host=self.obs_config["host"],
-                port=self.obs_config["port"],
-                password=self.obs_config["password"]
-            )
-            logging.info("Connected to OBS WebSocket.")
-            QMessageBox.information(self, "Success", "Connected to OBS successfully!")
+            name, endpoint = primary_endpoint(self.obs_config)
+            if self.scene_cache:
+                self.scene_cache.stop()
+            self.scene_cache = SceneCache(endpoint, on_change=self.signals.scenes_changed.emit)
+            # Subscribe before fetching, so a change made in between is not missed
+            self.scene_cache.watch()
+            with self.obs_pool.client(name) as client:
+                self.scene_cache.load(client)
+            logging.info("OBS scenes loaded successfully.")
         except Exception as e:
-            logging.error(f"Failed to connect to OBS: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to connect to OBS: {e}")
-    
+            logging.error(f"Failed to load OBS scenes: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to load OBS scenes: {e}")
+
+    def on_scenes_changed(self):
+        """Redraw the scene list from the cache, marking the program scene."""
+        scenes, current = self.scene_cache.snapshot()
+        if current and (not self.scene_markers or self.scene_markers[-1][1] != current):
+            self.scene_markers.append((time.time(), current))
+        self.list_scenes.clear()
+        for position, scene in enumerate(scenes, start=1):
+            label = f"{position}. {scene}" + ("  [PROGRAM]" if scene == current else "")
+            self.list_scenes.addItem(label)
+            self.list_scenes.item(position - 1).setData(Qt.ItemDataRole.UserRole, scene)
+
+    def setup_scene_hotkeys(self):
+        """Bind scene hotkeys from obs_config.json ("scene_hotkeys": {"Ctrl+1": 1, "F5": "Camera 2"}).
+
+        A number picks the Nth scene in the list, a string names the scene. Defaults to Ctrl+1..Ctrl+9.
+        """
+        for keys, target in self.obs_config.get("scene_hotkeys", DEFAULT_HOTKEYS).items():
+            shortcut = QShortcut(QKeySequence(keys), self)
+            shortcut.activated.connect(lambda target=target: self.switch_to_scene(target))
+
+    def switch_to_scene(self, target):
+        """Switch the selected OBS instances to a scene given by name or 1-based list position."""
+        if not self.scene_cache:
+            self.statusBar().showMessage("Scenes are not loaded; connect to OBS first.")
+            return
+        scene = self.scene_cache.scene_at(target) if isinstance(target, int) else target
+        if not scene:
+            self.statusBar().showMessage(f"No scene number {target}.")
+            return
+        results = switch_scene(self.obs_pool, self.scene_cache, scene, self.selected_obs_instances())
+        ok, summary = summarize(results)
+        if not ok:
+            QMessageBox.critical(self, "Error", f"Failed to switch to scene '{scene}'.\n\n{summary}")
+        latency = self.scene_cache.latency_summary()
+        if latency:
+            self.label_scene_latency.setText(
+                f"Scene switch latency: last {latency['last']:.1f} ms | median {latency['median']:.1f} ms | "
+                f"p95 {latency['p95']:.1f} ms ({latency['count']} switches)"
+            )
+
     def start_obs_streaming(self):
         """Start streaming in OBS."""
-        try:
-            self.obs_client.start_stream()
-            logging.info("Started OBS streaming.")
-            QMessageBox.information(self, "Success", "OBS streaming started!")
-        except Exception as e:
-            logging.error(f"Failed to start OBS streaming: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to start OBS streaming: {e}")
+        for watchdog in self.output_watchdogs.values():
+            watchdog.stream_id = self.combo_stream_key.currentData()
+        self.run_obs_command(self.obs_pool.start_stream, "OBS streaming started!", "Failed to start OBS streaming.")
 
     def stop_obs_streaming(self):
         """Stop streaming in OBS."""
+        for name in self.selected_obs_instances() or self.output_watchdogs:
+            if name in self.output_watchdogs:
+                self.output_watchdogs[name].stand_down()
+        self.run_obs_command(self.obs_pool.stop_stream, "OBS streaming stopped!", "Failed to stop OBS streaming.")
+
+    def start_obs_recording(self):
+        """Start recording in OBS."""
+        self.run_obs_command(self.obs_pool.start_record, "OBS recording started!", "Failed to start OBS recording.")
+
+    def stop_obs_recording(self):
+        """Stop recording in OBS."""
+        results = self.run_obs_command(self.obs_pool.stop_record, "OBS recording stopped!", "Failed to stop OBS recording.")
+        for name, outcome in results.items():
+            if outcome["ok"] and getattr(outcome["result"], "output_path", None):
+                self.last_recordings[name] = outcome["result"].output_path
+
+    def upload_last_recording(self):
+        """Upload the last OBS recording as a new video with a resumable upload, or pause the running one."""
+        if self.vod_uploader:
+            self.vod_uploader.stop()
+            self.button_upload_recording.setEnabled(False)
+            return
+        if not self.credentials:
+            QMessageBox.critical(self, "Error", "Please authenticate first!")
+            return
+        name = (self.selected_obs_instances() or [primary_endpoint(self.obs_config)[0]])[0]
         try:
-            self.obs_client.stop_stream()
-            logging.info("Stopped OBS streaming.")
-            QMessageBox.information(self, "Success", "OBS streaming stopped!")
+            path = find_last_recording(self.obs_pool, name, self.last_recordings.get(name))
         except Exception as e:
-            logging.error(f"Failed to stop OBS streaming: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to stop OBS streaming: {e}")
+            logging.error(f"Failed to find the last recording: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to find the last recording: {e}")
+            return
+        default_title = f"{self.combo_scheduled_streams.currentText() or os.path.basename(path)} (Recording)"
+        title, ok = QInputDialog.getText(
+            self, "Upload Recording",
+            f"Upload {path} ({os.path.getsize(path) / 1024 / 1024:.0f} MB) as a private video.\n"
+            f"This uses {VIDEO_INSERT_COST} quota units. Title:",
+            text=default_title
+        )
+        if not ok or not title.strip():
+            return
 
-    def closeEvent(self, event):
-        """Gracefully close the application."""
-        if self.obs_client:
+        def on_progress(sent, total, rate):
+            self.signals.activity.emit(f"Recording upload {sent * 100 // total}% "
+                                       f"({sent / 1024 / 1024:.0f}/{total / 1024 / 1024:.0f} MB, "
+                                       f"{rate / 1024 / 1024:.1f} MB/s)")
+
+        chunk_size = int(self.obs_config.get("vod_chunk_mb", DEFAULT_CHUNK_SIZE // 1024 // 1024)) * 1024 * 1024
+        try:
+            self.vod_uploader = VodUploader(self.credentials, chunk_size=chunk_size, on_progress=on_progress)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to start the upload: {e}")
+            return
+        self.button_upload_recording.setText("Pause Recording Upload")
+        self.run_in_background("vod-upload", lambda: self.vod_uploader.upload(path, title.strip()),
+                               self.on_recording_uploaded)
+
+    def on_recording_uploaded(self, result, error):
+        self.vod_uploader = None
+        self.button_upload_recording.setText("Upload Last Recording as VOD Backup")
+        self.button_upload_recording.setEnabled(True)
+        if isinstance(error, InterruptedError):
+            self.log_activity("Recording upload paused; upload the same recording again to resume.")
+        elif error:
+            QMessageBox.critical(self, "Error", f"Recording upload failed: {error}\n\nUpload it again to resume.")
+        else:
+            self.log_activity(f"Recording uploaded as video {result['video_id']} "
+                              f"({result['bytes_per_second'] / 1024 / 1024:.1f} MB/s).")
+            QMessageBox.information(self, "Success", f"Recording uploaded as video {result['video_id']}.")
+
+    def toggle_health_monitor(self):
+        """Start or stop the stream health monitor."""
+        if self.health_monitor and self.health_monitor.is_running():
+            self.stop_health_monitor()
+        else:
+            self.start_health_monitor()
+
+    def start_health_monitor(self):
+        """Sample OBS output stats and YouTube stream health in the background."""
+        logging.info("Starting stream health monitor.")
+        try:
+            # The monitor thread gets its own OBS connection and API service; neither client is thread-safe.
+            # Monitor the instance chosen in the target dropdown, or the primary one
+            name, endpoint = primary_endpoint(self.obs_config)
+            if self.combo_obs_target.currentData():
+                name = self.combo_obs_target.currentData()
+                endpoint = self.obs_pool.endpoints[name]
+            obs_client = obs.ReqClient(
+                host=endpoint["host"],
+                port=endpoint["port"],
+                password=endpoint["password"],
+                timeout=3
+            )
+            # The sampler keeps its own service for the whole stream rather than holding a pool slot
+            api_service = build("youtube", "v3", http=self.http_pool.authorized_http()) if self.http_pool else None
+            sampler = HealthSampler(obs_client, api_service, self.combo_stream_key.currentData())
+            self.health_monitor = HealthMonitor(
+                sampler,
+                on_sample=self.signals.health_sample.emit,
+                on_alert=self.signals.health_alert.emit,
+                thresholds=self.obs_config.get("health_thresholds")
+            )
+            self.list_health_alerts.clear()
+            self.telemetry = TelemetryStore()
+            self.health_monitor.start()
+            self.button_health_monitor.setText("Stop Health Monitor")
+        except Exception as e:
+            logging.error(f"Failed to start health monitor: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to start health monitor: {e}")
+
+    def stop_health_monitor(self):
+        """Stop the stream health monitor and release its OBS connection."""
+        if not self.health_monitor:
+            return
+        self.health_monitor.stop()
+        try:
+            self.health_monitor.sampler.obs_client.disconnect()
+        except Exception as e:
+            logging.error(f"Failed to disconnect health monitor from OBS: {e}")
+        self.health_monitor = None
+        self.button_health_monitor.setText("Start Health Monitor")
+        self.label_health_status.setText("Health monitor is not running.")
+
+        # Keep a compact copy of every finished session for post-event analysis
+        try:
+            self.telemetry.flush()
+            os.makedirs(TELEMETRY_DIR, exist_ok=True)
+            session_name = datetime.fromtimestamp(self.telemetry.started_at or datetime.now().timestamp())
+            self.telemetry.export_binary(os.path.join(TELEMETRY_DIR, session_name.strftime("session-%Y%m%d-%H%M%S.bin")))
+        except Exception as e:
+            logging.error(f"Failed to save telemetry session: {e}")
+
+    def export_telemetry(self):
+        """Export the current or last telemetry session to CSV (10 s resolution) or binary."""
+        if not self.telemetry or not self.telemetry.series:
+            QMessageBox.critical(self, "Error", "No telemetry has been recorded yet.")
+            return
+        try:
+            path, selected_filter = QFileDialog.getSaveFileName(
+                self, "Export Telemetry", "telemetry.csv", "CSV (*.csv);;Binary (*.bin)"
+            )
+            if not path:
+                return
+            if path.endswith(".bin"):
+                self.telemetry.export_binary(path)
+            else:
+                self.telemetry.export_csv(path, resolution=10)
+            QMessageBox.information(self, "Success", f"Telemetry exported to {path}")
+        except Exception as e:
+            logging.error(f"Failed to export telemetry: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to export telemetry: {e}")
+
+    def on_health_sample(self, sample):
+        """Record the latest health sample and show it on the dashboard."""
+        if self.telemetry:
+            self.telemetry.record(sample)
+        lines = []
+        if "bitrate_kbps" in sample:
+            lines.append(
+                f"OBS: {'LIVE' if sample['obs_active'] else 'offline'} | {sample['bitrate_kbps']} kbps | "
+                f"dropped {sample['dropped_frames_pct']}% | skipped {sample['skipped_frames_pct']}% | "
+                f"render lag {sample['render_lag_pct']}% | CPU {sample['cpu_pct']}% | {sample['fps']} fps"
+            )
+        if sample.get("youtube_health"):
+            lines.append(f"YouTube: {sample['youtube_stream_status']} | health {sample['youtube_health']}")
+        self.label_health_status.setText("\n".join(lines) or "Waiting for data...")
+
+    def on_health_alert(self, key, message, active):
+        """List raised alerts and note when they clear."""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        if active:
+            self.list_health_alerts.insertItem(0, f"{timestamp} ALERT: {message}")
+            self.statusBar().showMessage(f"Stream health alert: {message}")
+        else:
+            self.list_health_alerts.insertItem(0, f"{timestamp} cleared: {message}")
+
+    def toggle_live_chat(self):
+        """Open or close the live chat of the selected broadcast."""
+        if self.chat_reader and self.chat_reader.is_running():
+            self.chat_reader.stop()
+        else:
+            self.open_live_chat()
+
+    def open_live_chat(self):
+        """Start reading the live chat of the selected broadcast in the background."""
+        logging.info("Opening live chat.")
+        broadcast_id = self.get_selected_broadcast_id()
+        if not broadcast_id:
+            return
+        try:
+            live_chat_id = get_live_chat_id(self.api_service, broadcast_id)
+            # The reader thread polls with its own API service; the shared one is not thread-safe.
+            self.chat_reader = LiveChatReader(
+                build("youtube", "v3", http=self.http_pool.authorized_http()),
+                live_chat_id,
+                on_messages=self.signals.chat_messages.emit,
+                on_stopped=self.signals.chat_stopped.emit
+            )
+            self.list_chat.clear()
+            self.chat_reader.start()
+            self.button_live_chat.setText("Close Live Chat")
+        except Exception as e:
+            logging.error(f"Failed to open live chat: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to open live chat: {e}")
+
+    def on_chat_messages(self, messages):
+        """Append new chat messages, dropping the oldest beyond the reader's history size."""
+        for message in messages:
+            author = f"[{message['author']}]" if message["moderator"] else message["author"]
+            self.list_chat.addItem(f"{author}: {message['text']}")
+        while self.list_chat.count() > self.chat_reader.history.maxlen:
+            self.list_chat.takeItem(0)
+        self.list_chat.scrollToBottom()
+
+    def on_chat_stopped(self, reason):
+        """Reset the chat controls once the reader has stopped."""
+        self.button_live_chat.setText("Open Live Chat")
+        self.list_chat.addItem(f"-- {reason} --")
+
+    def run_in_background(self, name, function, on_done):
+        """Run function on a worker thread and call on_done(result, error) back on the GUI thread."""
+        def worker():
+            try:
+                result, error = function(), None
+            except Exception as e:
+                logging.error(f"Background task '{name}' failed: {e}")
+                result, error = None, e
+            self.signals.task_finished.emit(on_done, result, error)
+
+        threading.Thread(target=worker, name=name, daemon=True).start()
+
+    def submit_operation(self, kind, payload, return_key=False):
+        """Journal a mutating operation, then apply it right away if nothing is queued ahead of it.
+
+        Returns the result, or None when the operation stays queued for replay. Errors other than
+        lost connectivity are raised as before.
+        """
+        if kind == "thumbnail":
+            # The source file may be overwritten by the next upload; keep a copy for replay
+            key = self.journal.enqueue(kind, payload)
+            payload = dict(payload, path=keep_file(payload["path"], key))
+            self.journal.save_progress(key, payload)
+        else:
+            key = self.journal.enqueue(kind, payload)
+        result = None
+        if self.journal.depth() == 1 and not self.replay_in_progress:
             try:
-                self.obs_client.disconnect()
-                logging.info("Disconnected from OBS WebSocket.")
+                result = apply_operation(self.api_service, self.journal, key)
             except Exception as e:
-                logging.error(f"Failed to disconnect OBS WebSocket: {e}")
+                if not is_network_error(e):
+                    raise
+                logging.warning(f"Network unavailable, {kind} operation queued: {e}")
+        self.update_journal_status()
+        return (key, result) if return_key else result
+
+    def update_journal_status(self):
+        """Show how many operations are waiting for connectivity."""
+        depth = self.journal.depth()
+        self.label_journal.setText(f"Offline queue: {depth} operation(s) pending" if depth else "Offline queue: empty")
+        self.button_replay_journal.setEnabled(depth > 0 and not self.replay_in_progress)
+
+    def replay_journal(self):
+        """Apply queued operations in order on a worker thread."""
+        if self.replay_in_progress or not self.credentials or not self.journal.depth():
+            return
+        self.replay_in_progress = True
+        self.update_journal_status()
+
+        def on_progress(done, total, operation, error):
+            status = "applied" if error is None else f"{'still offline' if is_network_error(error) else 'failed'}: {error}"
+            self.signals.activity.emit(f"Replay {done}/{total} {operation['kind']}: {status}")
+
+        def run():
+            with self.http_pool.service() as api_service:
+                return replay(api_service, self.journal, on_progress)
+
+        def on_done(result, error):
+            self.replay_in_progress = False
+            self.update_journal_status()
+            if result and result[0]:
+                if self.pending_create_key:
+                    created = self.journal.get(self.pending_create_key)
+                    if created["state"] == "done":
+                        self.current_broadcast_id = created["result"]["broadcast_id"]
+                        self.stream_id = created["result"]["stream_id"]
+                        self.pending_create_key = None
+                self.load_scheduled_streams()
+
+        self.run_in_background("journal-replay", run, on_done)
+
+    def setup_diagnostics_menu(self):
+        """Add a Diagnostics menu to switch the stall watchdog, CPU profiler and memory tracing at runtime."""
+        menu = self.menuBar().addMenu("Diagnostics")
+
+        self.action_watchdog = QAction("Stall Watchdog", self, checkable=True, checked=True)
+        self.action_watchdog.toggled.connect(self.toggle_stall_watchdog)
+        menu.addAction(self.action_watchdog)
+
+        self.action_profiler = QAction("CPU Profiler", self, checkable=True)
+        self.action_profiler.toggled.connect(self.toggle_profiler)
+        menu.addAction(self.action_profiler)
+
+        self.action_memory = QAction("Memory Tracing", self, checkable=True)
+        self.action_memory.toggled.connect(self.toggle_memory_tracing)
+        menu.addAction(self.action_memory)
+
+        action_stalls = QAction("Show Recent Stalls", self)
+        action_stalls.triggered.connect(self.show_stalls)
+        menu.addAction(action_stalls)
+
+    def toggle_stall_watchdog(self, enabled):
+        if enabled:
+            self.diagnostics.watchdog.start()
+        else:
+            self.diagnostics.watchdog.stop()
+
+    def toggle_profiler(self, enabled):
+        """Start profiling the GUI thread, or stop and save the profile."""
+        try:
+            if enabled:
+                self.diagnostics.start_profiling()
+                self.statusBar().showMessage("CPU profiling...")
+            else:
+                path = self.diagnostics.stop_profiling()
+                QMessageBox.information(self, "Profile Saved", f"CPU profile saved to {path}")
+        except Exception as e:
+            logging.error(f"Failed to toggle CPU profiler: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to toggle CPU profiler: {e}")
+
+    def toggle_memory_tracing(self, enabled):
+        """Start tracing allocations, or stop and save a snapshot with the growth since the start."""
+        try:
+            if enabled:
+                self.diagnostics.start_memory_tracing()
+                self.statusBar().showMessage("Tracing memory allocations...")
+            else:
+                path = self.diagnostics.stop_memory_tracing()
+                QMessageBox.information(self, "Memory Snapshot Saved", f"Memory snapshot saved to {path}")
+        except Exception as e:
+            logging.error(f"Failed to toggle memory tracing: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to toggle memory tracing: {e}")
+
+    def show_stalls(self):
+        """Show the longest recent GUI stalls with the innermost lines of their stacks."""
+        stalls = sorted(self.diagnostics.watchdog.stalls, key=lambda stall: stall["duration_ms"], reverse=True)[:5]
+        if not stalls:
+            QMessageBox.information(self, "GUI Stalls", "No stalls recorded.")
+            return
+        path = self.diagnostics.save_stalls()
+        text = "\n\n".join(
+            f"{stall['started']} blocked {stall['duration_ms']} ms:\n" + "".join(stall["stack"].splitlines(True)[-4:])
+            for stall in stalls
+        )
+        QMessageBox.information(self, "GUI Stalls", f"{text}\n\nAll stalls saved to {path}")
+
+    def log_activity(self, message):
+        """Show a progress line from a background job."""
+        self.list_activity.insertItem(0, f"{datetime.now().strftime('%H:%M:%S')} {message}")
+        self.statusBar().showMessage(message)
+
+    def start_post_stream(self, broadcast_id):
+        """Run the post-stream jobs for a finished broadcast in the background."""
+        try:
+            if self.post_stream is None:
+                def on_status(broadcast_id, job, status, detail):
+                    self.signals.post_stream_status.emit(broadcast_id, job, status, detail)
+
+                self.post_stream = PostStreamPipeline(self.http_pool, load_post_stream_config(), on_status)
+        except Exception as e:
+            logging.error(f"Failed to load post-stream jobs: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to load post-stream jobs: {e}")
+            return
+        context = {"markers": list(self.scene_markers), "playlist_index": self.playlist_index}
+        if not self.post_stream.submit(broadcast_id, context):
+            self.statusBar().showMessage(f"Post-stream jobs are already running for {broadcast_id}.")
+
+    def run_post_stream_for_selected(self):
+        """Run (or re-run) the post-stream jobs for the selected broadcast."""
+        if not self.credentials:
+            QMessageBox.critical(self, "Error", "Please authenticate first!")
+            return
+        broadcast_id = self.get_selected_broadcast_id()
+        if broadcast_id:
+            self.start_post_stream(broadcast_id)
+
+    def on_post_stream_status(self, broadcast_id, job, status, detail):
+        """Keep one row per broadcast and job up to date."""
+        text = f"{broadcast_id}  {job}: {status}" + (f" ({detail})" if detail else "")
+        item = self.post_stream_items.get((broadcast_id, job))
+        if item is None:
+            self.list_post_stream.addItem(text)
+            self.post_stream_items[(broadcast_id, job)] = self.list_post_stream.item(self.list_post_stream.count() - 1)
+        else:
+            item.setText(text)
+        if status in (FAILED, BLOCKED):
+            self.log_activity(f"Post-stream job '{job}' {status} for {broadcast_id}: {detail}")
+
+    def batch_thumbnails(self):
+        """Render thumbnails from the template for every upcoming broadcast and upload them."""
+        logging.info("Starting batch thumbnail job.")
+        if not self.credentials:
+            QMessageBox.critical(self, "Error", "Please authenticate first!")
+            return
+        try:
+            template = load_thumbnail_template()
+            if not os.path.exists(template["template"]):
+                QMessageBox.critical(
+                    self, "Error",
+                    f"Template image '{template['template']}' not found. Set it in thumbnail_template.json."
+                )
+                return
+        except Exception as e:
+            logging.error(f"Failed to load thumbnail template: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to load thumbnail template: {e}")
+            return
+
+        def on_progress(broadcast_id, stage, ok, detail):
+            status = "done" if ok else f"failed: {detail}"
+            self.signals.activity.emit(f"Thumbnail {stage} {broadcast_id}: {status}")
+
+        def run():
+            broadcasts = []
+            with self.http_pool.service() as api_service:
+                request = list_request(
+                    api_service.liveBroadcasts(), ["id", "snippet.title", "snippet.scheduledStartTime"],
+                    "liveBroadcasts.list(upcoming)",
+                    paged=True,
+                    broadcastStatus="upcoming",
+                    maxResults=50
+                )
+                while request is not None:
+                    response = request.execute()
+                    broadcasts.extend(response.get("items", []))
+                    request = api_service.liveBroadcasts().list_next(request, response)
+            self.signals.activity.emit(f"Rendering thumbnails for {len(broadcasts)} upcoming broadcasts.")
+            return BatchThumbnailJob(self.http_pool, template, on_progress).run(broadcasts)
+
+        def on_done(result, error):
+            self.button_batch_thumbnails.setEnabled(True)
+            if error:
+                QMessageBox.critical(self, "Error", f"Batch thumbnail job failed: {error}")
+            else:
+                QMessageBox.information(self, "Success", f"Rendered {result[0]} and uploaded {result[1]} thumbnails.")
+
+        self.button_batch_thumbnails.setEnabled(False)
+        self.run_in_background("batch-thumbnails", run, on_done)
+
+    def open_broadcast_history(self):
+        """Show the broadcast history search and bring it up to date in the background."""
+        if not self.history_dialog:
+            self.history_dialog = BroadcastHistoryDialog(self.history, self.sync_broadcast_history, self)
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+        self.sync_broadcast_history()
+
+    def sync_broadcast_history(self, full=False):
+        """Fetch new and changed broadcasts into the local history database."""
+        if self.history_sync_in_progress or not self.credentials:
+            return
+        self.history_sync_in_progress = True
+        if self.history_dialog:
+            self.history_dialog.button_sync.setEnabled(False)
+
+        def on_progress(seen, changed):
+            self.signals.activity.emit(f"Broadcast history: {seen} checked, {changed} new or changed")
+
+        def run():
+            with self.http_pool.service() as api_service:
+                return self.history.sync(api_service, full, on_progress)
+
+        def on_done(result, error):
+            self.history_sync_in_progress = False
+            if self.history_dialog:
+                self.history_dialog.button_sync.setEnabled(True)
+                self.history_dialog.reload()
+            if error:
+                QMessageBox.critical(self, "Error", f"Failed to sync broadcast history: {error}")
+
+        self.run_in_background("history-sync", run, on_done)
+
+    def run_preflight_check(self):
+        """Check credentials, quota, OBS, binding and ingestion concurrently and report the results."""
+        logging.info("Running pre-flight check.")
+        broadcast_id = self.combo_scheduled_streams.currentData()
+
+        def on_result(result):
+            self.signals.activity.emit(f"Pre-flight {result['name']}: {result['status']} ({result['ms']:.0f} ms)")
+
+        def run():
+            started = time.perf_counter()
+            results = run_preflight(self.credentials, primary_endpoint(self.obs_config)[1], broadcast_id,
+                                    on_result=on_result)
+            return results, (time.perf_counter() - started) * 1000
+
+        def on_done(result, error):
+            self.button_preflight.setEnabled(True)
+            if error:
+                QMessageBox.critical(self, "Error", f"Pre-flight check failed to run: {error}")
+                return
+            results, elapsed_ms = result
+            report = f"{format_report(results)}\n\nTotal: {elapsed_ms:.0f} ms"
+            if all(check["status"] == PASS for check in results):
+                QMessageBox.information(self, "Pre-flight: Ready", report)
+            elif any(check["status"] == FAIL for check in results):
+                QMessageBox.critical(self, "Pre-flight: Not Ready", report)
+            else:
+                QMessageBox.warning(self, "Pre-flight: Check Warnings", report)
+
+        self.button_preflight.setEnabled(False)
+        self.run_in_background("preflight", run, on_done)
+
+    def add_broadcasts_to_playlist(self):
+        """Add the selected broadcast, or every broadcast in the history matching a search, to the chosen playlist."""
+        logging.info("Adding broadcasts to playlist.")
+        playlist_id = self.combo_playlist.currentData()
+        if not self.credentials or not playlist_id:
+            QMessageBox.critical(self, "Error", "Please authenticate and select a playlist first!")
+            return
+        text, accepted = QInputDialog.getText(
+            self, "Add Broadcasts to Playlist",
+            "Add broadcasts from the history whose title or description matches\n"
+            "(leave empty to add only the selected scheduled stream):"
+        )
+        if not accepted:
+            return
+        if text.strip():
+            video_ids = [row["id"] for row in self.history.query(text=text.strip(), limit=10000)]
+        else:
+            video_ids = [self.combo_scheduled_streams.currentData()] if self.combo_scheduled_streams.currentData() else []
+        if not video_ids:
+            QMessageBox.critical(self, "Error", "No matching broadcasts. Open Broadcast History to sync it first.")
+            return
+
+        # Preview from the local index; the job re-reads the playlist before inserting
+        to_insert, skipped, deferred = plan_playlist_add(self.playlist_index, playlist_id, video_ids)
+        answer = QMessageBox.question(
+            self, "Add Broadcasts to Playlist",
+            f"{len(video_ids)} broadcasts match; {len(skipped)} are already in '{self.combo_playlist.currentText()}'.\n"
+            f"Up to {len(to_insert)} will be added ({len(to_insert) * INSERT_COST} quota units)"
+            + (f"; {len(deferred)} exceed today's budget and will be left for later." if deferred else ".")
+            + "\n\nContinue?"
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        def on_progress(done, total, video_id, error):
+            self.signals.activity.emit(f"Playlist add {done}/{total} {video_id}: {'done' if error is None else error}")
+
+        def run():
+            return BulkPlaylistAdd(self.http_pool, self.playlist_index, playlist_id, on_progress=on_progress).run(video_ids)
+
+        def on_done(result, error):
+            self.button_add_to_playlist.setEnabled(True)
+            if error:
+                QMessageBox.critical(self, "Error", f"Failed to add broadcasts to playlist: {error}")
+                return
+            message = (f"Added {len(result['added'])}, skipped {len(result['skipped'])} already in the playlist, "
+                       f"deferred {len(result['deferred'])} for quota ({result['quota_used']} units used).")
+            if result["failed"]:
+                QMessageBox.warning(self, "Partially Done", f"{message}\n{len(result['failed'])} failed; see the log.")
+            else:
+                QMessageBox.information(self, "Success", message)
+
+        self.button_add_to_playlist.setEnabled(False)
+        self.run_in_background("playlist-add", run, on_done)
+
+    def export_broadcasts(self):
+        """Export every broadcast on the channel to a file in the background, or stop the running export."""
+        if self.broadcast_export:
+            self.broadcast_export.stop()
+            self.button_export_broadcasts.setEnabled(False)
+            return
+        if not self.credentials:
+            QMessageBox.critical(self, "Error", "Please authenticate first!")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Broadcasts", "broadcasts.csv",
+                                              "CSV (*.csv);;JSON Lines (*.jsonl)")
+        if not path:
+            return
+        try:
+            export = BroadcastExport(self.credentials, path, on_progress=lambda rows, pages: self.signals.activity.emit(
+                f"Broadcast export: {rows} written"))
+            checkpoint = export.checkpoint()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to start the export: {e}")
+            return
+        restart = False
+        if checkpoint:
+            answer = QMessageBox.question(
+                self, "Resume Export",
+                f"An unfinished export to this file has {checkpoint['rows']} broadcasts. Continue it?\n"
+                f"(No starts over.)"
+            )
+            restart = answer != QMessageBox.StandardButton.Yes
+        self.broadcast_export = export
+        self.button_export_broadcasts.setText("Stop Export")
+        self.run_in_background("broadcast-export", lambda: export.run(restart=restart), self.on_broadcasts_exported)
+
+    def on_broadcasts_exported(self, result, error):
+        path = self.broadcast_export.path
+        self.broadcast_export = None
+        self.button_export_broadcasts.setText("Export All Broadcasts (CSV/JSONL)")
+        self.button_export_broadcasts.setEnabled(True)
+        if error:
+            QMessageBox.critical(self, "Error", f"Broadcast export failed: {error}\n\nExport to the same file again to resume.")
+        elif result["complete"]:
+            QMessageBox.information(self, "Success", f"Exported {result['rows']} broadcasts to {path}.")
+        else:
+            self.log_activity(f"Broadcast export stopped after {result['rows']} broadcasts; export to {path} again to resume.")
+
+    def open_bulk_edit(self):
+        """Open the bulk metadata editor over the local broadcast history."""
+        if not self.credentials:
+            QMessageBox.critical(self, "Error", "Please authenticate first!")
+            return
+
+        def on_progress(done, total, broadcast_id, error):
+            self.signals.activity.emit(f"Metadata update {done}/{total} {broadcast_id}: {'done' if error is None else error}")
+
+        editor = BulkMetadataEditor(self.http_pool, self.history, on_progress=on_progress)
+        self.bulk_edit_dialog = BulkEditDialog(self.history, editor, self.run_in_background, self)
+        self.bulk_edit_dialog.show()
+
+    def show_api_usage(self):
+        """Show how many bytes each API call has transferred and how long parsing took."""
+        lines = [
+            f"{label}: {entry['calls']} responses, {entry['bytes'] / 1024:.1f} KiB, "
+            f"{entry['parse_seconds'] * 1000:.1f} ms parsing"
+            for label, entry in API_STATS.summary().items()
+        ]
+        if self.http_pool:
+            stats = self.http_pool.stats()
+            lines.append(
+                f"Connection pool: {stats['created']}/{stats['size']} connections, peak {stats['peak_in_use']} "
+                f"in use, {stats['waits']} of {stats['checkouts']} checkouts waited "
+                f"(max {stats['max_wait_seconds'] * 1000:.0f} ms), {stats['refreshes']} token refreshes"
+            )
+        QMessageBox.information(self, "API Usage", "\n".join(lines) or "No API calls yet.")
+
+    def closeEvent(self, event):
+        """Gracefully close the application."""
+        API_STATS.log_summary()
+        if self.http_pool:
+            self.http_pool.log_summary()
+        self.heartbeat_timer.stop()
+        self.diagnostics.close()
+        self.replay_timer.stop()
+        self.journal.close()
+        self.history.close()
+        self.playlist_index.close()
+        if self.vod_uploader:
+            self.vod_uploader.stop()
+        if self.post_stream:
+            self.post_stream.close()
+        self.stop_health_monitor()
+        if self.chat_reader:
+            self.chat_reader.on_stopped = None
+            self.chat_reader.stop()
+        if self.scene_cache:
+            self.scene_cache.stop()
+        incidents = []
+        for watchdog in self.output_watchdogs.values():
+            watchdog.stop()
+            incidents.extend(watchdog.incidents)
+        if incidents:
+            summary = outage_summary(incidents)
+            logging.info(f"Stream outages this session: {summary['count']} ({summary['recovered']} recovered, "
+                         f"median {summary['median_ms'] or 0:.0f} ms, max {summary['max_ms'] or 0:.0f} ms).")
+        self.obs_pool.close()
+        logging.info("Disconnected from OBS WebSocket.")
         event.accept()
 
     def get_default_title(self):
@@ -336,9 +1684,9 @@ class YouTubeLiveStreamApp(QMainWindow):
             return
 
         title = self.input_title.text().strip()
-        now = datetime.now()
-        start_time = datetime.combine(now.date(), self.input_start_time.time().toPyTime()).astimezone().isoformat()
-        end_time = datetime.combine(now.date(), self.input_end_time.time().toPyTime()).astimezone().isoformat()
+        start, end = self.scheduled_times()
+        start_time, end_time = start.isoformat(), end.isoformat()
+        stream_id = self.combo_stream_key.currentData() if self.checkbox_use_stream_key.isChecked() else None
         privacy_status = self.combo_privacy.currentText().lower()
 
         if not title or not start_time or not end_time:
@@ -346,55 +1694,30 @@ class YouTubeLiveStreamApp(QMainWindow):
             QMessageBox.critical(self, "Error", "Please fill in all fields!")
             return
 
-        try:
-            # 1. Create the livestream first
-            stream_request = self.api_service.liveStreams().insert(
-                part="snippet,cdn",
-                body={
-                    "snippet": {
-                        "title": title
-                    },
-                    "cdn": {
-                        "frameRate": "60fps",
-                        "ingestionType": "rtmp",
-                        "resolution": "1080p"
-                    }
-                }
-            )
-            stream_response = stream_request.execute()
-            self.stream_id = stream_response['id']
-            logging.info(f"Stream created with ID: {self.stream_id}")
-
-            # 2. Create the broadcast
-            broadcast_request = self.api_service.liveBroadcasts().insert(
-                part="snippet,status,contentDetails",
-                body={
-                    "snippet": {
-                        "title": title,
-                        "scheduledStartTime": start_time,
-                        "scheduledEndTime": end_time,
-                    },
-                    "status": {
-                        "privacyStatus": privacy_status,
-                    },
-                    "contentDetails": {
-                        "enableAutoStart": True,
-                        "enableAutoStop": True
-                    },
-                },
+        conflicts = self.schedule_conflicts()
+        if conflicts:
+            answer = QMessageBox.question(
+                self, "Schedule Conflict",
+                f"'{self.combo_stream_key.currentText()}' is already scheduled for:\n"
+                + "\n".join(describe(interval) for interval in conflicts)
+                + "\n\nOnly one broadcast can use a stream key at a time. Create anyway?"
             )
-            broadcast_response = broadcast_request.execute()
-            self.current_broadcast_id = broadcast_response["id"]
-            logging.info(f"Broadcast created with ID: {self.current_broadcast_id}")
-
-            # 3. Bind the stream to the broadcast
-            bind_request = self.api_service.liveBroadcasts().bind(
-                part="id,contentDetails",
-                id=self.current_broadcast_id,
-                streamId=self.stream_id
-            )
-            bind_request.execute()
-            logging.info("Stream bound to broadcast successfully")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+
+        try:
+            # Create the broadcast (and a new stream unless binding to the selected key), then bind them
+            # (journaled, so it survives going offline)
+            payload = {"title": title, "start_time": start_time, "end_time": end_time, "privacy_status": privacy_status}
+            if stream_id:
+                payload["stream_id"] = stream_id
+            key, result = self.submit_operation("create", payload, return_key=True)
+            if result is None:
+                self.current_broadcast_id, self.pending_create_key = None, key
+                QMessageBox.information(self, "Queued", "No connection. The live stream will be created when it returns.")
+                return
+            self.current_broadcast_id, self.stream_id = result["broadcast_id"], result["stream_id"]
+            self.pending_create_key = None
 
             QMessageBox.information(self, "Success", "Live stream created and bound successfully!")
             self.load_scheduled_streams()
@@ -405,12 +1728,11 @@ class YouTubeLiveStreamApp(QMainWindow):
     
     
     def get_selected_broadcast_id(self):
-        selected_item = self.list_scheduled_streams.currentItem()
-        if not selected_item:
+        broadcast_id = self.combo_scheduled_streams.currentData()
+        if not broadcast_id:
             QMessageBox.critical(self, "Error", "Please select a stream from the list.")
             logging.error("No stream selected from the list.")
             return None
-        broadcast_id = selected_item.text().split("(")[-1][:-1]
         logging.info(f"Selected stream ID: {broadcast_id}")
         return broadcast_id
 
@@ -423,15 +1745,7 @@ class YouTubeLiveStreamApp(QMainWindow):
 
         try:
             # Fetch current lifecycle status
-            response = self.api_service.liveBroadcasts().list(
-             part="status",
-                id=broadcast_id
-        ).execute()
-
-            if not response.get("items"):
-                raise ValueError("Broadcast not found.")
-
-            current_status = response["items"][0]["status"]["lifeCycleStatus"]
+            current_status = get_lifecycle_status(self.api_service, broadcast_id)
             logging.info(f"Current lifecycle status: {current_status}")
 
             if current_status == "ready":
@@ -451,11 +1765,11 @@ class YouTubeLiveStreamApp(QMainWindow):
                 QMessageBox.information(self, "Info", "Stream is already live!")
             else:
                 logging.error(f"Invalid transition from '{current_status}'.")
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"Cannot start live stream: Broadcast is in '{current_status}' state."
-            )
+                QMessageBox.critical(
+                    self,
+                    "Error",
+                    f"Cannot start live stream: Broadcast is in '{current_status}' state."
+                )
 
         except ValueError as ve:
             logging.error(f"Validation error: {ve}")
@@ -473,15 +1787,7 @@ class YouTubeLiveStreamApp(QMainWindow):
 
         try:
             # Fetch current lifecycle status
-            response = self.api_service.liveBroadcasts().list(
-                part="status",
-                id=broadcast_id
-            ).execute()
-
-            if not response.get("items"):
-                raise ValueError("Broadcast not found")
-
-            current_status = response["items"][0]["status"]["lifeCycleStatus"]
+            current_status = get_lifecycle_status(self.api_service, broadcast_id)
             logging.info(f"Current lifecycle status: {current_status}")
 
             # Valid transitions:
@@ -498,6 +1804,7 @@ class YouTubeLiveStreamApp(QMainWindow):
                 logging.info(f"Stream transitioned to complete: {broadcast_id}")
                 QMessageBox.information(self, "Success", "Live stream stopped successfully!")
                 self.load_scheduled_streams()
+                self.start_post_stream(broadcast_id)
 
             elif current_status == "complete":
                 QMessageBox.information(self, "Info", "Stream is already complete!")
@@ -11,7 +11,7 @@ from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from datetime import datetime, timezone, timedelta
-from PIL import Image
+from thumbnails import prepare_thumbnail
 import obsws_python as obs
 
 # Configure logging
@@ -305,22 +305,8 @@ class YouTubeLiveStreamApp(QMainWindow):
             return
 
         try:
-            # Resize the image to 1280x720 with a 16:9 aspect ratio
-            with Image.open(thumbnail_path) as img:
-                img = img.convert("RGB")
-                img = img.resize((1280, 720), Image.LANCZOS)
-                resized_thumbnail_path = "resized_thumbnail.jpg"
-                img.save(resized_thumbnail_path, "JPEG", quality=85)
-
-            file_size = os.path.getsize(resized_thumbnail_path)
-            if file_size > 2 * 1024 * 1024:  # 2 MB limit
-                logging.error("Thumbnail file size exceeds 2 MB after resizing.")
-                QMessageBox.critical(
-                    self, "Error", "Thumbnail file size exceeds 2 MB. Please select a smaller image."
-                )
-                return
-
-            self.thumbnail_path = resized_thumbnail_path
+            # Decode at reduced size, crop to 16:9 and resize to 1280x720 (raises if still over 2 MB)
+            self.thumbnail_path = prepare_thumbnail(thumbnail_path)
             logging.info(f"Thumbnail resized and saved: {self.thumbnail_path}")
 
             if not self.current_broadcast_id:
@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import obsws_python as obs
+from obsws_python.error import OBSSDKRequestError
+from websocket import WebSocketException
+
+DEFAULT_INSTANCE = "main"
+
+
+def obs_endpoints(config):
+    """Return {name: {"host", "port", "password"}} from obs_config.json.
+
+    The config either lists named instances, e.g.
+        {"instances": {"main": {"host": ..., "port": ..., "password": ...}, "backup": {...}}}
+    or, as before, holds a single host/port/password, which becomes the instance "main".
+    The first instance is the primary one.
+    """
+    if config.get("instances"):
+        return {name: dict(endpoint) for name, endpoint in config["instances"].items()}
+    return {DEFAULT_INSTANCE: {"host": config["host"], "port": config["port"], "password": config["password"]}}
+
+
+def primary_endpoint(config):
+    """Return the name and settings of the first configured OBS instance."""
+    return next(iter(obs_endpoints(config).items()))
+
+
+class ObsPool:
+    """One persistent WebSocket connection per OBS instance, with commands fanned out concurrently.
+
+    ReqClient is not thread-safe, so each connection is only used under its own lock; commands
+    to different instances run in parallel, commands to the same instance are serialized.
+    """
+
+    def __init__(self, endpoints, timeout=3):
+        self.endpoints = endpoints
+        self.timeout = timeout
+        self._clients = {}
+        self._locks = {name: threading.Lock() for name in endpoints}
+        self._executor = ThreadPoolExecutor(max_workers=max(len(endpoints), 1), thread_name_prefix="obs-pool")
+
+    @property
+    def names(self):
+        return list(self.endpoints)
+
+    def _connect(self, name):
+        endpoint = self.endpoints[name]
+        client = obs.ReqClient(host=endpoint["host"], port=endpoint["port"], password=endpoint["password"],
+                               timeout=self.timeout)
+        self._clients[name] = client
+        logging.info(f"Connected to OBS instance '{name}' at {endpoint['host']}:{endpoint['port']}.")
+        return client
+
+    def _drop(self, name):
+        client = self._clients.pop(name, None)
+        if client:
+            try:
+                client.disconnect()
+            except Exception as e:
+                logging.error(f"Failed to disconnect OBS instance '{name}': {e}")
+
+    def is_connected(self, name):
+        return name in self._clients
+
+    @contextmanager
+    def client(self, name):
+        """Yield the instance's connection (connecting if needed) while holding its lock."""
+        with self._locks[name]:
+            yield self._clients.get(name) or self._connect(name)
+
+    def _run(self, name, action):
+        """Run action(client) on one instance; a dropped connection is re-established once."""
+        started = time.perf_counter()
+        try:
+            with self._locks[name]:
+                client = self._clients.get(name) or self._connect(name)
+                try:
+                    result = action(client)
+                except (OSError, WebSocketException) as e:
+                    logging.warning(f"OBS instance '{name}' connection lost ({e}); reconnecting.")
+                    self._drop(name)
+                    result = action(self._connect(name))
+            return {"ok": True, "result": result, "ms": round((time.perf_counter() - started) * 1000, 1)}
+        except (OBSSDKRequestError, ValueError) as e:
+            # OBS (or the action's own check) refused the request, e.g. already streaming; the connection is fine
+            logging.error(f"OBS instance '{name}' rejected the command: {e}")
+            return {"ok": False, "error": str(e), "ms": round((time.perf_counter() - started) * 1000, 1)}
+        except Exception as e:
+            logging.error(f"OBS instance '{name}' command failed: {e}")
+            with self._locks[name]:
+                self._drop(name)
+            return {"ok": False, "error": str(e), "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def call(self, action, names=None):
+        """Run action(client) on the named instances (all by default) concurrently.
+
+        Returns {name: {"ok", "result" or "error", "ms"}}; one instance failing never stops the others.
+        """
+        names = names or self.names
+        futures = {name: self._executor.submit(self._run, name, action) for name in names}
+        return {name: future.result() for name, future in futures.items()}
+
+    def connect(self, names=None):
+        """(Re)connect to the named instances and return their OBS versions."""
+        for name in names or self.names:
+            with self._locks[name]:
+                self._drop(name)
+        return self.call(lambda client: client.get_version().obs_version, names)
+
+    def start_stream(self, names=None):
+        return self.call(lambda client: client.start_stream(), names)
+
+    def stop_stream(self, names=None):
+        return self.call(lambda client: client.stop_stream(), names)
+
+    def start_record(self, names=None):
+        return self.call(lambda client: client.start_record(), names)
+
+    def stop_record(self, names=None):
+        return self.call(lambda client: client.stop_record(), names)
+
+    def set_scene(self, scene_name, names=None):
+        return self.call(lambda client: client.set_current_program_scene(scene_name), names)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for name in self.names:
+            with self._locks[name]:
+                self._drop(name)
+
+
+def summarize(results):
+    """Return (all_ok, text) for a call() result, one line per instance with its latency."""
+    lines = [
+        f"{name}: {'OK' if outcome['ok'] else 'FAILED - ' + outcome['error']} ({outcome['ms']:.0f} ms)"
+        for name, outcome in results.items()
+    ]
+    return all(outcome["ok"] for outcome in results.values()), "\n".join(lines)
@@ -0,0 +1,111 @@
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from api_fields import list_request
+
+DEFAULT_PORTS = {"rtmp": 1935, "rtmps": 443}
+PROBE_ATTEMPTS = 3
+PROBE_TIMEOUT = 2  # Seconds per connect attempt
+
+
+def fetch_ingestion(api_service, stream_id):
+    """Return (stream title, cdn.ingestionInfo) of a liveStream."""
+    response = list_request(
+        api_service.liveStreams(),
+        ["id", "snippet.title", "cdn.ingestionInfo.streamName", "cdn.ingestionInfo.ingestionAddress",
+         "cdn.ingestionInfo.backupIngestionAddress", "cdn.ingestionInfo.rtmpsIngestionAddress",
+         "cdn.ingestionInfo.rtmpsBackupIngestionAddress"],
+        "liveStreams.list(provision)",
+        id=stream_id
+    ).execute()
+    if not response.get("items"):
+        raise ValueError(f"Stream {stream_id} not found.")
+    item = response["items"][0]
+    ingestion = item.get("cdn", {}).get("ingestionInfo", {})
+    if not ingestion.get("streamName"):
+        raise ValueError(f"Stream '{item['snippet']['title']}' has no RTMP ingestion info.")
+    return item["snippet"]["title"], ingestion
+
+
+def ingestion_candidates(ingestion, protocol="rtmps"):
+    """Return [(label, url)] for the preferred protocol's primary and backup addresses, then the other protocol's."""
+    addresses = {
+        "rtmps": [("rtmps primary", ingestion.get("rtmpsIngestionAddress")),
+                  ("rtmps backup", ingestion.get("rtmpsBackupIngestionAddress"))],
+        "rtmp": [("rtmp primary", ingestion.get("ingestionAddress")),
+                 ("rtmp backup", ingestion.get("backupIngestionAddress"))],
+    }
+    ordered = addresses[protocol] + addresses["rtmp" if protocol == "rtmps" else "rtmps"]
+    return [(label, url) for label, url in ordered if url]
+
+
+def probe_connect(url, attempts=PROBE_ATTEMPTS, timeout=PROBE_TIMEOUT):
+    """Return the best TCP connect time to the URL's host in ms, or None if it is unreachable.
+
+    Name resolution is done once up front so it does not count towards the connect time.
+    """
+    parsed = urlparse(url)
+    port = parsed.port or DEFAULT_PORTS.get(parsed.scheme, 1935)
+    try:
+        family, kind, proto, _, address = socket.getaddrinfo(parsed.hostname, port, type=socket.SOCK_STREAM)[0]
+    except OSError as e:
+        logging.warning(f"Cannot resolve {parsed.hostname}: {e}")
+        return None
+    best = None
+    for _ in range(attempts):
+        started = time.perf_counter()
+        try:
+            with socket.socket(family, kind, proto) as sock:
+                sock.settimeout(timeout)
+                sock.connect(address)
+        except OSError:
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def probe_candidates(candidates, probe=probe_connect):
+    """Probe every candidate concurrently; return [(label, url, ms or None)] in candidate order."""
+    with ThreadPoolExecutor(max_workers=max(len(candidates), 1), thread_name_prefix="ingest-probe") as executor:
+        latencies = list(executor.map(lambda candidate: probe(candidate[1]), candidates))
+    return [(label, url, ms) for (label, url), ms in zip(candidates, latencies)]
+
+
+def choose_endpoint(probes, protocol="rtmps"):
+    """Pick the fastest reachable address of the preferred protocol, falling back to the other one."""
+    reachable = [probe for probe in probes if probe[2] is not None]
+    if not reachable:
+        raise ConnectionError("No ingestion address is reachable: "
+                              + ", ".join(f"{label} ({url})" for label, url, _ in probes))
+    preferred = [probe for probe in reachable if urlparse(probe[1]).scheme == protocol]
+    return min(preferred or reachable, key=lambda probe: probe[2])
+
+
+def set_stream_service(client, server, key):
+    """Configure an OBS instance for a custom RTMP(S) server and verify it took the settings."""
+    if client.get_stream_status().output_active:
+        raise ValueError("OBS is streaming; stop the stream before changing its server or key.")
+    client.set_stream_service_settings("rtmp_custom", {"server": server, "key": key, "use_auth": False})
+    applied = client.get_stream_service_settings().stream_service_settings
+    if applied.get("server") != server or applied.get("key") != key:
+        raise ValueError("OBS did not keep the new stream settings.")
+    return server
+
+
+def provision_obs(api_service, pool, stream_id, names=None, protocol="rtmps"):
+    """Push a stream's key and fastest ingestion address into the named OBS instances.
+
+    Returns (stream title, probes, chosen (label, url, ms), pool results).
+    """
+    title, ingestion = fetch_ingestion(api_service, stream_id)
+    probes = probe_candidates(ingestion_candidates(ingestion, protocol))
+    chosen = choose_endpoint(probes, protocol)
+    logging.info(f"Ingestion probes for '{title}': "
+                 + ", ".join(f"{label} {'unreachable' if ms is None else f'{ms:.0f} ms'}" for label, _, ms in probes)
+                 + f"; using {chosen[0]}.")
+    results = pool.call(lambda client: set_stream_service(client, chosen[1], ingestion["streamName"]), names)
+    return title, probes, chosen, results
@@ -0,0 +1,139 @@
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+
+import obsws_python as obs
+
+DEFAULT_HOTKEYS = {f"Ctrl+{number}": number for number in range(1, 10)}  # Ctrl+N switches to the Nth scene
+
+
+class SceneCache:
+    """Scene list of one OBS instance, fetched once with GetSceneList and then kept current from events.
+
+    on_change() is called (on the event thread) whenever the list or the program scene changes.
+    """
+
+    def __init__(self, endpoint, on_change=None, history=200):
+        self.endpoint = endpoint
+        self.on_change = on_change
+        self.scenes = []  # Names in the order OBS shows them (top first)
+        self.current = None
+        self.switch_latencies = deque(maxlen=history)  # Request round trips of recent switches, in ms
+        self._lock = threading.Lock()
+        self._events = None
+
+    def load(self, client):
+        """Fetch the scene list once through an existing request client."""
+        response = client.get_scene_list()
+        # sceneIndex counts from the bottom of the OBS scene list
+        ordered = sorted(response.scenes, key=lambda scene: scene["sceneIndex"], reverse=True)
+        with self._lock:
+            self.scenes = [scene["sceneName"] for scene in ordered]
+            self.current = response.current_program_scene_name
+        self._changed()
+
+    def watch(self):
+        """Subscribe to scene events so the cache never needs to re-query."""
+        self.stop()
+        self._events = obs.EventClient(
+            host=self.endpoint["host"],
+            port=self.endpoint["port"],
+            password=self.endpoint["password"],
+            subs=obs.Subs.SCENES
+        )
+        self._events.callback.register([
+            self.on_scene_created,
+            self.on_scene_removed,
+            self.on_scene_name_changed,
+            self.on_scene_list_changed,
+            self.on_current_program_scene_changed,
+        ])
+        logging.info("Watching OBS scene events.")
+
+    def stop(self):
+        if self._events:
+            try:
+                self._events.disconnect()
+            except Exception as e:
+                logging.error(f"Failed to stop OBS scene events: {e}")
+            self._events = None
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    # Event handlers; obsws-python dispatches by method name
+
+    def on_scene_created(self, data):
+        if data.is_group:
+            return
+        with self._lock:
+            self.scenes.insert(0, data.scene_name)  # New scenes appear at the top in OBS
+        self._changed()
+
+    def on_scene_removed(self, data):
+        with self._lock:
+            if data.scene_name in self.scenes:
+                self.scenes.remove(data.scene_name)
+        self._changed()
+
+    def on_scene_name_changed(self, data):
+        with self._lock:
+            self.scenes = [data.scene_name if name == data.old_scene_name else name for name in self.scenes]
+            if self.current == data.old_scene_name:
+                self.current = data.scene_name
+        self._changed()
+
+    def on_scene_list_changed(self, data):
+        # Sent on reordering; the event carries the full list, so no request is needed
+        ordered = sorted(data.scenes, key=lambda scene: scene["sceneIndex"], reverse=True)
+        with self._lock:
+            self.scenes = [scene["sceneName"] for scene in ordered]
+        self._changed()
+
+    def on_current_program_scene_changed(self, data):
+        with self._lock:
+            self.current = data.scene_name
+        self._changed()
+
+    def snapshot(self):
+        """Return (scenes, current) for display."""
+        with self._lock:
+            return list(self.scenes), self.current
+
+    def scene_at(self, position):
+        """Return the name of the 1-based Nth scene, or None."""
+        with self._lock:
+            return self.scenes[position - 1] if 0 < position <= len(self.scenes) else None
+
+    def record_switch(self, milliseconds):
+        self.switch_latencies.append(milliseconds)
+
+    def latency_summary(self):
+        """Return last/median/p95 switch latency in ms, or None before the first switch."""
+        if not self.switch_latencies:
+            return None
+        ordered = sorted(self.switch_latencies)
+        return {
+            "last": self.switch_latencies[-1],
+            "median": statistics.median(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "count": len(ordered),
+        }
+
+
+def switch_scene(pool, cache, scene_name, names=None):
+    """Switch the program scene with a single SetCurrentProgramScene request per instance.
+
+    The name comes from the cache, so nothing is looked up first. Returns the pool results;
+    the slowest successful round trip is recorded as the switch latency.
+    """
+    started = time.perf_counter()
+    results = pool.set_scene(scene_name, names)
+    succeeded = [outcome["ms"] for outcome in results.values() if outcome["ok"]]
+    if succeeded:
+        cache.record_switch(max(succeeded))
+    logging.info(f"Switched to scene '{scene_name}' in {(time.perf_counter() - started) * 1000:.1f} ms.")
+    return results
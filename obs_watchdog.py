@@ -0,0 +1,302 @@
+import json
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import obsws_python as obs
+
+from api_fields import list_request
+
+STARTING = "OBS_WEBSOCKET_OUTPUT_STARTING"
+STARTED = "OBS_WEBSOCKET_OUTPUT_STARTED"
+STOPPING = "OBS_WEBSOCKET_OUTPUT_STOPPING"
+STOPPED = "OBS_WEBSOCKET_OUTPUT_STOPPED"
+RECONNECTING = "OBS_WEBSOCKET_OUTPUT_RECONNECTING"
+RECONNECTED = "OBS_WEBSOCKET_OUTPUT_RECONNECTED"
+
+OUTAGE_LOG = "stream_outages.jsonl"
+DEFAULT_RESTART_DEADLINE = 10  # Seconds after a drop by which the output must be running again
+FIRST_RETRY_DELAY = 0.25  # Seconds; doubles after every failed restart attempt
+INGEST_TIMEOUT = 60  # Seconds to wait for YouTube to report the stream active again
+INGEST_POLL_INTERVAL = 2
+SUPERVISE_INTERVAL = 1  # Seconds between checks that the event connection is still alive
+
+
+def wait_for_ingestion(pool, stream_id, timeout=INGEST_TIMEOUT, interval=INGEST_POLL_INTERVAL):
+    """Poll liveStreams.list until YouTube reports the stream active; return True if it did within timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        with pool.service() as api_service:
+            response = list_request(
+                api_service.liveStreams(), ["status.streamStatus"], "liveStreams.list(watchdog)",
+                id=stream_id
+            ).execute()
+        items = response.get("items", [])
+        if items and items[0]["status"]["streamStatus"] == "active":
+            return True
+        if time.monotonic() + interval > deadline:
+            return False
+        time.sleep(interval)
+
+
+class OutputWatchdog:
+    """Restart one OBS instance's stream output when it stops without being asked to.
+
+    OBS announces every stop it was asked for (from its UI or a request) with STOPPING before
+    STOPPED; a STOPPED without it means the output failed, or OBS gave up reconnecting. The
+    output is then restarted through the pool, retrying with backoff until restart_deadline
+    seconds after the drop, and YouTube ingestion is checked once it runs again. Outages that
+    OBS rides out itself (RECONNECTING, RECONNECTED) are timed too. Every incident is appended
+    to the outage log and passed to on_incident (on a watchdog thread).
+    """
+
+    def __init__(self, name, endpoint, pool, http_pool=None, stream_id=None, on_incident=None, on_alert=None,
+                 restart_deadline=DEFAULT_RESTART_DEADLINE, log_path=OUTAGE_LOG):
+        self.name = name
+        self.endpoint = endpoint
+        self.pool = pool  # obs_pool.ObsPool used for the restart requests
+        self.http_pool = http_pool  # http_pool.HttpPool for the ingestion check; None skips it
+        self.stream_id = stream_id  # Set by the GUI when streaming starts
+        self.on_incident = on_incident
+        self.on_alert = on_alert  # on_alert(key, message, active), as for the health monitor
+        self.restart_deadline = restart_deadline
+        self.log_path = log_path
+        self.incidents = deque(maxlen=100)
+        self._state = threading.Condition()
+        self._output_state = None
+        self._active = False
+        self._live = False  # The output got as far as STARTED, so a STOPPED is a drop rather than a failed start
+        self._stopping = False  # A STOPPING was seen, so the next STOPPED was asked for
+        self._outage = None  # {"started", "cause"} while the output is down
+        self._recovering = False
+        self._cancelled = False  # Streaming was stopped on purpose while a restart was pending
+        self._events = None
+        self._closed = threading.Event()
+        self._supervisor = None
+
+    def watch(self):
+        """Subscribe to output events and keep the subscription alive until stop()."""
+        self._closed.clear()
+        self._subscribe()
+        self._sync()
+        self._supervisor = threading.Thread(target=self._supervise, name=f"obs-watchdog-{self.name}", daemon=True)
+        self._supervisor.start()
+        logging.info(f"Watching OBS instance '{self.name}' stream output.")
+
+    def _subscribe(self):
+        self._events = obs.EventClient(
+            host=self.endpoint["host"],
+            port=self.endpoint["port"],
+            password=self.endpoint["password"],
+            subs=obs.Subs.OUTPUTS
+        )
+        self._events.callback.register(self.on_stream_state_changed)
+
+    def _sync(self):
+        """Read the output state directly, for after (re)subscribing when events may have been missed."""
+        result = self.pool.call(lambda client: client.get_stream_status().output_active, [self.name])[self.name]
+        if not result["ok"]:
+            return
+        with self._state:
+            was_active, self._active = self._active, result["result"]
+            if result["result"]:
+                # Attached mid-stream (or the events were down): a later STOPPED is a drop
+                self._live = True
+        if was_active and not result["result"] and not self._recovering:
+            # Streaming stopped while the event connection was down and nobody asked for it
+            self._begin_outage("stopped while disconnected")
+            self._start_recovery()
+
+    def _supervise(self):
+        # EventClient's thread ends quietly when the connection drops (OBS restarted, network)
+        while not self._closed.wait(SUPERVISE_INTERVAL):
+            if self._events and self._events.worker.is_alive():
+                continue
+            try:
+                self._subscribe()
+                logging.info(f"Re-subscribed to OBS instance '{self.name}' output events.")
+                self._sync()
+            except Exception as e:
+                logging.debug(f"OBS instance '{self.name}' still unreachable: {e}")
+
+    def stand_down(self):
+        """Streaming is being stopped on purpose; abandon any restart in progress."""
+        with self._state:
+            self._cancelled = self._recovering
+            self._state.notify_all()
+
+    def stop(self):
+        self._closed.set()
+        if self._events:
+            try:
+                self._events.disconnect()
+            except Exception as e:
+                logging.error(f"Failed to stop OBS output events: {e}")
+            self._events = None
+
+    # Event handler; obsws-python dispatches by method name
+
+    def on_stream_state_changed(self, data):
+        state = data.output_state
+        with self._state:
+            self._output_state = state
+            self._active = data.output_active
+            was_live = self._live
+            if state in (STARTED, RECONNECTED):
+                self._live = True
+            elif state == STOPPED:
+                self._live = False
+            self._state.notify_all()
+            if state == STOPPING:
+                self._stopping = True
+                self._cancelled = self._recovering
+                return
+            expected = self._stopping
+            if state in (STARTED, STOPPED):
+                self._stopping = False
+            recovering = self._recovering
+        if recovering:
+            return  # The recovery thread follows the states itself
+        if state == RECONNECTING and self._outage is None:
+            self._begin_outage("reconnecting")
+        elif state == RECONNECTED and self._outage:
+            self._close_outage(recovered_by="obs", attempts=0, restarted=time.monotonic())
+        elif state == STOPPED and not expected and (was_live or self._outage):
+            if self._outage is None:
+                self._begin_outage("stopped")
+            self._start_recovery()
+        elif state == STOPPED and self._outage:
+            # Stopped on purpose while OBS was still reconnecting; nothing to recover
+            self._outage = None
+            self._alert("Stream output stopped during reconnect.", False)
+
+    def _begin_outage(self, cause):
+        self._outage = {"started": time.monotonic(), "started_at": datetime.now().isoformat(timespec="seconds"),
+                        "cause": cause}
+        logging.warning(f"OBS instance '{self.name}' stream output dropped ({cause}).")
+        self._alert(f"Stream output on '{self.name}' dropped ({cause}).", True)
+
+    def _alert(self, message, active):
+        if self.on_alert:
+            self.on_alert(f"outage:{self.name}", message, active)
+
+    def _start_recovery(self):
+        with self._state:
+            if self._recovering:
+                return
+            self._recovering = True
+            self._cancelled = False
+        threading.Thread(target=self._recover, name=f"obs-restart-{self.name}", daemon=True).start()
+
+    def _wait_for_start(self, timeout):
+        """Wait for the output to report STARTED (True) or STOPPED again (False)."""
+        with self._state:
+            self._state.wait_for(lambda: self._output_state in (STARTED, STOPPED) or self._cancelled, timeout)
+            return self._output_state == STARTED and not self._cancelled
+
+    def _output_running(self):
+        """Return True if the output is running again, e.g. restarted from OBS itself during recovery."""
+        with self._state:
+            if self._output_state == STARTED:
+                return True
+        result = self.pool.call(lambda client: client.get_stream_status().output_active, [self.name])[self.name]
+        return result["ok"] and result["result"]
+
+    def _recover(self):
+        deadline = self._outage["started"] + self.restart_deadline
+        delay = FIRST_RETRY_DELAY
+        attempts = 0
+        try:
+            while not self._closed.is_set():
+                if self._cancelled:
+                    logging.info(f"Streaming on OBS instance '{self.name}' was stopped; no restart.")
+                    self._outage = None
+                    self._alert("Stream output stopped.", False)
+                    return
+                if attempts and self._output_running():
+                    self._close_outage(recovered_by="obs", attempts=attempts, restarted=time.monotonic())
+                    return
+                attempts += 1
+                with self._state:
+                    self._output_state = None
+                result = self.pool.call(lambda client: client.start_stream(), [self.name])[self.name]
+                if result["ok"] and self._wait_for_start(max(deadline - time.monotonic(), 1)):
+                    self._close_outage(recovered_by="watchdog", attempts=attempts, restarted=time.monotonic())
+                    return
+                if not result["ok"] and self._output_running():
+                    # Someone else (or OBS) already started it again; StartStream then fails with OutputRunning
+                    self._close_outage(recovered_by="obs", attempts=attempts, restarted=time.monotonic())
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                logging.warning(f"Restart attempt {attempts} on OBS instance '{self.name}' failed; "
+                                f"retrying in {min(delay, remaining):.2f} s.")
+                time.sleep(min(delay, remaining))
+                delay *= 2
+            self._close_outage(recovered_by=None, attempts=attempts, restarted=None)
+        finally:
+            with self._state:
+                self._recovering = False
+
+    def _close_outage(self, recovered_by, attempts, restarted):
+        """End the current outage and record it, checking YouTube ingestion first if the output is back."""
+        outage, self._outage = self._outage, None
+        incident = {
+            "instance": self.name,
+            "started_at": outage["started_at"],
+            "cause": outage["cause"],
+            "recovered_by": recovered_by,
+            "attempts": attempts,
+            "outage_ms": round((restarted - outage["started"]) * 1000, 1) if restarted else None,
+            "ingest_ok": None,
+            "ingest_ms": None,
+        }
+        if restarted is None:
+            logging.error(f"OBS instance '{self.name}' stream output could not be restarted within "
+                          f"{self.restart_deadline} s ({attempts} attempts).")
+            self._alert(f"Stream output on '{self.name}' is down; {attempts} restart attempts failed.", True)
+        else:
+            logging.info(f"OBS instance '{self.name}' stream output back after {incident['outage_ms']:.0f} ms "
+                         f"({recovered_by}, {attempts} restart attempts).")
+            self._alert(f"Stream output on '{self.name}' dropped ({outage['cause']}).", False)
+            if self.http_pool and self.stream_id:
+                # Off the event and restart threads, so a new drop is noticed while YouTube catches up
+                threading.Thread(target=self._check_ingestion, args=(incident, outage["started"]),
+                                 name=f"obs-ingest-{self.name}", daemon=True).start()
+                return
+        self._record(incident)
+
+    def _check_ingestion(self, incident, started):
+        try:
+            incident["ingest_ok"] = wait_for_ingestion(self.http_pool, self.stream_id)
+            incident["ingest_ms"] = round((time.monotonic() - started) * 1000, 1)
+        except Exception as e:
+            logging.error(f"Failed to check YouTube ingestion after restart: {e}")
+        if incident["ingest_ok"] is False:
+            self._alert(f"YouTube is not receiving the stream from '{self.name}' after the restart.", True)
+        self._record(incident)
+
+    def _record(self, incident):
+        self.incidents.append(incident)
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(incident) + "\n")
+        except OSError as e:
+            logging.error(f"Failed to write outage log: {e}")
+        if self.on_incident:
+            self.on_incident(incident)
+
+
+def outage_summary(incidents):
+    """Return count, recovered count and median/max outage in ms for a list of incident records."""
+    recovered = [incident["outage_ms"] for incident in incidents if incident["outage_ms"] is not None]
+    return {
+        "count": len(incidents),
+        "recovered": len(recovered),
+        "median_ms": statistics.median(recovered) if recovered else None,
+        "max_ms": max(recovered) if recovered else None,
+    }
@@ -0,0 +1,292 @@
+import errno
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+from api_fields import list_request, projected
+from stream_session import bind_stream, find_broadcast, find_stream, insert_broadcast, insert_stream
+
+JOURNAL_PATH = "operation_journal.db"
+JOURNAL_FILES_DIR = "journal_files"  # Copies of files (thumbnails) that pending operations upload
+
+
+# OSErrors that are not ConnectionError subclasses but still mean the network is down
+NETWORK_ERRNOS = {errno.ENETDOWN, errno.ENETUNREACH, errno.EHOSTDOWN, errno.EHOSTUNREACH}
+
+
+def is_network_error(error):
+    """Return True for failures that mean "try again when connectivity returns".
+
+    Local OSErrors such as a missing or unreadable file are not; retrying would never fix them.
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500 or error.resp.status == 429
+    if isinstance(error, (ConnectionError, socket.timeout, socket.gaierror, httplib2.HttpLib2Error, TransportError)):
+        return True
+    return isinstance(error, OSError) and error.errno in NETWORK_ERRNOS
+
+
+class OperationJournal:
+    """Durable, ordered journal of mutating API operations, stored in SQLite."""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")  # An acknowledged operation survives a power cut
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS operations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS operations_state ON operations (state, seq)")
+
+    def enqueue(self, kind, payload, idempotency_key=None):
+        """Record an operation before it is attempted; return its idempotency key.
+
+        Enqueueing the same key twice is a no-op, so a retried caller cannot queue duplicates.
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown operation kind '{kind}'.")
+        idempotency_key = idempotency_key or str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO operations (idempotency_key, kind, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (idempotency_key, kind, json.dumps(payload), now, now)
+            )
+        logging.info(f"Journaled {kind} operation {idempotency_key}.")
+        return idempotency_key
+
+    def get(self, idempotency_key):
+        """Return an operation as a dict, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT seq, idempotency_key, kind, payload, state, attempts, last_error, result "
+                "FROM operations WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def pending(self):
+        """Return pending operations in the order they were journaled."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, idempotency_key, kind, payload, state, attempts, last_error, result "
+                "FROM operations WHERE state = 'pending' ORDER BY seq"
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def depth(self):
+        """Return the number of operations still waiting to be applied."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM operations WHERE state = 'pending'").fetchone()[0]
+
+    def save_progress(self, idempotency_key, payload):
+        """Persist intermediate results (e.g. IDs of resources already created) of a multi-step operation."""
+        self._update(idempotency_key, payload=json.dumps(payload))
+
+    def mark_attempt(self, idempotency_key, error):
+        self._update(idempotency_key, last_error=str(error), increment=True)
+
+    def mark_done(self, idempotency_key, result):
+        self._update(idempotency_key, state="done", result=json.dumps(result), last_error=None, increment=True)
+
+    def mark_failed(self, idempotency_key, error):
+        self._update(idempotency_key, state="failed", last_error=str(error), increment=True)
+
+    def _update(self, idempotency_key, increment=False, **columns):
+        assignments = [f"{column} = ?" for column in columns] + ["updated_at = ?"]
+        if increment:
+            assignments.append("attempts = attempts + 1")
+        with self._lock:
+            self._db.execute(
+                f"UPDATE operations SET {', '.join(assignments)} WHERE idempotency_key = ?",
+                (*columns.values(), time.time(), idempotency_key)
+            )
+
+    @staticmethod
+    def _to_dict(row):
+        seq, key, kind, payload, state, attempts, last_error, result = row
+        return {
+            "seq": seq, "key": key, "kind": kind, "payload": json.loads(payload), "state": state,
+            "attempts": attempts, "last_error": last_error, "result": json.loads(result) if result else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _resolve_video_id(journal, payload):
+    """Return the target video ID, following a reference to a journaled create operation."""
+    if payload.get("video_id"):
+        return payload["video_id"]
+    created = journal.get(payload["create_key"])
+    if not created or created["state"] != "done":
+        raise RuntimeError(f"Create operation {payload['create_key']} did not complete.")
+    return created["result"]["broadcast_id"]
+
+
+def _apply_create(api_service, journal, operation):
+    payload = operation["payload"]
+    # Creating is three calls; checkpoint after each. An insert that timed out or got a 5xx may still
+    # have been applied, so each insert is recorded before it is sent, and a replay after such an
+    # attempt looks for what it created before inserting again.
+    if not payload.get("stream_id"):
+        if payload.get("stream_attempted_at"):
+            payload["stream_id"] = find_stream(api_service, payload["title"], payload["stream_attempted_at"])
+        if not payload.get("stream_id"):
+            payload["stream_attempted_at"] = time.time()
+            journal.save_progress(operation["key"], payload)
+            payload["stream_id"] = insert_stream(api_service, payload["title"])
+        journal.save_progress(operation["key"], payload)
+    if not payload.get("broadcast_id"):
+        if payload.get("broadcast_attempted_at"):
+            payload["broadcast_id"] = find_broadcast(api_service, payload["title"], payload["start_time"],
+                                                     payload["broadcast_attempted_at"])
+        if not payload.get("broadcast_id"):
+            payload["broadcast_attempted_at"] = time.time()
+            journal.save_progress(operation["key"], payload)
+            payload["broadcast_id"] = insert_broadcast(
+                api_service, payload["title"], payload["start_time"], payload["end_time"], payload["privacy_status"]
+            )
+        journal.save_progress(operation["key"], payload)
+    bind_stream(api_service, payload["broadcast_id"], payload["stream_id"])
+    return {"broadcast_id": payload["broadcast_id"], "stream_id": payload["stream_id"]}
+
+
+def _apply_bind(api_service, journal, operation):
+    payload = operation["payload"]
+    bind_stream(api_service, _resolve_video_id(journal, payload), payload["stream_id"])
+    return {}
+
+
+def _apply_thumbnail(api_service, journal, operation):
+    payload = operation["payload"]
+    projected(
+        api_service.thumbnails().set, ["kind"], "thumbnails.set",
+        videoId=_resolve_video_id(journal, payload),
+        media_body=MediaFileUpload(payload["path"], mimetype="image/jpeg")
+    ).execute()
+    return {}
+
+
+def _apply_playlist_add(api_service, journal, operation):
+    payload = operation["payload"]
+    video_id = _resolve_video_id(journal, payload)
+    # playlistItems.insert happily adds duplicates, so check membership first
+    existing = list_request(
+        api_service.playlistItems(), ["id"], "playlistItems.list(membership)",
+        playlistId=payload["playlist_id"],
+        videoId=video_id
+    ).execute()
+    if existing.get("items"):
+        return {"playlist_item_id": existing["items"][0]["id"], "already_member": True}
+    response = projected(
+        api_service.playlistItems().insert, ["id"], "playlistItems.insert",
+        part="snippet",
+        body={"snippet": {"playlistId": payload["playlist_id"],
+                          "resourceId": {"kind": "youtube#video", "videoId": video_id}}}
+    ).execute()
+    return {"playlist_item_id": response["id"]}
+
+
+def _apply_metadata_update(api_service, journal, operation):
+    payload = operation["payload"]
+    # Updates carry the complete desired state, so applying one twice is harmless
+    body = dict(payload["body"], id=_resolve_video_id(journal, payload))
+    projected(
+        getattr(api_service, payload.get("resource", "liveBroadcasts"))().update, ["id"],
+        f"{payload.get('resource', 'liveBroadcasts')}.update",
+        part=payload["part"],
+        body=body
+    ).execute()
+    return {}
+
+
+HANDLERS = {
+    "create": _apply_create,
+    "bind": _apply_bind,
+    "thumbnail": _apply_thumbnail,
+    "playlist_add": _apply_playlist_add,
+    "metadata_update": _apply_metadata_update,
+}
+
+
+def keep_file(path, idempotency_key):
+    """Copy a file a queued operation will upload, so it still exists at replay time."""
+    os.makedirs(JOURNAL_FILES_DIR, exist_ok=True)
+    kept_path = os.path.join(JOURNAL_FILES_DIR, idempotency_key + os.path.splitext(path)[1])
+    shutil.copyfile(path, kept_path)
+    return kept_path
+
+
+def apply_operation(api_service, journal, idempotency_key):
+    """Try one journaled operation now.
+
+    Returns the result on success. Network errors leave the operation pending and are re-raised;
+    any other error marks it failed and is re-raised.
+    """
+    operation = journal.get(idempotency_key)
+    if operation["state"] == "done":
+        return operation["result"]
+    try:
+        result = HANDLERS[operation["kind"]](api_service, journal, operation)
+    except Exception as e:
+        if is_network_error(e):
+            journal.mark_attempt(idempotency_key, e)
+        else:
+            journal.mark_failed(idempotency_key, e)
+            logging.error(f"Journaled {operation['kind']} operation {idempotency_key} failed: {e}")
+        raise
+    journal.mark_done(idempotency_key, result)
+    logging.info(f"Applied journaled {operation['kind']} operation {idempotency_key}.")
+    return result
+
+
+def replay(api_service, journal, on_progress=None):
+    """Apply pending operations in order, stopping at the first network error.
+
+    on_progress is called with (done, total, operation, error) after each attempt.
+    Returns (applied, failed, remaining).
+    """
+    operations = journal.pending()
+    applied = failed = 0
+    for index, operation in enumerate(operations, start=1):
+        try:
+            apply_operation(api_service, journal, operation["key"])
+            applied += 1
+            error = None
+        except Exception as e:
+            error = e
+            if is_network_error(e):
+                if on_progress:
+                    on_progress(index, len(operations), operation, e)
+                break  # Still offline: keep this and later operations in order
+            failed += 1
+        if on_progress:
+            on_progress(index, len(operations), operation, error)
+    remaining = journal.depth()
+    logging.info(f"Journal replay: {applied} applied, {failed} failed, {remaining} pending.")
+    return applied, failed, remaining
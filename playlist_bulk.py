@@ -0,0 +1,202 @@
+import logging
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from googleapiclient.errors import HttpError
+
+from api_fields import list_request, projected
+
+PLAYLIST_INDEX_PATH = "playlist_index.db"
+INSERT_COST = 50  # Quota units per playlistItems.insert
+LIST_COST = 1  # Quota units per playlistItems.list page
+DEFAULT_QUOTA_BUDGET = 5000  # Half of the default daily quota
+DEFAULT_CONCURRENCY = 4  # Concurrent inserts into one playlist start failing with 409s much beyond this
+MAX_RETRIES = 4
+
+
+class PlaylistIndex:
+    """Local SQLite index of which videos are in which playlists, built from paged playlistItems.list."""
+
+    def __init__(self, path=PLAYLIST_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS playlist_items (
+                playlist_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                PRIMARY KEY (playlist_id, video_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS playlist_items_video ON playlist_items (video_id);
+            CREATE TABLE IF NOT EXISTS playlists_synced (
+                playlist_id TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            );
+        """)
+
+    def refresh(self, api_service, playlist_id):
+        """Re-read a playlist's members (1 quota unit per 50 items); return the member count."""
+        members = []
+        pages = 0
+        request = list_request(
+            api_service.playlistItems(), ["id", "contentDetails.videoId"], "playlistItems.list(index)",
+            paged=True,
+            playlistId=playlist_id,
+            maxResults=50
+        )
+        while request is not None:
+            response = request.execute()
+            pages += 1
+            members.extend((playlist_id, item["contentDetails"]["videoId"], item["id"])
+                           for item in response.get("items", []))
+            request = api_service.playlistItems().list_next(request, response)
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM playlist_items WHERE playlist_id = ?", (playlist_id,))
+            self._db.executemany("INSERT OR REPLACE INTO playlist_items VALUES (?, ?, ?)", members)
+            self._db.execute("INSERT OR REPLACE INTO playlists_synced VALUES (?, ?)", (playlist_id, time.time()))
+            self._db.execute("COMMIT")
+        logging.info(f"Indexed {len(members)} items of playlist {playlist_id} in {pages} pages.")
+        return len(members)
+
+    def members(self, playlist_id):
+        with self._lock:
+            rows = self._db.execute("SELECT video_id FROM playlist_items WHERE playlist_id = ?", (playlist_id,))
+            return {row[0] for row in rows}
+
+    def playlists_of(self, video_id):
+        with self._lock:
+            rows = self._db.execute("SELECT playlist_id FROM playlist_items WHERE video_id = ?", (video_id,))
+            return [row[0] for row in rows]
+
+    def add(self, playlist_id, video_id, item_id):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO playlist_items VALUES (?, ?, ?)", (playlist_id, video_id, item_id))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def plan_playlist_add(index, playlist_id, video_ids, quota_budget=DEFAULT_QUOTA_BUDGET):
+    """Split video_ids into (to_insert, already_members, deferred) for the given quota budget.
+
+    Duplicates in video_ids are dropped; order is kept.
+    """
+    existing = index.members(playlist_id)
+    wanted = list(dict.fromkeys(video_ids))
+    missing = [video_id for video_id in wanted if video_id not in existing]
+    already = [video_id for video_id in wanted if video_id in existing]
+    allowed = max(quota_budget // INSERT_COST, 0)
+    return missing[:allowed], already, missing[allowed:]
+
+
+def _is_retryable(error):
+    # Concurrent inserts into one playlist can hit 409 (conflict) or transient 5xx/429 errors
+    return isinstance(error, HttpError) and error.resp.status in (409, 429, 500, 502, 503, 504)
+
+
+class QuotaBudgetExhausted(Exception):
+    """Raised when the next call of a bulk add would take it past its quota budget."""
+
+
+class BulkPlaylistAdd:
+    """Add many videos to one playlist with concurrent playlistItems.insert calls, skipping existing members."""
+
+    def __init__(self, pool, index, playlist_id, concurrency=DEFAULT_CONCURRENCY, on_progress=None):
+        self.pool = pool  # http_pool.HttpPool; each insert checks out its own service
+        self.index = index
+        self.playlist_id = playlist_id
+        self.concurrency = concurrency
+        self.on_progress = on_progress  # on_progress(done, total, video_id, error)
+        self.quota_budget = DEFAULT_QUOTA_BUDGET
+        self.quota_used = 0
+        self._quota_lock = threading.Lock()
+
+    def _charge(self, cost):
+        """Count one call against the quota budget, before it is sent."""
+        with self._quota_lock:
+            if self.quota_used + cost > self.quota_budget:
+                raise QuotaBudgetExhausted(f"Quota budget of {self.quota_budget} units used up.")
+            self.quota_used += cost
+
+    def _find_item(self, video_id):
+        """Return the playlist item ID of video_id if the playlist already holds it, else None."""
+        self._charge(LIST_COST)
+        with self.pool.service() as api_service:
+            response = list_request(
+                api_service.playlistItems(), ["id"], "playlistItems.list(recheck)",
+                playlistId=self.playlist_id,
+                videoId=video_id,
+                maxResults=1
+            ).execute()
+        items = response.get("items", [])
+        return items[0]["id"] if items else None
+
+    def _insert(self, video_id):
+        server_error = False
+        for attempt in range(MAX_RETRIES + 1):
+            if server_error:
+                # A 5xx does not say whether the insert was applied; inserting again could add a duplicate
+                item_id = self._find_item(video_id)
+                if item_id:
+                    self.index.add(self.playlist_id, video_id, item_id)
+                    return item_id
+            self._charge(INSERT_COST)
+            try:
+                with self.pool.service() as api_service:
+                    response = projected(
+                        api_service.playlistItems().insert, ["id"], "playlistItems.insert",
+                        part="snippet",
+                        body={"snippet": {"playlistId": self.playlist_id,
+                                          "resourceId": {"kind": "youtube#video", "videoId": video_id}}}
+                    ).execute()
+                self.index.add(self.playlist_id, video_id, response["id"])
+                return response["id"]
+            except Exception as e:
+                if attempt == MAX_RETRIES or not _is_retryable(e):
+                    raise
+                server_error = e.resp.status >= 500
+                time.sleep(min(2 ** attempt, 16) * random.uniform(0.5, 1.0))
+
+    def run(self, video_ids, quota_budget=DEFAULT_QUOTA_BUDGET, refresh=True):
+        """Refresh the membership index, then insert the missing videos within the quota budget.
+
+        Every call, retries and membership re-checks included, is charged against quota_budget;
+        videos it no longer covers are deferred.
+        Returns {"added", "skipped", "deferred", "failed": {video_id: error}, "quota_used"}.
+        """
+        self.quota_budget, self.quota_used = quota_budget, 0
+        if refresh:
+            with self.pool.service() as api_service:
+                members = self.index.refresh(api_service, self.playlist_id)
+            self.quota_used += max(1, -(-members // 50)) * LIST_COST
+        to_insert, skipped, deferred = plan_playlist_add(self.index, self.playlist_id, video_ids,
+                                                         quota_budget - self.quota_used)
+        added, failed = [], {}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="playlist-add") as executor:
+            futures = {executor.submit(self._insert, video_id): video_id for video_id in to_insert}
+            for done, future in enumerate(as_completed(futures), start=1):
+                video_id = futures[future]
+                try:
+                    future.result()
+                    added.append(video_id)
+                    error = None
+                except QuotaBudgetExhausted as e:
+                    deferred.append(video_id)
+                    error = e
+                except Exception as e:
+                    logging.error(f"Failed to add {video_id} to playlist {self.playlist_id}: {e}")
+                    failed[video_id] = str(e)
+                    error = e
+                if self.on_progress:
+                    self.on_progress(done, len(to_insert), video_id, error)
+        logging.info(f"Playlist {self.playlist_id}: {len(added)} added, {len(skipped)} already present, "
+                     f"{len(deferred)} deferred for quota, {len(failed)} failed.")
+        return {"added": added, "skipped": skipped, "deferred": deferred, "failed": failed,
+                "quota_used": self.quota_used}
@@ -0,0 +1,342 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+from api_fields import list_request, projected
+from bulk_metadata import BROADCAST_STATUS_FIELDS, _status_body
+from operation_journal import is_network_error
+from thumbnails import THUMBNAIL_OUTPUT_DIR, load_thumbnail_template, overlay_values, prepare_thumbnail, render_thumbnail
+
+POST_STREAM_CONFIG_FILE = "post_stream.json"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+CHAPTERS_HEADER = "Chapters:"
+MIN_CHAPTER_SECONDS = 10  # YouTube ignores chapter lists with a chapter shorter than this
+MIN_CHAPTERS = 3  # ... or with fewer chapters than this
+
+PENDING = "pending"
+RUNNING = "running"
+RETRYING = "retrying"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+BLOCKED = "blocked"  # A job it depends on failed
+
+# Each job names a task and may list the jobs that must finish first ("after"). Jobs without a
+# path between them run in parallel; here privacy is only changed once everything else is in place.
+DEFAULT_PIPELINE = {
+    "concurrency": DEFAULT_CONCURRENCY,
+    "jobs": {
+        "thumbnail": {"task": "set_thumbnail", "template": False, "path": ""},
+        "chapters": {"task": "add_chapters"},
+        "playlist": {"task": "add_to_playlist", "playlist_id": ""},
+        "privacy": {"task": "set_privacy", "privacy": "public", "after": ["thumbnail", "chapters", "playlist"]},
+    },
+}
+
+
+class SkipJob(Exception):
+    """Raised by a task that does not apply to this broadcast (e.g. not configured)."""
+
+
+def load_post_stream_config(path=POST_STREAM_CONFIG_FILE):
+    """Load the post-stream pipeline, creating the default one if missing."""
+    if not os.path.exists(path):
+        with open(path, "w") as file:
+            json.dump(DEFAULT_PIPELINE, file, indent=4)
+        return DEFAULT_PIPELINE
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def job_order(jobs):
+    """Return the job names in dependency order, raising ValueError for unknown tasks, jobs or cycles."""
+    for name, job in jobs.items():
+        if job.get("task") not in TASKS:
+            raise ValueError(f"Job '{name}' has unknown task '{job.get('task')}'.")
+        for dependency in job.get("after", []):
+            if dependency not in jobs:
+                raise ValueError(f"Job '{name}' runs after unknown job '{dependency}'.")
+    waiting = {name: set(job.get("after", [])) for name, job in jobs.items()}
+    order = []
+    while waiting:
+        ready = sorted(name for name, dependencies in waiting.items() if not dependencies)
+        if not ready:
+            raise ValueError(f"Post-stream jobs depend on each other in a cycle: {', '.join(sorted(waiting))}.")
+        for name in ready:
+            del waiting[name]
+            order.append(name)
+        for dependencies in waiting.values():
+            dependencies.difference_update(ready)
+    return order
+
+
+def _is_retryable(error):
+    return is_network_error(error) or (isinstance(error, HttpError) and error.resp.status == 409)
+
+
+def _fetch_broadcast(api_service, broadcast_id):
+    response = list_request(
+        api_service.liveBroadcasts(),
+        ["id", "snippet.title", "snippet.description", "snippet.scheduledStartTime", "snippet.scheduledEndTime",
+         "snippet.actualStartTime", "snippet.actualEndTime"] + [f"status.{key}" for key in BROADCAST_STATUS_FIELDS],
+        "liveBroadcasts.list(post-stream)",
+        id=broadcast_id
+    ).execute()
+    if not response.get("items"):
+        raise ValueError(f"Broadcast {broadcast_id} not found.")
+    return response["items"][0]
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def format_chapters(markers, started, ended=None):
+    """Turn (unix time, label) markers into YouTube chapter lines, or None if too few are usable.
+
+    Markers before the start become the opening chapter, repeated labels are merged and
+    chapters shorter than MIN_CHAPTER_SECONDS are dropped.
+    """
+    ended = ended or float("inf")
+    chapters = []
+    for at, label in sorted(markers):
+        if at >= ended:
+            break
+        offset = max(0, int(at - started))
+        if chapters and chapters[-1][1] == label:
+            continue
+        if chapters and offset - chapters[-1][0] < MIN_CHAPTER_SECONDS:
+            chapters.pop()  # The previous chapter was too short; this one takes its place
+            if chapters and chapters[-1][1] == label:
+                continue
+        chapters.append((offset if chapters else 0, label))
+    if ended != float("inf") and chapters and ended - started - chapters[-1][0] < MIN_CHAPTER_SECONDS:
+        chapters.pop()
+    if len(chapters) < MIN_CHAPTERS:
+        return None
+
+    def timestamp(seconds):
+        hours, rest = divmod(seconds, 3600)
+        return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+    return [f"{timestamp(offset)} {label}" for offset, label in chapters]
+
+
+def with_chapters(description, lines):
+    """Replace any chapter block this pipeline added before with the given lines."""
+    description = description or ""
+    if CHAPTERS_HEADER in description:
+        description = description[:description.index(CHAPTERS_HEADER)].rstrip()
+    return "\n\n".join(part for part in (description, "\n".join([CHAPTERS_HEADER] + lines)) if part)
+
+
+# Tasks take (api_service, broadcast, options, context) and return a short result description.
+
+def set_thumbnail(api_service, broadcast, options, context):
+    """Upload the final thumbnail: a fixed image ("path") or the thumbnail template ("template": true)."""
+    os.makedirs(THUMBNAIL_OUTPUT_DIR, exist_ok=True)
+    output_path = os.path.join(THUMBNAIL_OUTPUT_DIR, f"final-{broadcast['id']}.jpg")
+    if options.get("template"):
+        template = load_thumbnail_template()
+        render_thumbnail(template["template"], template["overlays"], overlay_values(broadcast), output_path)
+    elif options.get("path"):
+        prepare_thumbnail(options["path"], output_path)
+    else:
+        raise SkipJob("no thumbnail configured")
+    projected(
+        api_service.thumbnails().set, ["kind"], "thumbnails.set",
+        videoId=broadcast["id"],
+        media_body=MediaFileUpload(output_path, mimetype="image/jpeg")
+    ).execute()
+    return os.path.basename(output_path)
+
+
+def add_chapters(api_service, broadcast, options, context):
+    """Write chapter timestamps from the scene changes recorded during the stream into the description."""
+    snippet = broadcast["snippet"]
+    if not snippet.get("actualStartTime"):
+        raise SkipJob("broadcast never went live")
+    lines = format_chapters(context.get("markers", []), _parse_time(snippet["actualStartTime"]),
+                            _parse_time(snippet["actualEndTime"]) if snippet.get("actualEndTime") else None)
+    if lines is None:
+        raise SkipJob(f"fewer than {MIN_CHAPTERS} chapters of {MIN_CHAPTER_SECONDS}s or more")
+    description = with_chapters(snippet.get("description"), lines)
+    if description == snippet.get("description"):
+        raise SkipJob("chapters already up to date")
+    body = {"id": broadcast["id"], "snippet": {"title": snippet["title"], "description": description,
+                                               "scheduledStartTime": snippet["scheduledStartTime"]}}
+    if snippet.get("scheduledEndTime"):
+        body["snippet"]["scheduledEndTime"] = snippet["scheduledEndTime"]
+    projected(api_service.liveBroadcasts().update, ["id"], "liveBroadcasts.update", part="snippet", body=body).execute()
+    return f"{len(lines)} chapters"
+
+
+def add_to_playlist(api_service, broadcast, options, context):
+    """Add the video to a playlist, unless the local playlist index already has it there."""
+    playlist_id = options.get("playlist_id")
+    if not playlist_id:
+        raise SkipJob("no playlist configured")
+    index = context.get("playlist_index")
+    if index is not None and playlist_id in index.playlists_of(broadcast["id"]):
+        raise SkipJob("already in the playlist")
+    attempted = context.setdefault("playlist_attempts", set())
+    if playlist_id in attempted:
+        # The last attempt may have been applied before it failed; inserting again would add a duplicate
+        existing = list_request(
+            api_service.playlistItems(), ["id"], "playlistItems.list(recheck)",
+            playlistId=playlist_id,
+            videoId=broadcast["id"],
+            maxResults=1
+        ).execute()
+        if existing.get("items"):
+            if index is not None:
+                index.add(playlist_id, broadcast["id"], existing["items"][0]["id"])
+            return playlist_id
+    attempted.add(playlist_id)
+    response = projected(
+        api_service.playlistItems().insert, ["id"], "playlistItems.insert",
+        part="snippet",
+        body={"snippet": {"playlistId": playlist_id,
+                          "resourceId": {"kind": "youtube#video", "videoId": broadcast["id"]}}}
+    ).execute()
+    if index is not None:
+        index.add(playlist_id, broadcast["id"], response["id"])
+    return playlist_id
+
+
+def set_privacy(api_service, broadcast, options, context):
+    """Change the finished broadcast's privacy status."""
+    privacy = options.get("privacy")
+    if not privacy or privacy == broadcast["status"]["privacyStatus"]:
+        raise SkipJob(f"already {broadcast['status']['privacyStatus']}")
+    # An update replaces every writable status field, so the current ones are sent back unchanged
+    projected(
+        api_service.liveBroadcasts().update, ["id"], "liveBroadcasts.update",
+        part="status",
+        body={"id": broadcast["id"], "status": _status_body(broadcast["status"], BROADCAST_STATUS_FIELDS, privacy)}
+    ).execute()
+    return privacy
+
+
+TASKS = {
+    "set_thumbnail": set_thumbnail,
+    "add_chapters": add_chapters,
+    "add_to_playlist": add_to_playlist,
+    "set_privacy": set_privacy,
+}
+
+
+class PostStreamPipeline:
+    """Run the configured job graph for each finished broadcast on a shared worker pool.
+
+    Several broadcasts can be in flight at once; each job starts as soon as the jobs it runs
+    after are done or skipped. Failed attempts with transient errors are retried with backoff.
+    """
+
+    def __init__(self, pool, config, on_status=None):
+        self.pool = pool  # http_pool.HttpPool; each job attempt checks out its own service
+        self.jobs = config["jobs"]
+        self.order = job_order(self.jobs)
+        self.on_status = on_status  # on_status(broadcast_id, job, status, detail)
+        self.runs = {}  # broadcast_id -> {job: {"status", "attempts", "detail", "seconds"}}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=config.get("concurrency", DEFAULT_CONCURRENCY),
+                                            thread_name_prefix="post-stream")
+
+    def _set(self, broadcast_id, job, status, detail=""):
+        with self._lock:
+            self.runs[broadcast_id][job].update(status=status, detail=detail)
+        if self.on_status:
+            self.on_status(broadcast_id, job, status, detail)
+
+    def submit(self, broadcast_id, context=None):
+        """Start the pipeline for one broadcast; returns False if it is already running for it."""
+        with self._lock:
+            run = self.runs.get(broadcast_id)
+            if run and any(state["status"] in (PENDING, RUNNING, RETRYING) for state in run.values()):
+                return False
+            self.runs[broadcast_id] = {job: {"status": PENDING, "attempts": 0, "detail": "", "seconds": 0.0}
+                                       for job in self.order}
+        for job in self.order:
+            self._set(broadcast_id, job, PENDING)
+        self._executor.submit(self._start, broadcast_id, context or {})
+        return True
+
+    def _start(self, broadcast_id, context):
+        try:
+            with self.pool.service() as api_service:
+                broadcast = _fetch_broadcast(api_service, broadcast_id)
+        except Exception as e:
+            logging.error(f"Post-stream jobs for {broadcast_id} could not start: {e}")
+            for job in self.order:
+                self._set(broadcast_id, job, FAILED, f"could not read the broadcast: {e}")
+            return
+        self._schedule(broadcast_id, broadcast, context)
+
+    def _schedule(self, broadcast_id, broadcast, context):
+        """Start every pending job whose dependencies are satisfied, and block those behind a failure."""
+        ready = []
+        with self._lock:
+            run = self.runs[broadcast_id]
+            for job in self.order:
+                if run[job]["status"] != PENDING:
+                    continue
+                dependencies = [run[dependency]["status"] for dependency in self.jobs[job].get("after", [])]
+                if any(status in (FAILED, BLOCKED) for status in dependencies):
+                    run[job]["status"] = BLOCKED
+                    ready.append((job, False))
+                elif all(status in (DONE, SKIPPED) for status in dependencies):
+                    run[job]["status"] = RUNNING
+                    ready.append((job, True))
+        for job, runnable in ready:
+            if runnable:
+                self._set(broadcast_id, job, RUNNING)
+                self._executor.submit(self._run_job, broadcast_id, broadcast, job, context)
+            else:
+                self._set(broadcast_id, job, BLOCKED, "a job it runs after failed")
+        if any(not runnable for _, runnable in ready):
+            self._schedule(broadcast_id, broadcast, context)  # Blocking cascades down the graph
+
+    def _run_job(self, broadcast_id, broadcast, job, context):
+        options = self.jobs[job]
+        retries = options.get("retries", DEFAULT_RETRIES)
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            with self._lock:
+                self.runs[broadcast_id][job]["attempts"] = attempt + 1
+            try:
+                with self.pool.service() as api_service:
+                    detail = TASKS[options["task"]](api_service, broadcast, options, context)
+                status = DONE
+                break
+            except SkipJob as e:
+                status, detail = SKIPPED, str(e)
+                break
+            except Exception as e:
+                if attempt == retries or not _is_retryable(e):
+                    logging.error(f"Post-stream job '{job}' failed for {broadcast_id}: {e}")
+                    status, detail = FAILED, str(e)
+                    break
+                self._set(broadcast_id, job, RETRYING, f"attempt {attempt + 1} failed: {e}")
+                time.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.0))
+        with self._lock:
+            self.runs[broadcast_id][job]["seconds"] = time.perf_counter() - started
+        logging.info(f"Post-stream job '{job}' for {broadcast_id}: {status} {detail}")
+        self._set(broadcast_id, job, status, detail)
+        self._schedule(broadcast_id, broadcast, context)
+
+    def status(self, broadcast_id):
+        with self._lock:
+            return {job: dict(state) for job, state in self.runs.get(broadcast_id, {}).items()}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
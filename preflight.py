@@ -0,0 +1,206 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import obsws_python as obs
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from api_fields import API_STATS, list_request
+
+PASS, WARN, FAIL, SKIPPED = "pass", "warn", "fail", "skipped"
+
+DAILY_QUOTA = 10000  # Default YouTube Data API quota per project per day
+# Quota cost of each call type; reads cost 1, writes and transitions 50
+QUOTA_COSTS = {"list": 1, "insert": 50, "update": 50, "bind": 50, "transition": 50, "delete": 50, "set": 50}
+RESOLUTIONS = {"2160p": (3840, 2160), "1440p": (2560, 1440), "1080p": (1920, 1080), "720p": (1280, 720),
+               "480p": (854, 480), "360p": (640, 360), "240p": (426, 240)}
+
+
+class CheckFailed(Exception):
+    """Raised by a check to report a failure with a readable reason."""
+
+
+class CheckWarning(Exception):
+    """Raised by a check when it passed with something the operator should look at."""
+
+
+def session_quota_used():
+    """Estimate the quota units spent by this process from the recorded API calls."""
+    used = 0
+    for label, entry in API_STATS.summary().items():
+        method = label.split(" ")[0].split("(")[0].rsplit(".", 1)[-1]
+        used += QUOTA_COSTS.get(method, 1) * entry["calls"]
+    return used
+
+
+def check_credentials(context):
+    credentials = context["credentials"]
+    if credentials is None:
+        raise CheckFailed("Not authenticated.")
+    if not credentials.valid:
+        if not credentials.refresh_token:
+            raise CheckFailed("Token expired and cannot be refreshed; authenticate again.")
+        credentials.refresh(Request())
+        return "Token was expired and has been refreshed."
+    return f"Token valid until {credentials.expiry:%H:%M:%S} UTC." if credentials.expiry else "Token valid."
+
+
+def check_quota(context, credentials):
+    # There is no API to read the remaining quota; a 1-unit call shows whether it is exhausted
+    api_service = build("youtube", "v3", credentials=context["credentials"])
+    try:
+        list_request(api_service.channels(), ["id"], "channels.list(preflight)", mine=True).execute()
+    except HttpError as e:
+        if e.resp.status == 403 and "quota" in str(e).lower():
+            raise CheckFailed("Daily API quota is exhausted.")
+        raise
+    used = session_quota_used()
+    detail = f"API accepts requests; this session has used about {used} of {DAILY_QUOTA} units."
+    if used > DAILY_QUOTA * 0.8:
+        raise CheckWarning(detail)
+    return detail
+
+
+def check_obs(context):
+    config = context["obs_config"]
+    client = obs.ReqClient(host=config["host"], port=config["port"], password=config["password"], timeout=3)
+    try:
+        version = client.get_version()
+        stream = client.get_stream_status()
+        video = client.get_video_settings()
+        service = client.get_stream_service_settings()
+    finally:
+        client.disconnect()
+    context["obs"] = {
+        "streaming": stream.output_active,
+        "width": video.output_width,
+        "height": video.output_height,
+        "fps": video.fps_numerator / video.fps_denominator,
+        "key": service.stream_service_settings.get("key", ""),
+        "server": service.stream_service_settings.get("server", ""),
+    }
+    return (f"OBS {version.obs_version} reachable; output {video.output_width}x{video.output_height} "
+            f"@ {context['obs']['fps']:.0f} fps{' (already streaming)' if stream.output_active else ''}.")
+
+
+def check_binding(context, credentials):
+    if not context["broadcast_id"]:
+        raise CheckFailed("No broadcast selected.")
+    api_service = build("youtube", "v3", credentials=context["credentials"])
+    response = list_request(
+        api_service.liveBroadcasts(), ["id", "status.lifeCycleStatus", "contentDetails.boundStreamId"],
+        "liveBroadcasts.list(preflight)",
+        id=context["broadcast_id"]
+    ).execute()
+    if not response.get("items"):
+        raise CheckFailed("Broadcast not found.")
+    item = response["items"][0]
+    status = item["status"]["lifeCycleStatus"]
+    context["stream_id"] = item.get("contentDetails", {}).get("boundStreamId")
+    if status in ("complete", "revoked"):
+        raise CheckFailed(f"Broadcast is already '{status}'.")
+    if not context["stream_id"]:
+        raise CheckFailed("No stream is bound to the broadcast.")
+    return f"Broadcast is '{status}' and bound to stream {context['stream_id']}."
+
+
+def check_ingestion(context, binding):
+    api_service = build("youtube", "v3", credentials=context["credentials"])
+    response = list_request(
+        api_service.liveStreams(),
+        ["status.streamStatus", "status.healthStatus.status", "cdn.resolution", "cdn.frameRate",
+         "cdn.ingestionInfo.streamName"],
+        "liveStreams.list(preflight)",
+        id=context["stream_id"]
+    ).execute()
+    if not response.get("items"):
+        raise CheckFailed("Bound stream not found.")
+    item = response["items"][0]
+    context["stream"] = item
+    stream_status = item["status"]["streamStatus"]
+    health = item["status"].get("healthStatus", {}).get("status", "noData")
+    if stream_status != "active":
+        raise CheckWarning(f"No data reaching YouTube yet (stream is '{stream_status}'); start OBS streaming.")
+    if health in ("bad", "noData"):
+        raise CheckFailed(f"YouTube receives data but reports health '{health}'.")
+    return f"YouTube is receiving data; health '{health}'."
+
+
+def check_obs_output(context, obs_check, ingestion):
+    """Compare OBS's stream key and video settings with the bound stream."""
+    settings, cdn = context["obs"], context["stream"].get("cdn", {})
+    problems = []
+    if settings["key"] != cdn.get("ingestionInfo", {}).get("streamName"):
+        problems.append("OBS stream key does not match the bound stream's key")
+    expected = RESOLUTIONS.get(cdn.get("resolution"))
+    if expected and (settings["width"], settings["height"]) != expected:
+        problems.append(f"OBS outputs {settings['width']}x{settings['height']} but the stream expects "
+                        f"{expected[0]}x{expected[1]}")
+    if cdn.get("frameRate", "variable") != "variable" and round(settings["fps"]) != int(cdn["frameRate"][:-3]):
+        problems.append(f"OBS runs at {settings['fps']:.0f} fps but the stream expects {cdn['frameRate']}")
+    if problems:
+        raise CheckFailed("; ".join(problems) + ".")
+    return "OBS key, resolution and frame rate match the bound stream."
+
+
+# name, function, names of the checks it needs to have passed (their results are passed positionally)
+CHECKS = [
+    ("credentials", check_credentials, ()),
+    ("quota", check_quota, ("credentials",)),
+    ("obs", check_obs, ()),
+    ("binding", check_binding, ("credentials",)),
+    ("ingestion", check_ingestion, ("binding",)),
+    ("obs_output", check_obs_output, ("obs", "ingestion")),
+]
+
+
+def run_preflight(credentials, obs_config, broadcast_id, checks=CHECKS, on_result=None):
+    """Run every check concurrently; a check waits only for the checks it depends on.
+
+    Returns a list of {"name", "status", "detail", "ms"} in check order, so the total time is
+    roughly that of the slowest chain of dependent probes. on_result is called as each check ends.
+    """
+    context = {"credentials": credentials, "obs_config": obs_config, "broadcast_id": broadcast_id}
+    started = time.perf_counter()
+    futures = {}
+
+    def run(name, function, requires):
+        results = [futures[dependency].result() for dependency in requires]
+        check_started = time.perf_counter()
+        blocked = [result["name"] for result in results if result["status"] not in (PASS, WARN)]
+        if blocked:
+            status, detail = SKIPPED, f"Needs {', '.join(blocked)} to pass."
+        else:
+            try:
+                status, detail = PASS, function(context, *results)
+            except CheckWarning as e:
+                status, detail = WARN, str(e)
+            except CheckFailed as e:
+                status, detail = FAIL, str(e)
+            except Exception as e:
+                logging.error(f"Pre-flight check '{name}' raised: {e}")
+                status, detail = FAIL, str(e)
+        result = {"name": name, "status": status, "detail": detail,
+                  "ms": round((time.perf_counter() - check_started) * 1000, 1)}
+        if on_result:
+            on_result(result)
+        return result
+
+    # One thread per check: dependents block on their prerequisites, so fewer threads could deadlock
+    with ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="preflight") as executor:
+        for name, function, requires in checks:
+            futures[name] = executor.submit(run, name, function, requires)
+        results = [futures[name].result() for name, _, _ in checks]
+    logging.info(f"Pre-flight finished in {(time.perf_counter() - started) * 1000:.0f} ms: "
+                 f"{', '.join(result['name'] + '=' + result['status'] for result in results)}")
+    return results
+
+
+def format_report(results):
+    """Render results as one line per check, e.g. 'PASS  obs (42 ms): ...'."""
+    return "\n".join(
+        f"{result['status'].upper():<7} {result['name']} ({result['ms']:.0f} ms): {result['detail']}"
+        for result in results
+    )
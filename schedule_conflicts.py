@@ -0,0 +1,187 @@
+import csv
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from api_fields import list_request
+
+SCHEDULE_FIELDS = ["id", "snippet.title", "snippet.scheduledStartTime", "snippet.scheduledEndTime",
+                   "contentDetails.boundStreamId"]
+DEFAULT_DURATION = timedelta(hours=1)  # Assumed length of a broadcast scheduled without an end time
+
+
+def parse_time(value):
+    """Parse an RFC 3339 timestamp from the API into an aware datetime."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def to_interval(item):
+    """Return (stream_id, start, end, broadcast_id, title) for a liveBroadcast, or None if it cannot conflict."""
+    snippet = item.get("snippet", {})
+    stream_id = item.get("contentDetails", {}).get("boundStreamId")
+    if not stream_id or not snippet.get("scheduledStartTime"):
+        return None
+    start = parse_time(snippet["scheduledStartTime"])
+    end = parse_time(snippet["scheduledEndTime"]) if snippet.get("scheduledEndTime") else start + DEFAULT_DURATION
+    return stream_id, start, end, item["id"], snippet.get("title", "")
+
+
+def fetch_schedule(api_service):
+    """Return the intervals of every upcoming and live broadcast on the channel."""
+    intervals = {}  # By broadcast ID, in case one goes live between the two listings
+    for status in ("upcoming", "active"):
+        request = list_request(
+            api_service.liveBroadcasts(), SCHEDULE_FIELDS, f"liveBroadcasts.list(schedule {status})",
+            paged=True,
+            broadcastStatus=status,
+            maxResults=50
+        )
+        while request is not None:
+            response = request.execute()
+            for interval in filter(None, map(to_interval, response.get("items", []))):
+                intervals[interval[3]] = interval
+            request = api_service.liveBroadcasts().list_next(request, response)
+    return list(intervals.values())
+
+
+class _IntervalTree:
+    """Static interval tree over the half-open [start, end) intervals of one stream.
+
+    The intervals are sorted by start and the sorted list is read as an implicit balanced
+    binary tree: the middle element of a range is its root. Each root also stores the latest
+    end in its range, so a query skips every range that finishes before the query starts.
+    Building is O(n log n); a query is O(log n + matches).
+    """
+
+    def __init__(self, intervals):
+        self.intervals = sorted(intervals, key=lambda interval: interval[1])
+        self.starts = [interval[1] for interval in self.intervals]
+        self.max_end = [None] * len(self.intervals)
+        self._build(0, len(self.intervals))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        latest = self.intervals[mid][2]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > latest:
+                latest = child
+        self.max_end[mid] = latest
+        return latest
+
+    def overlapping(self, start, end):
+        """Return the intervals that overlap [start, end), in start order."""
+        found = []
+        self._search(0, len(self.intervals), start, end, found)
+        return found
+
+    def _search(self, lo, hi, start, end, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self.max_end[mid] <= start:
+            return  # Everything in this range has ended before the query starts
+        self._search(lo, mid, start, end, found)
+        if self.starts[mid] < end:
+            if self.intervals[mid][2] > start:
+                found.append(self.intervals[mid])
+            # Intervals to the right start no earlier than this one
+            self._search(mid + 1, hi, start, end, found)
+
+    def __len__(self):
+        return len(self.intervals)
+
+
+class ScheduleIndex:
+    """Upcoming and live broadcasts grouped by bound stream, with an interval tree per stream.
+
+    Built once from fetch_schedule(); answering "does this slot clash on this stream key" is
+    then a local lookup, fast enough to run on every keystroke in the time fields.
+    """
+
+    def __init__(self, intervals):
+        by_stream = defaultdict(list)
+        for interval in intervals:
+            by_stream[interval[0]].append(interval)
+        self._trees = {stream_id: _IntervalTree(items) for stream_id, items in by_stream.items()}
+
+    @classmethod
+    def load(cls, api_service):
+        return cls(fetch_schedule(api_service))
+
+    def conflicts(self, stream_id, start, end, ignore_id=None):
+        """Return the broadcasts on stream_id that overlap [start, end), except ignore_id."""
+        tree = self._trees.get(stream_id)
+        if tree is None:
+            return []
+        return [interval for interval in tree.overlapping(start, end) if interval[3] != ignore_id]
+
+    def intervals(self):
+        return [interval for tree in self._trees.values() for interval in tree.intervals]
+
+    def __len__(self):
+        return sum(len(tree) for tree in self._trees.values())
+
+
+def find_conflicts(intervals):
+    """Return every pair of intervals on the same stream that overlap, in O(n log n + pairs).
+
+    Each stream's intervals are swept in start order with a heap of the ones still running,
+    so an interval is only compared with those it actually overlaps.
+    """
+    by_stream = defaultdict(list)
+    for interval in intervals:
+        by_stream[interval[0]].append(interval)
+    pairs = []
+    for items in by_stream.values():
+        items.sort(key=lambda interval: interval[1])
+        running = []  # (end, position, interval)
+        for position, interval in enumerate(items):
+            while running and running[0][0] <= interval[1]:
+                heapq.heappop(running)
+            pairs.extend((other, interval) for _, _, other in running)
+            heapq.heappush(running, (interval[2], position, interval))
+    return pairs
+
+
+def validate_plan(index, plan):
+    """Check a list of proposed broadcasts against each other and against the existing schedule.
+
+    plan holds intervals in the same (stream_id, start, end, id, title) form, where id may be
+    any label for a broadcast that does not exist yet. Returns [(planned, other)] pairs.
+    """
+    invalid = [planned for planned in plan if planned[2] <= planned[1]]
+    if invalid:
+        raise ValueError("End time is not after start time for " + ", ".join(describe(planned) for planned in invalid))
+    # A broadcast without a stream_id gets a new stream of its own, so it cannot clash
+    conflicts = find_conflicts(planned for planned in plan if planned[0])
+    for planned in plan:
+        conflicts.extend((planned, existing) for existing in index.conflicts(*planned[:3], ignore_id=planned[3]))
+    return conflicts
+
+
+def read_plan(path, stream_ids=None):
+    """Read proposed broadcasts for validate_plan from a CSV file with title, start, end and stream_key columns.
+
+    start and end are ISO 8601 date-times, in local time unless they carry an offset. stream_key is
+    a stream ID or a name in stream_ids ({name: stream_id}); leave it empty for a new stream.
+    """
+    plan = []
+    with open(path, "r", newline="", encoding="utf-8-sig") as file:
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            try:
+                start, end = (datetime.fromisoformat(row[column].strip()).astimezone() for column in ("start", "end"))
+            except (KeyError, AttributeError, ValueError):
+                raise ValueError(f"Line {line}: start and end must be ISO 8601 date-times.")
+            key = (row.get("stream_key") or "").strip()
+            plan.append(((stream_ids or {}).get(key, key) or None, start, end, f"line {line}",
+                         (row.get("title") or "").strip() or f"line {line}"))
+    return plan
+
+
+def describe(interval):
+    """Return "'title' (Mon 10:00-11:00)" in local time."""
+    start, end = interval[1].astimezone(), interval[2].astimezone()
+    end_format = "%H:%M" if end.date() == start.date() else "%a %H:%M"
+    return f"'{interval[4]}' ({start.strftime('%a %H:%M')}-{end.strftime(end_format)})"
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+
+from api_fields import list_request
+
+# Alert thresholds. Percentages are computed over the frames produced since the previous sample,
+# so a burst of drops shows up immediately instead of being averaged away over the whole session.
+DEFAULT_THRESHOLDS = {
+    "min_bitrate_kbps": 2500,
+    "max_dropped_frames_pct": 1.0,   # Frames dropped by the network (stream output)
+    "max_skipped_frames_pct": 1.0,   # Frames skipped by the encoder
+    "max_render_lag_pct": 1.0,       # Frames missed by the renderer
+    "max_cpu_pct": 85.0,
+    "bad_youtube_health": ["bad", "noData"],
+}
+
+# OBS is sampled every second; YouTube costs one quota unit per liveStreams.list call,
+# so it is polled far less often (30 s is ~960 units over an eight-hour event).
+DEFAULT_OBS_INTERVAL = 1.0
+DEFAULT_YOUTUBE_INTERVAL = 30.0
+
+
+def _pct(part, total):
+    """Return part/total as a percentage, or 0 when there is nothing to compare."""
+    return (part / total) * 100 if total > 0 else 0.0
+
+
+class HealthSampler:
+    """Take one combined OBS + YouTube health sample at a time."""
+
+    def __init__(self, obs_client=None, api_service=None, stream_id=None):
+        self.obs_client = obs_client  # Dedicated ReqClient, not shared with the GUI thread
+        self.api_service = api_service  # Dedicated API service, not shared with the GUI thread
+        self.stream_id = stream_id
+        self._previous = None  # Raw counters from the previous OBS sample
+        self.youtube_status = {}  # Last known YouTube stream status
+
+    def sample_obs(self):
+        """Read GetStreamStatus and GetStats and turn the counters into per-interval rates."""
+        status = self.obs_client.get_stream_status()
+        stats = self.obs_client.get_stats()
+        now = time.monotonic()
+        current = {
+            "time": now,
+            "bytes": status.output_bytes,
+            "dropped": status.output_skipped_frames,
+            "sent": status.output_total_frames,
+            "encoder_skipped": stats.output_skipped_frames,
+            "encoder_total": stats.output_total_frames,
+            "render_skipped": stats.render_skipped_frames,
+            "render_total": stats.render_total_frames,
+        }
+        previous = self._previous
+        self._previous = current
+        sample = {
+            "obs_active": status.output_active,
+            "obs_reconnecting": status.output_reconnecting,
+            "obs_congestion": status.output_congestion,
+            "cpu_pct": round(stats.cpu_usage, 1),
+            "fps": round(stats.active_fps, 1),
+            "frame_render_ms": round(stats.average_frame_render_time, 2),
+        }
+        # Rates need two samples; the first one only primes the counters. A counter that went backwards
+        # means the output (or OBS) restarted, so this sample is a new baseline rather than a rate.
+        if previous is None or any(current[key] < previous[key] for key in current if key != "time"):
+            return sample
+
+        elapsed = current["time"] - previous["time"]
+        bitrate_kbps = ((current["bytes"] - previous["bytes"]) * 8 / 1000 / elapsed) if elapsed > 0 else 0.0
+        sample.update({
+            "bitrate_kbps": round(bitrate_kbps, 1),
+            "dropped_frames_pct": round(_pct(current["dropped"] - previous["dropped"],
+                                             current["sent"] - previous["sent"]), 2),
+            "skipped_frames_pct": round(_pct(current["encoder_skipped"] - previous["encoder_skipped"],
+                                             current["encoder_total"] - previous["encoder_total"]), 2),
+            "render_lag_pct": round(_pct(current["render_skipped"] - previous["render_skipped"],
+                                         current["render_total"] - previous["render_total"]), 2),
+        })
+        return sample
+
+    def sample_youtube(self):
+        """Fetch the liveStreams healthStatus for the monitored stream."""
+        response = list_request(
+            self.api_service.liveStreams(),
+            ["status.streamStatus", "status.healthStatus.status", "status.healthStatus.configurationIssues.reason"],
+            "liveStreams.list(health)",
+            id=self.stream_id
+        ).execute()
+        items = response.get("items", [])
+        if not items:
+            raise ValueError(f"Stream {self.stream_id} not found.")
+        status = items[0]["status"]
+        health = status.get("healthStatus", {})
+        self.youtube_status = {
+            "youtube_stream_status": status.get("streamStatus"),
+            "youtube_health": health.get("status"),
+            "youtube_issues": [issue.get("reason") for issue in health.get("configurationIssues", [])],
+        }
+        return self.youtube_status
+
+
+def evaluate_thresholds(sample, thresholds=None):
+    """Return a dict of alert key -> message for every threshold the sample breaches."""
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    alerts = {}
+    if sample.get("obs_active") and "bitrate_kbps" in sample:
+        if sample["bitrate_kbps"] < thresholds["min_bitrate_kbps"]:
+            alerts["bitrate"] = f"Bitrate low: {sample['bitrate_kbps']} kbps"
+        if sample["dropped_frames_pct"] > thresholds["max_dropped_frames_pct"]:
+            alerts["dropped"] = f"Dropped frames (network): {sample['dropped_frames_pct']}%"
+        if sample["skipped_frames_pct"] > thresholds["max_skipped_frames_pct"]:
+            alerts["skipped"] = f"Skipped frames (encoder): {sample['skipped_frames_pct']}%"
+        if sample.get("obs_reconnecting"):
+            alerts["reconnecting"] = "OBS output is reconnecting"
+    if "render_lag_pct" in sample and sample["render_lag_pct"] > thresholds["max_render_lag_pct"]:
+        alerts["render_lag"] = f"Render lag: {sample['render_lag_pct']}% frames missed"
+    if "cpu_pct" in sample and sample["cpu_pct"] > thresholds["max_cpu_pct"]:
+        alerts["cpu"] = f"CPU usage high: {sample['cpu_pct']}%"
+    if sample.get("youtube_health") in thresholds["bad_youtube_health"]:
+        issues = ", ".join(sample.get("youtube_issues") or []) or "no details"
+        alerts["youtube"] = f"YouTube stream health is '{sample['youtube_health']}' ({issues})"
+    return alerts
+
+
+class HealthMonitor:
+    """Run a HealthSampler on a background thread at a fixed cadence."""
+
+    def __init__(self, sampler, on_sample, on_alert, thresholds=None,
+                 obs_interval=DEFAULT_OBS_INTERVAL, youtube_interval=DEFAULT_YOUTUBE_INTERVAL):
+        self.sampler = sampler
+        self.on_sample = on_sample  # Called with each sample dict (from the monitor thread)
+        self.on_alert = on_alert  # Called with (key, message, active) when an alert starts or clears
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}  # Overrides merged onto the defaults
+        self.obs_interval = obs_interval
+        self.youtube_interval = youtube_interval
+        self.active_alerts = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a daemon thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+        logging.info("Health monitor started.")
+
+    def stop(self):
+        """Stop sampling and wait for the thread to exit."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        logging.info("Health monitor stopped.")
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        next_youtube = next_tick
+        while not self._stop_event.is_set():
+            sample = {"timestamp": time.time()}
+            if self.sampler.obs_client:
+                try:
+                    sample.update(self.sampler.sample_obs())
+                except Exception as e:
+                    logging.error(f"Failed to sample OBS stats: {e}")
+            if self.sampler.api_service and self.sampler.stream_id:
+                if time.monotonic() >= next_youtube:
+                    next_youtube += self.youtube_interval
+                    try:
+                        self.sampler.sample_youtube()
+                    except Exception as e:
+                        logging.error(f"Failed to sample YouTube stream health: {e}")
+                sample.update(self.sampler.youtube_status)
+
+            self._check_alerts(sample)
+            self.on_sample(sample)
+
+            # Schedule against the original cadence so slow samples do not drift the interval
+            next_tick += self.obs_interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def _check_alerts(self, sample):
+        """Raise alerts only when a threshold is first breached, and report when it clears."""
+        breached = evaluate_thresholds(sample, self.thresholds)
+        for key, message in breached.items():
+            if key not in self.active_alerts:
+                logging.warning(f"Stream health alert: {message}")
+                self.on_alert(key, message, True)
+            self.active_alerts[key] = message
+        for key in list(self.active_alerts):
+            if key not in breached:
+                message = self.active_alerts.pop(key)
+                logging.info(f"Stream health alert cleared: {message}")
+                self.on_alert(key, message, False)
@@ -0,0 +1,285 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import obsws_python as obs
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build
+
+from api_fields import list_request, projected
+from obs_pool import primary_endpoint
+
+CREDENTIALS_PATH = "youtube_credentials.pkl"
+OBS_CONFIG_FILE = "obs_config.json"
+CACHE_TTL = 300  # Seconds before cached list results are fetched again
+CLOCK_SKEW = 300  # Seconds the local clock may differ from YouTube's publishedAt when reconciling inserts
+
+
+def load_cached_credentials(path=CREDENTIALS_PATH):
+    """Load the credentials cached by the GUI's Authenticate button, refreshing them if expired."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as token:
+        credentials = pickle.load(token)
+    if credentials and credentials.expired and credentials.refresh_token:
+        credentials.refresh(Request())
+        logging.info("Refreshed expired credentials.")
+    return credentials
+
+
+def load_obs_config(path=OBS_CONFIG_FILE):
+    """Load the OBS WebSocket configuration written by the GUI."""
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def insert_stream(api_service, title):
+    """Create a 1080p60 RTMP stream; return its ID."""
+    stream_response = projected(
+        api_service.liveStreams().insert, ["id"], "liveStreams.insert",
+        part="snippet,cdn",
+        body={
+            "snippet": {"title": title},
+            "cdn": {"frameRate": "60fps", "ingestionType": "rtmp", "resolution": "1080p"},
+        }
+    ).execute()
+    stream_id = stream_response["id"]
+    logging.info(f"Stream created with ID: {stream_id}")
+    return stream_id
+
+
+def insert_broadcast(api_service, title, start_time, end_time, privacy_status):
+    """Create a broadcast with auto start/stop; return its ID."""
+    broadcast_response = projected(
+        api_service.liveBroadcasts().insert, ["id"], "liveBroadcasts.insert",
+        part="snippet,status,contentDetails",
+        body={
+            "snippet": {"title": title, "scheduledStartTime": start_time, "scheduledEndTime": end_time},
+            "status": {"privacyStatus": privacy_status},
+            "contentDetails": {"enableAutoStart": True, "enableAutoStop": True},
+        },
+    ).execute()
+    broadcast_id = broadcast_response["id"]
+    logging.info(f"Broadcast created with ID: {broadcast_id}")
+    return broadcast_id
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _find_created(collection, fields, label, matches, created_after, **params):
+    """Return the ID of the newest matching item published since created_after (epoch seconds), or None."""
+    newest = None
+    request = list_request(collection, fields, label, paged=True, maxResults=50, **params)
+    while request is not None:
+        response = request.execute()
+        for item in response.get("items", []):
+            published = _parse_time(item["snippet"]["publishedAt"]).timestamp()
+            if matches(item) and published >= created_after - CLOCK_SKEW and (newest is None or published > newest[0]):
+                newest = (published, item["id"])
+        request = collection.list_next(request, response)
+    return newest[1] if newest else None
+
+
+def find_stream(api_service, title, created_after):
+    """Find a stream created by an insert_stream call whose response was lost; return its ID or None."""
+    return _find_created(
+        api_service.liveStreams(), ["id", "snippet.title", "snippet.publishedAt"], "liveStreams.list(reconcile)",
+        lambda item: item["snippet"]["title"] == title, created_after,
+        mine=True
+    )
+
+
+def find_broadcast(api_service, title, start_time, created_after):
+    """Find a broadcast created by an insert_broadcast call whose response was lost; return its ID or None."""
+    start = _parse_time(start_time)
+    return _find_created(
+        api_service.liveBroadcasts(), ["id", "snippet.title", "snippet.publishedAt", "snippet.scheduledStartTime"],
+        "liveBroadcasts.list(reconcile)",
+        lambda item: item["snippet"]["title"] == title and _parse_time(item["snippet"]["scheduledStartTime"]) == start,
+        created_after,
+        broadcastStatus="upcoming"
+    )
+
+
+def bind_stream(api_service, broadcast_id, stream_id):
+    """Bind a stream to a broadcast."""
+    projected(
+        api_service.liveBroadcasts().bind, ["id"], "liveBroadcasts.bind",
+        part="id,contentDetails",
+        id=broadcast_id,
+        streamId=stream_id
+    ).execute()
+    logging.info("Stream bound to broadcast successfully")
+
+
+def create_broadcast(api_service, title, start_time, end_time, privacy_status):
+    """Create a stream and a broadcast and bind them; return (broadcast_id, stream_id)."""
+    stream_id = insert_stream(api_service, title)
+    broadcast_id = insert_broadcast(api_service, title, start_time, end_time, privacy_status)
+    bind_stream(api_service, broadcast_id, stream_id)
+    return broadcast_id, stream_id
+
+
+def get_lifecycle_status(api_service, broadcast_id):
+    """Return the lifeCycleStatus of a broadcast."""
+    response = list_request(
+        api_service.liveBroadcasts(), ["status.lifeCycleStatus"], "liveBroadcasts.list(status)",
+        id=broadcast_id
+    ).execute()
+    if not response.get("items"):
+        raise ValueError("Broadcast not found.")
+    return response["items"][0]["status"]["lifeCycleStatus"]
+
+
+def transition_broadcast(api_service, broadcast_id, target):
+    """Move a broadcast to 'live' (from 'ready') or 'complete' (from 'live'); return the new status."""
+    allowed_from = {"live": "ready", "complete": "live"}[target]
+    current_status = get_lifecycle_status(api_service, broadcast_id)
+    if current_status == target:
+        return current_status
+    if current_status != allowed_from:
+        raise ValueError(f"Cannot move broadcast to '{target}': it is in '{current_status}' state.")
+    projected(
+        api_service.liveBroadcasts().transition, ["id"], "liveBroadcasts.transition",
+        broadcastStatus=target,
+        id=broadcast_id,
+        part="id,status",
+    ).execute()
+    logging.info(f"Broadcast {broadcast_id} transitioned to {target}.")
+    return target
+
+
+class StreamSession:
+    """Authenticated YouTube service, list caches and the OBS connection, kept warm for reuse."""
+
+    def __init__(self, credentials_path=CREDENTIALS_PATH, obs_config_path=OBS_CONFIG_FILE):
+        self.credentials_path = credentials_path
+        self.obs_config_path = obs_config_path
+        self.credentials = None
+        self.api_service = None
+        self.obs_client = None
+        self.started_at = time.time()
+        self._cache = {}  # name -> (fetched at, value)
+        # Neither the API service nor the OBS client is thread-safe, so callers are serialized per client
+        self.api_lock = threading.Lock()
+        self.obs_lock = threading.Lock()
+
+    def authenticate(self):
+        """Load cached credentials and build the API service."""
+        self.credentials = load_cached_credentials(self.credentials_path)
+        if not self.credentials:
+            raise RuntimeError("No cached credentials. Authenticate once with the GUI first.")
+        self.api_service = build("youtube", "v3", credentials=self.credentials)
+        logging.info("Session authenticated.")
+
+    def _cached(self, name, fetch, refresh=False):
+        entry = self._cache.get(name)
+        if refresh or not entry or time.time() - entry[0] > CACHE_TTL:
+            with self.api_lock:
+                entry = (time.time(), fetch())
+            self._cache[name] = entry
+        return entry[1]
+
+    def invalidate(self, *names):
+        """Drop cached lists so the next read fetches them again."""
+        for name in names or list(self._cache):
+            self._cache.pop(name, None)
+
+    def list_broadcasts(self, refresh=False):
+        """Return upcoming and active broadcasts as [{id, title, scheduled_start, status}]."""
+        def fetch():
+            response = list_request(
+                self.api_service.liveBroadcasts(),
+                ["id", "snippet.title", "snippet.scheduledStartTime", "status.lifeCycleStatus"],
+                "liveBroadcasts.list",
+                mine=True,
+                maxResults=25
+            ).execute()
+            return [{
+                "id": item["id"],
+                "title": item["snippet"]["title"],
+                "scheduled_start": item["snippet"].get("scheduledStartTime"),
+                "status": item["status"]["lifeCycleStatus"],
+            } for item in response.get("items", [])]
+        return self._cached("broadcasts", fetch, refresh)
+
+    def list_stream_keys(self, refresh=False):
+        """Return the channel's streams as [{id, title}]."""
+        def fetch():
+            response = list_request(
+                self.api_service.liveStreams(), ["id", "snippet.title"], "liveStreams.list",
+                mine=True,
+                maxResults=25
+            ).execute()
+            return [{"id": item["id"], "title": item["snippet"]["title"]} for item in response.get("items", [])]
+        return self._cached("stream_keys", fetch, refresh)
+
+    def list_playlists(self, refresh=False):
+        """Return the channel's playlists as [{id, title}]."""
+        def fetch():
+            response = list_request(
+                self.api_service.playlists(), ["id", "snippet.title"], "playlists.list",
+                mine=True,
+                maxResults=25
+            ).execute()
+            return [{"id": item["id"], "title": item["snippet"]["title"]} for item in response.get("items", [])]
+        return self._cached("playlists", fetch, refresh)
+
+    def create_broadcast(self, title, start_time, end_time, privacy_status="unlisted"):
+        """Create and bind a broadcast; start_time/end_time are RFC 3339 strings."""
+        with self.api_lock:
+            broadcast_id, stream_id = create_broadcast(self.api_service, title, start_time, end_time, privacy_status)
+        self.invalidate("broadcasts", "stream_keys")
+        return {"broadcast_id": broadcast_id, "stream_id": stream_id}
+
+    def transition(self, broadcast_id, target):
+        """Start ('live') or stop ('complete') a broadcast."""
+        with self.api_lock:
+            status = transition_broadcast(self.api_service, broadcast_id, target)
+        self.invalidate("broadcasts")
+        return {"broadcast_id": broadcast_id, "status": status}
+
+    def connect_obs(self):
+        """(Re)connect to OBS with the settings from obs_config.json."""
+        config = load_obs_config(self.obs_config_path)
+        with self.obs_lock:
+            if self.obs_client:
+                try:
+                    self.obs_client.disconnect()
+                except Exception as e:
+                    logging.error(f"Failed to disconnect OBS WebSocket: {e}")
+            endpoint = primary_endpoint(config)[1]  # The daemon drives the primary OBS instance
+            self.obs_client = obs.ReqClient(host=endpoint["host"], port=endpoint["port"], password=endpoint["password"])
+        logging.info("Connected to OBS WebSocket.")
+
+    def obs_call(self, action):
+        """Run a callable against the OBS client, connecting first if needed."""
+        if not self.obs_client:
+            self.connect_obs()
+        with self.obs_lock:
+            return action(self.obs_client)
+
+    def obs_status(self):
+        """Return whether the OBS stream and recording outputs are active."""
+        stream = self.obs_call(lambda client: client.get_stream_status())
+        record = self.obs_call(lambda client: client.get_record_status())
+        return {
+            "streaming": stream.output_active,
+            "stream_timecode": stream.output_timecode,
+            "recording": record.output_active,
+        }
+
+    def close(self):
+        """Release the OBS connection."""
+        if self.obs_client:
+            try:
+                self.obs_client.disconnect()
+            except Exception as e:
+                logging.error(f"Failed to disconnect OBS WebSocket: {e}")
+            self.obs_client = None
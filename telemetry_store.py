@@ -0,0 +1,182 @@
+import csv
+import logging
+import math
+import struct
+import sys
+from array import array
+
+# Downsampling resolutions in seconds and how many points each keeps.
+# 1 s covers the last hour, 10 s the last eight hours, 1 min the last day.
+DEFAULT_RESOLUTIONS = {1: 3600, 10: 2880, 60: 1440}
+
+# Map YouTube healthStatus values onto numbers so they can be charted with the OBS metrics
+YOUTUBE_HEALTH_SCORES = {"good": 3, "ok": 2, "bad": 1, "noData": 0}
+
+BINARY_MAGIC = b"YTLM"
+BINARY_VERSION = 1
+
+
+class RingBuffer:
+    """Fixed-size (timestamp, value) ring backed by two preallocated double arrays."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array("d", [0.0]) * capacity
+        self.values = array("d", [0.0]) * capacity
+        self.head = 0  # Index the next point is written to
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, value):
+        """Add a point, overwriting the oldest one when full."""
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _ordered(self, data):
+        start = (self.head - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            return data[start:start + self.count]
+        return data[start:] + data[:self.head]
+
+    def timestamps(self):
+        """Return the timestamps oldest first, as an array."""
+        return self._ordered(self.times)
+
+    def points(self):
+        """Return the values oldest first, as an array."""
+        return self._ordered(self.values)
+
+    def last(self):
+        """Return the newest (timestamp, value) pair, or None when empty."""
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return self.times[index], self.values[index]
+
+
+class DownsampledSeries:
+    """A metric kept as bucket means at several resolutions at once."""
+
+    def __init__(self, resolutions=None):
+        resolutions = resolutions or DEFAULT_RESOLUTIONS
+        self.rings = {seconds: RingBuffer(capacity) for seconds, capacity in resolutions.items()}
+        # Open bucket per resolution: [bucket start, running sum, sample count]
+        self._buckets = {seconds: [None, 0.0, 0] for seconds in resolutions}
+
+    def add(self, timestamp, value):
+        """Fold a raw sample into the open bucket of every resolution."""
+        for seconds, bucket in self._buckets.items():
+            start = math.floor(timestamp / seconds) * seconds
+            if bucket[0] is not None and start != bucket[0]:
+                self.rings[seconds].append(bucket[0], bucket[1] / bucket[2])
+                bucket[1] = bucket[2] = 0
+            bucket[0] = start
+            bucket[1] += value
+            bucket[2] += 1
+
+    def flush(self):
+        """Close the open buckets so the newest partial interval is included."""
+        for seconds, bucket in self._buckets.items():
+            if bucket[2]:
+                self.rings[seconds].append(bucket[0], bucket[1] / bucket[2])
+            self._buckets[seconds] = [None, 0.0, 0]
+
+    def series(self, resolution):
+        """Return (timestamps, values) arrays for a resolution."""
+        ring = self.rings[resolution]
+        return ring.timestamps(), ring.points()
+
+
+class TelemetryStore:
+    """Bounded-memory store of every numeric stream metric for one session."""
+
+    def __init__(self, resolutions=None):
+        self.resolutions = resolutions or DEFAULT_RESOLUTIONS
+        self.series = {}
+        self.started_at = None
+
+    def record(self, sample):
+        """Record the numeric fields of a health sample (see stream_health.HealthSampler)."""
+        timestamp = sample.get("timestamp")
+        if timestamp is None:
+            return
+        if self.started_at is None:
+            self.started_at = timestamp
+        for name, value in sample.items():
+            if name == "timestamp":
+                continue
+            if name == "youtube_health":
+                name, value = "youtube_health_score", YOUTUBE_HEALTH_SCORES.get(value)
+            if isinstance(value, bool):
+                value = float(value)
+            if not isinstance(value, (int, float)):
+                continue
+            if name not in self.series:
+                self.series[name] = DownsampledSeries(self.resolutions)
+            self.series[name].add(timestamp, float(value))
+
+    def flush(self):
+        """Close every open bucket, typically when the session ends."""
+        for series in self.series.values():
+            series.flush()
+
+    def export_csv(self, path, resolution=10):
+        """Write one row per timestamp and one column per metric at the given resolution."""
+        names = sorted(self.series)
+        rows = {}
+        for column, name in enumerate(names):
+            timestamps, values = self.series[name].series(resolution)
+            for timestamp, value in zip(timestamps, values):
+                rows.setdefault(timestamp, [""] * len(names))[column] = round(value, 3)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["timestamp"] + names)
+            for timestamp in sorted(rows):
+                writer.writerow([timestamp] + rows[timestamp])
+        logging.info(f"Exported {len(rows)} telemetry rows at {resolution}s resolution to {path}")
+
+    def export_binary(self, path):
+        """Write every resolution of every series as raw little-endian doubles."""
+        with open(path, "wb") as file:
+            file.write(BINARY_MAGIC)
+            file.write(struct.pack("<HH", BINARY_VERSION, len(self.series) * len(self.resolutions)))
+            for name in sorted(self.series):
+                encoded_name = name.encode("utf-8")
+                for resolution in sorted(self.resolutions):
+                    timestamps, values = self.series[name].series(resolution)
+                    file.write(struct.pack("<H", len(encoded_name)))
+                    file.write(encoded_name)
+                    file.write(struct.pack("<II", resolution, len(timestamps)))
+                    for data in (timestamps, values):
+                        if sys.byteorder == "big":
+                            data.byteswap()  # Slices are copies, so the ring itself is untouched
+                        data.tofile(file)
+        logging.info(f"Exported telemetry for {len(self.series)} metrics to {path}")
+
+
+def load_binary(path):
+    """Read a file written by export_binary into {(name, resolution): (timestamps, values)}."""
+    result = {}
+    with open(path, "rb") as file:
+        if file.read(4) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a telemetry export.")
+        version, blocks = struct.unpack("<HH", file.read(4))
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported telemetry export version {version}.")
+        for _ in range(blocks):
+            (name_length,) = struct.unpack("<H", file.read(2))
+            name = file.read(name_length).decode("utf-8")
+            resolution, count = struct.unpack("<II", file.read(8))
+            timestamps, values = array("d"), array("d")
+            timestamps.fromfile(file, count)
+            values.fromfile(file, count)
+            if sys.byteorder == "big":
+                timestamps.byteswap()
+                values.byteswap()
+            result[(name, resolution)] = (timestamps, values)
+    return result
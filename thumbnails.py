@@ -0,0 +1,302 @@
+import base64
+import io
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps, ImageStat
+
+from api_fields import projected
+
+THUMBNAIL_SIZE = (1280, 720)
+THUMBNAIL_TEMPLATE_FILE = "thumbnail_template.json"
+THUMBNAIL_OUTPUT_DIR = "thumbnails"
+MAX_THUMBNAIL_BYTES = 2 * 1024 * 1024  # YouTube rejects thumbnails over 2 MB
+RESIZED_THUMBNAIL_PATH = "resized_thumbnail.jpg"
+
+# Pillow first shrinks by an integer factor with a cheap box filter, then runs LANCZOS for the
+# remaining (at most 3x) reduction. Visually identical to a single LANCZOS pass, and much faster.
+REDUCING_GAP = 3.0
+
+DEFAULT_TEMPLATE = {
+    "template": "thumbnail_template.png",
+    "overlays": [
+        {"text": "{title}", "position": [640, 560], "font": "arial.ttf", "size": 64,
+         "color": "#FFFFFF", "anchor": "mm", "stroke_width": 3, "stroke_color": "#000000"},
+        {"text": "{date}", "position": [640, 640], "font": "arial.ttf", "size": 40,
+         "color": "#FFFFFF", "anchor": "mm", "stroke_width": 2, "stroke_color": "#000000"},
+    ],
+}
+
+
+def _cover_box(size, target=THUMBNAIL_SIZE):
+    """Return the centred crop box of an image of the given size that matches the target aspect ratio."""
+    width, height = size
+    target_ratio = target[0] / target[1]
+    if width / height > target_ratio:
+        crop_width = height * target_ratio
+        left = (width - crop_width) / 2
+        return (left, 0, left + crop_width, height)
+    crop_height = width / target_ratio
+    top = (height - crop_height) / 2
+    return (0, top, width, top + crop_height)
+
+
+def decode_for_thumbnail(source_path, mode="crop"):
+    """Open an image and decode it no larger than needed to produce a 1280x720 thumbnail."""
+    with Image.open(source_path) as img:
+        if img.format == "JPEG":
+            # Draft mode lets libjpeg decode at 1/2, 1/4 or 1/8 scale, skipping most of the IDCT work.
+            # Request the smallest scale that still covers the target after cropping or fitting.
+            width, height = img.size
+            # EXIF orientations 5-8 rotate by 90 degrees: the thumbnail is cut from the upright size
+            upright = (height, width) if img.getexif().get(0x0112) in (5, 6, 7, 8) else (width, height)
+            scale = max(THUMBNAIL_SIZE[0] / upright[0], THUMBNAIL_SIZE[1] / upright[1]) if mode == "crop" \
+                else min(THUMBNAIL_SIZE[0] / upright[0], THUMBNAIL_SIZE[1] / upright[1])
+            img.draft("RGB", (int(width * scale) + 1, int(height * scale) + 1))  # Draft size is in stored orientation
+        elif getattr(img, "is_animated", False):
+            img.seek(0)  # Animated GIFs use their first frame
+        img.load()  # Read the pixels before the file is closed
+    ImageOps.exif_transpose(img, in_place=True)  # Honour camera rotation without copying the image
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        # Flatten transparency onto black instead of letting convert() pick arbitrary colours
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (0, 0, 0))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def fit_to_thumbnail(img, mode="crop"):
+    """Resize to 1280x720 without stretching: crop to 16:9 ("crop") or letterbox ("fit")."""
+    if mode == "crop":
+        # The crop box is applied inside resize, so the cropped region is never copied
+        return img.resize(THUMBNAIL_SIZE, Image.LANCZOS, box=_cover_box(img.size), reducing_gap=REDUCING_GAP)
+    scale = min(THUMBNAIL_SIZE[0] / img.width, THUMBNAIL_SIZE[1] / img.height)
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    canvas = Image.new("RGB", THUMBNAIL_SIZE, (0, 0, 0))
+    canvas.paste(img.resize(size, Image.LANCZOS, reducing_gap=REDUCING_GAP),
+                 ((THUMBNAIL_SIZE[0] - size[0]) // 2, (THUMBNAIL_SIZE[1] - size[1]) // 2))
+    return canvas
+
+
+def encode_thumbnail(img, output_path, quality=85):
+    """Save as JPEG, lowering the quality until the file fits under YouTube's 2 MB limit."""
+    img.save(output_path, "JPEG", quality=quality, optimize=True)
+    while os.path.getsize(output_path) > MAX_THUMBNAIL_BYTES and quality > 50:
+        quality -= 10
+        img.save(output_path, "JPEG", quality=quality, optimize=True)
+    if os.path.getsize(output_path) > MAX_THUMBNAIL_BYTES:
+        raise ValueError("Thumbnail file size exceeds 2 MB. Please select a smaller image.")
+    return output_path
+
+
+def encode_thumbnail_bytes(img, quality=85):
+    """Like encode_thumbnail, but return the JPEG bytes instead of writing a file."""
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality, optimize=True)
+    while buffer.tell() > MAX_THUMBNAIL_BYTES and quality > 50:
+        quality -= 10
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=quality, optimize=True)
+    if buffer.tell() > MAX_THUMBNAIL_BYTES:
+        raise ValueError("Thumbnail file size exceeds 2 MB.")
+    return buffer.getvalue()
+
+
+def prepare_thumbnail(source_path, output_path=RESIZED_THUMBNAIL_PATH, mode="crop"):
+    """Turn any PNG, JPEG or GIF into an upload-ready 1280x720 JPEG thumbnail."""
+    img = decode_for_thumbnail(source_path, mode)
+    return encode_thumbnail(fit_to_thumbnail(img, mode), output_path)
+
+
+def capture_frame(client, source, quality=90):
+    """Grab a 1280x720 JPEG of an OBS source (a scene or input) and return its bytes.
+
+    OBS scales to fit inside the requested size, so a canvas that is not 16:9 comes back smaller.
+    """
+    response = client.get_source_screenshot(source, "jpg", THUMBNAIL_SIZE[0], THUMBNAIL_SIZE[1], quality)
+    # imageData is a data URI: "data:image/jpg;base64,..."
+    return base64.b64decode(response.image_data.split(",", 1)[1])
+
+
+def frame_to_thumbnail(frame):
+    """Return upload-ready JPEG bytes for a captured frame, re-encoding only if it is not already 1280x720 under 2 MB."""
+    img = Image.open(io.BytesIO(frame))  # Reads the header only
+    if img.size == THUMBNAIL_SIZE and len(frame) <= MAX_THUMBNAIL_BYTES:
+        return frame
+    return encode_thumbnail_bytes(fit_to_thumbnail(img.convert("RGB")))
+
+
+def score_frame(frame):
+    """Rate a frame for use as a thumbnail: edge sharpness, scaled down for under- or over-exposure.
+
+    Works on a greyscale copy no larger than 320x180, so scoring costs a few milliseconds per frame.
+    """
+    img = Image.open(io.BytesIO(frame))
+    img.draft("L", (320, 180))  # JPEG frames decode straight to a small greyscale image
+    img = img.convert("L")
+    img.thumbnail((320, 180))
+    sharpness = ImageStat.Stat(img.filter(ImageFilter.FIND_EDGES)).var[0]
+    brightness = ImageStat.Stat(img).mean[0]
+    exposure = max(0.0, 1 - abs(brightness - 128) / 128)  # 1 at mid-grey, 0 at black or white
+    return sharpness * exposure, sharpness, brightness
+
+
+def best_frame(capture, samples, interval, on_frame=None):
+    """Call capture() samples times, interval seconds apart, and return (bytes, scores) of the best-scoring frame.
+
+    Only the best frame so far is kept in memory.
+    """
+    best, best_score, scores = None, None, []
+    for index in range(samples):
+        if index:
+            time.sleep(interval)
+        frame = capture()
+        score = score_frame(frame)
+        scores.append(score)
+        if on_frame:
+            on_frame(index, score)
+        if best_score is None or score[0] > best_score:
+            best, best_score = frame, score[0]
+    return best, scores
+
+
+def upload_thumbnail_bytes(api_service, video_id, data):
+    """Set a thumbnail from JPEG bytes held in memory."""
+    return projected(
+        api_service.thumbnails().set, ["kind"], "thumbnails.set",
+        videoId=video_id,
+        media_body=MediaIoBaseUpload(io.BytesIO(data), mimetype="image/jpeg")
+    ).execute()
+
+
+def load_thumbnail_template():
+    """Load the thumbnail template description, creating a default one if missing."""
+    if not os.path.exists(THUMBNAIL_TEMPLATE_FILE):
+        with open(THUMBNAIL_TEMPLATE_FILE, "w") as file:
+            json.dump(DEFAULT_TEMPLATE, file, indent=4)
+        return DEFAULT_TEMPLATE
+    with open(THUMBNAIL_TEMPLATE_FILE, "r") as file:
+        return json.load(file)
+
+
+def overlay_values(broadcast):
+    """Build the text placeholders for a liveBroadcast resource."""
+    snippet = broadcast["snippet"]
+    start = datetime.fromisoformat(snippet["scheduledStartTime"].replace("Z", "+00:00")).astimezone()
+    return {
+        "title": snippet["title"],
+        "name": snippet["title"].split(" | ")[0],  # Title without the date suffix from get_default_title
+        "date": start.strftime("%B %d, %Y %A %p"),  # Same format as get_default_title
+        "time": start.strftime("%I:%M %p").lstrip("0"),
+    }
+
+
+# The caches below live in each worker process, so a pool worker decodes the template
+# and loads each font once no matter how many thumbnails it renders.
+
+@lru_cache(maxsize=8)
+def _load_base(template_path):
+    return fit_to_thumbnail(decode_for_thumbnail(template_path))
+
+
+@lru_cache(maxsize=32)
+def _load_font(font, size):
+    try:
+        return ImageFont.truetype(font, size)
+    except OSError:
+        logging.warning(f"Font {font} not found, using the default font.")
+        return ImageFont.load_default(size)
+
+
+def render_thumbnail(template_path, overlays, values, output_path):
+    """Draw the text overlays onto a copy of the template and save it as a JPEG."""
+    img = _load_base(template_path).copy()
+    draw = ImageDraw.Draw(img)
+    for overlay in overlays:
+        draw.text(
+            tuple(overlay["position"]),
+            overlay["text"].format(**values),
+            font=_load_font(overlay.get("font", "arial.ttf"), overlay.get("size", 48)),
+            fill=overlay.get("color", "#FFFFFF"),
+            anchor=overlay.get("anchor", "mm"),
+            stroke_width=overlay.get("stroke_width", 0),
+            stroke_fill=overlay.get("stroke_color"),
+        )
+    return encode_thumbnail(img, output_path)
+
+
+class BatchThumbnailJob:
+    """Render thumbnails for many broadcasts in a process pool and upload them concurrently."""
+
+    def __init__(self, pool, template, on_progress, render_workers=None, upload_workers=4,
+                 output_dir=THUMBNAIL_OUTPUT_DIR):
+        self.pool = pool  # http_pool.HttpPool; each upload thread checks out its own service
+        self.template = template
+        self.on_progress = on_progress  # Called with (broadcast_id, stage, ok, detail) from worker threads
+        self.render_workers = render_workers or os.cpu_count()
+        self.upload_workers = upload_workers
+        self.output_dir = output_dir
+
+    def render_all(self, broadcasts):
+        """Render every broadcast's thumbnail; return {broadcast_id: output path} for the successes."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        rendered = {}
+        # Spawn rather than fork: the GUI process has Qt and HTTP threads running.
+        with ProcessPoolExecutor(max_workers=self.render_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {}
+            for broadcast in broadcasts:
+                output_path = os.path.join(self.output_dir, f"{broadcast['id']}.jpg")
+                future = pool.submit(render_thumbnail, self.template["template"], self.template["overlays"],
+                                     overlay_values(broadcast), output_path)
+                futures[future] = broadcast["id"]
+            for future in as_completed(futures):
+                broadcast_id = futures[future]
+                try:
+                    rendered[broadcast_id] = future.result()
+                    self.on_progress(broadcast_id, "render", True, rendered[broadcast_id])
+                except Exception as e:
+                    logging.error(f"Failed to render thumbnail for {broadcast_id}: {e}")
+                    self.on_progress(broadcast_id, "render", False, str(e))
+        return rendered
+
+    def upload(self, broadcast_id, path):
+        """Set one rendered thumbnail on its broadcast."""
+        with self.pool.service() as api_service:
+            projected(
+                api_service.thumbnails().set, ["kind"], "thumbnails.set",
+                videoId=broadcast_id,
+                media_body=MediaFileUpload(path, mimetype="image/jpeg")
+            ).execute()
+
+    def upload_all(self, rendered):
+        """Upload rendered thumbnails concurrently; return the IDs that succeeded."""
+        uploaded = []
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as pool:
+            futures = {pool.submit(self.upload, broadcast_id, path): broadcast_id
+                       for broadcast_id, path in rendered.items()}
+            for future in as_completed(futures):
+                broadcast_id = futures[future]
+                try:
+                    future.result()
+                    uploaded.append(broadcast_id)
+                    self.on_progress(broadcast_id, "upload", True, "")
+                except Exception as e:
+                    logging.error(f"Failed to upload thumbnail for {broadcast_id}: {e}")
+                    self.on_progress(broadcast_id, "upload", False, str(e))
+        return uploaded
+
+    def run(self, broadcasts):
+        """Render then upload; return (rendered count, uploaded count)."""
+        rendered = self.render_all(broadcasts)
+        uploaded = self.upload_all(rendered)
+        logging.info(f"Batch thumbnails: {len(rendered)}/{len(broadcasts)} rendered, {len(uploaded)} uploaded.")
+        return len(rendered), len(uploaded)
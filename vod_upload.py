@@ -0,0 +1,234 @@
+import json
+import logging
+import mmap
+import os
+import random
+import threading
+import time
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaUpload
+
+from api_fields import projected
+from operation_journal import is_network_error
+
+UPLOAD_STATE_PATH = "vod_uploads.json"
+CHUNK_ALIGNMENT = 256 * 1024  # Resumable upload chunks must be multiples of 256 KiB
+DEFAULT_CHUNK_SIZE = 32 * CHUNK_ALIGNMENT  # 8 MiB
+MAX_RETRIES = 8
+INSERT_COST = 1600  # Quota units per videos.insert
+RECORDING_EXTENSIONS = {
+    ".mkv": "video/x-matroska",
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".flv": "video/x-flv",
+    ".ts": "video/mp2t",
+}
+
+
+class MmapMediaUpload(MediaUpload):
+    """Resumable media read through a read-only memory map, one chunk at a time.
+
+    Only the chunk being sent is copied into Python memory; the rest of the file stays in the
+    page cache, so a multi-GB recording uploads in roughly chunk_size of RAM.
+    """
+
+    def __init__(self, path, mimetype=None, chunksize=DEFAULT_CHUNK_SIZE):
+        if chunksize <= 0 or chunksize % CHUNK_ALIGNMENT:
+            raise ValueError(f"Chunk size must be a positive multiple of {CHUNK_ALIGNMENT} bytes.")
+        self._path = path
+        self._mimetype = mimetype or RECORDING_EXTENSIONS.get(os.path.splitext(path)[1].lower(),
+                                                              "application/octet-stream")
+        self._chunksize = chunksize
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        if not self._size:
+            self._file.close()
+            raise ValueError(f"{path} is empty.")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)  # Read ahead aggressively, drop pages behind
+
+    def chunksize(self):
+        return self._chunksize
+
+    def mimetype(self):
+        return self._mimetype
+
+    def size(self):
+        return self._size
+
+    def resumable(self):
+        return True
+
+    def getbytes(self, begin, length):
+        return self._map[begin:begin + length]
+
+    def has_stream(self):
+        return False
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def latest_recording(directory):
+    """Return the newest video file in an OBS recording directory."""
+    recordings = [entry for entry in os.scandir(directory)
+                  if entry.is_file() and os.path.splitext(entry.name)[1].lower() in RECORDING_EXTENSIONS]
+    if not recordings:
+        raise FileNotFoundError(f"No recordings found in {directory}.")
+    return max(recordings, key=lambda entry: entry.stat().st_mtime).path
+
+
+def find_last_recording(pool, name, known_path=None):
+    """Locate the last finished recording of an OBS instance.
+
+    known_path is the output path OBS reported when recording stopped; otherwise the newest
+    file in the instance's recording directory (GetRecordDirectory) is used.
+    """
+    with pool.client(name) as client:
+        if client.get_record_status().output_active:
+            raise ValueError(f"OBS instance '{name}' is still recording; stop the recording first.")
+        if known_path and os.path.exists(known_path):
+            return known_path
+        directory = client.get_record_directory().record_directory
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Recording directory {directory} of OBS instance '{name}' is not on this computer.")
+    return latest_recording(directory)
+
+
+class UploadState:
+    """Resumable session URIs of unfinished uploads, so an upload continues after a restart."""
+
+    def __init__(self, path=UPLOAD_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path):
+        # A recording that changed since the session started must be uploaded from scratch
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as file:
+            return json.load(file)
+
+    def _save(self, sessions):
+        with open(self.path + ".tmp", "w") as file:
+            json.dump(sessions, file, indent=4)
+        os.replace(self.path + ".tmp", self.path)
+
+    def get(self, path):
+        with self._lock:
+            return self._load().get(self.key(path))
+
+    def put(self, path, session):
+        with self._lock:
+            sessions = self._load()
+            sessions[self.key(path)] = session
+            self._save(sessions)
+
+    def remove(self, path):
+        with self._lock:
+            sessions = self._load()
+            if sessions.pop(self.key(path), None) is not None:
+                self._save(sessions)
+
+
+def _backoff(attempt):
+    time.sleep(min(2 ** attempt, 60) * random.uniform(0.5, 1.0))
+
+
+class VodUploader:
+    """Upload a recording with a chunked, resumable videos.insert and report throughput."""
+
+    def __init__(self, credentials, chunk_size=DEFAULT_CHUNK_SIZE, state=None, on_progress=None,
+                 max_retries=MAX_RETRIES):
+        self.credentials = credentials
+        self.chunk_size = chunk_size
+        self.state = state or UploadState()
+        self.on_progress = on_progress  # on_progress(sent_bytes, total_bytes, bytes_per_second)
+        self.max_retries = max_retries
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Pause after the current chunk; uploading the same file again resumes it."""
+        self._stop.set()
+
+    def _resume(self, request, session, size):
+        """Point request at a saved session; return the finished video if the server already has every byte."""
+        response, content = request.http.request(
+            session["uri"], "PUT", headers={"Content-Range": f"bytes */{size}", "Content-Length": "0"}
+        )
+        if response.status in (200, 201):
+            return json.loads(content)
+        if response.status != 308:
+            return None  # Sessions expire after about a week; start a new one
+        request.resumable_uri = session["uri"]
+        request.resumable_progress = int(response["range"].split("-")[1]) + 1 if "range" in response else 0
+        return None
+
+    def upload(self, path, title, description="", privacy="private"):
+        """Upload path as a new video, continuing an earlier session for the same file if there is one.
+
+        Returns {"video_id", "bytes", "resumed_from", "seconds", "bytes_per_second"}. Raises
+        InterruptedError if stop() was called; the session is kept for the next attempt.
+        """
+        self._stop.clear()
+        api_service = build("youtube", "v3", credentials=self.credentials)
+        media = MmapMediaUpload(path, chunksize=self.chunk_size)
+        try:
+            request = projected(
+                api_service.videos().insert, ["id", "status.uploadStatus"], "videos.insert",
+                part="snippet,status",
+                body={"snippet": {"title": title, "description": description},
+                      "status": {"privacyStatus": privacy}},
+                media_body=media
+            )
+            response = None
+            session = self.state.get(path)
+            if session:
+                response = self._resume(request, session, media.size())
+                if request.resumable_uri:
+                    logging.info(f"Resuming upload of {path} at byte {request.resumable_progress} of {media.size()}.")
+            resumed_from = request.resumable_progress
+            started = time.perf_counter()
+            attempt = 0
+            while response is None:
+                if self._stop.is_set():
+                    raise InterruptedError(f"Upload of {path} paused at byte {request.resumable_progress}.")
+                try:
+                    status, response = request.next_chunk(num_retries=0)
+                    attempt = 0
+                except Exception as e:
+                    if isinstance(e, HttpError) and e.resp.status in (404, 410):
+                        # The session expired or was cancelled; only a new session can continue
+                        self.state.remove(path)
+                        raise
+                    if attempt >= self.max_retries or not is_network_error(e):
+                        raise
+                    logging.warning(f"Upload chunk of {path} failed ({e}); retrying.")
+                    attempt += 1
+                    _backoff(attempt)
+                    continue  # The next call asks the server how much it has before sending more
+                if session is None or session["uri"] != request.resumable_uri:
+                    session = {"uri": request.resumable_uri, "title": title, "started": time.time()}
+                    self.state.put(path, session)
+                sent = request.resumable_progress if response is None else media.size()
+                elapsed = time.perf_counter() - started
+                if self.on_progress:
+                    self.on_progress(sent, media.size(), (sent - resumed_from) / elapsed if elapsed else 0.0)
+        finally:
+            media.close()
+        self.state.remove(path)
+        seconds = time.perf_counter() - started
+        rate = (media.size() - resumed_from) / seconds if seconds else 0.0
+        logging.info(f"Uploaded {path} as video {response['id']}: {media.size() - resumed_from} bytes "
+                     f"in {seconds:.1f}s ({rate / 1024 / 1024:.1f} MiB/s).")
+        return {"video_id": response["id"], "bytes": media.size(), "resumed_from": resumed_from,
+                "seconds": seconds, "bytes_per_second": rate}
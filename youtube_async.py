@@ -0,0 +1,144 @@
+"""Asyncio client for the YouTube Data API endpoints the app uses.
+
+googleapiclient's execute() blocks and opens one connection per service object. This client
+shares the same OAuth credentials but sends requests through one httpx.AsyncClient with HTTP/2
+enabled, so against googleapis.com many concurrent requests are multiplexed over a single
+TLS connection. Use it for fan-out work (bulk scheduling, status polling, thumbnail uploads):
+
+    async with AsyncYouTubeClient(credentials) as client:
+        items = [item async for item in client.iterate("liveBroadcasts", part="id", mine=True)]
+        results = await gather_limited([client.list("liveStreams", part="status", id=i) for i in ids], 20)
+"""
+import asyncio
+import logging
+import time
+
+import httpx
+from google.auth.transport.requests import Request
+
+from api_fields import API_STATS
+
+API_ROOT = "https://youtube.googleapis.com"
+RESOURCES = {"liveBroadcasts", "liveStreams", "playlists", "playlistItems", "thumbnails"}
+
+
+class AsyncApiError(Exception):
+    """An error response from the API, with the first error reason when the body has one."""
+
+    def __init__(self, status, reason, message):
+        super().__init__(f"HTTP {status} ({reason}): {message}")
+        self.status = status
+        self.reason = reason
+
+
+async def gather_limited(coroutines, limit):
+    """Await coroutines with at most limit in flight; exceptions are returned, not raised."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines), return_exceptions=True)
+
+
+class AsyncYouTubeClient:
+    """Minimal asyncio YouTube Data API v3 client sharing the app's OAuth credentials."""
+
+    def __init__(self, credentials, api_root=API_ROOT, http2=True, http1=True, max_connections=10, timeout=30):
+        self.credentials = credentials
+        self.api_root = api_root.rstrip("/")
+        self._refresh_lock = asyncio.Lock()
+        # http1=False with http2=True speaks HTTP/2 with prior knowledge, which plain-http servers need
+        self._client = httpx.AsyncClient(
+            http1=http1,
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def _token(self):
+        """Return a valid access token, refreshing the shared credentials once if needed."""
+        if not self.credentials.valid:
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    # google-auth refresh is blocking; keep it off the event loop
+                    await asyncio.to_thread(self.credentials.refresh, Request())
+                    logging.info("Refreshed expired credentials.")
+        return self.credentials.token
+
+    async def request(self, method, resource, action="", params=None, json=None, content=None,
+                      content_type=None, upload=False):
+        """Send one API request and return the decoded JSON body ({} for empty responses)."""
+        if resource not in RESOURCES:
+            raise ValueError(f"Unsupported resource '{resource}'.")
+        path = f"/upload/youtube/v3/{resource}" if upload else f"/youtube/v3/{resource}"
+        if action:
+            path += f"/{action}"
+        headers = {"Authorization": f"Bearer {await self._token()}"}
+        if content_type:
+            headers["Content-Type"] = content_type
+        response = await self._client.request(method, self.api_root + path, params=params, json=json,
+                                              content=content, headers=headers)
+        if response.status_code >= 400:
+            # Proxies and load balancers answer with HTML or plain text, so the body may not be JSON
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            error = data.get("error", {}) if isinstance(data, dict) else {}
+            if not isinstance(error, dict):
+                error = {"message": str(error)}
+            reason = (error.get("errors") or [{}])[0].get("reason", "unknown")
+            raise AsyncApiError(response.status_code, reason, error.get("message") or response.text[:200])
+        started = time.perf_counter()
+        data = response.json() if response.content else {}
+        API_STATS.record(f"{resource}.{action or method.lower()} (async)", len(response.content),
+                         time.perf_counter() - started)
+        return data
+
+    async def list(self, resource, **params):
+        return await self.request("GET", resource, params=params)
+
+    async def iterate(self, resource, **params):
+        """Yield every item of a list call, following nextPageToken."""
+        if "fields" in params and "nextPageToken" not in params["fields"]:
+            params["fields"] = "nextPageToken," + params["fields"]
+        while True:
+            response = await self.list(resource, **params)
+            for item in response.get("items", []):
+                yield item
+            if not response.get("nextPageToken"):
+                return
+            params["pageToken"] = response["nextPageToken"]
+
+    async def insert(self, resource, body, **params):
+        return await self.request("POST", resource, params=params, json=body)
+
+    async def update(self, resource, body, **params):
+        return await self.request("PUT", resource, params=params, json=body)
+
+    async def delete(self, resource, **params):
+        return await self.request("DELETE", resource, params=params)
+
+    async def bind(self, broadcast_id, stream_id, part="id,contentDetails"):
+        return await self.request("POST", "liveBroadcasts", "bind",
+                                  params={"id": broadcast_id, "streamId": stream_id, "part": part})
+
+    async def transition(self, broadcast_id, status, part="id,status"):
+        return await self.request("POST", "liveBroadcasts", "transition",
+                                  params={"id": broadcast_id, "broadcastStatus": status, "part": part})
+
+    async def set_thumbnail(self, video_id, data, mimetype="image/jpeg"):
+        """Upload thumbnail bytes for a video or broadcast."""
+        return await self.request("POST", "thumbnails", "set", params={"videoId": video_id, "uploadType": "media"},
+                                  content=data, content_type=mimetype, upload=True)